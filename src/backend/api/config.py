@@ -1,3 +1,5 @@
+import os
+from pathlib import Path
 from typing import Optional
 from pydantic import DirectoryPath, Field
 from pydantic_settings import BaseSettings
@@ -29,6 +31,35 @@ class OceanConfig(BaseSettings):
         description="Path to the data directory, relative to `main.py`",
     )
 
+    FILTER_MAX_WORKERS: int = Field(
+        default=os.cpu_count() or 1,
+        description="Maximum number of threads used to evaluate the filters of a pipeline concurrently. Set to 1 to evaluate filters sequentially.",
+    )
+
+    SNAPSHOT_CACHE_DIR: Path = Field(
+        default_factory=lambda: Path(
+            os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        )
+        / "ocelescope"
+        / "snapshots",
+        description="Directory for binary snapshots of imported OCELs, defaults to ~/.cache/ocelescope/snapshots. Re-importing a file with identical content loads the snapshot instead of parsing the file. Created accessible to the current user only, the cache is disabled if the directory is owned by another user.",
+    )
+
+    SNAPSHOT_CACHE_MAX_SIZE_MB: int = Field(
+        default=10240,
+        description="Size limit of the snapshot cache in MB. When exceeded, the least recently used snapshots are deleted. Set to 0 to disable the snapshot cache.",
+    )
+
+    OCEL_CACHE_MAX_SIZE_MB: int = Field(
+        default=1024,
+        description="Memory budget of the result cache of a single OCEL in MB. When exceeded, the least recently used results are evicted.",
+    )
+
+    CACHE_MAX_SIZE_MB: int = Field(
+        default=4096,
+        description="Memory budget in MB shared by the result caches of all OCELs in all sessions. When exceeded, results are evicted from the largest caches first.",
+    )
+
     class Config:
         env_file = ".env"
 
@@ -1,7 +1,9 @@
+import sqlite3
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Dict, List, Optional, Type, TypeVar
 
+from util.sqlite import SqliteSource
 
 T = TypeVar("T", bound="OcelExtension")
 
@@ -9,6 +11,7 @@ T = TypeVar("T", bound="OcelExtension")
 class OcelExtension(ABC):
     """
     Abstract base class for OCEL extensions that can be imported/exported from a file path.
+    For SQLite files, a shared read-only `source` is passed. Extensions should read from it instead of opening their own connections.
     """
 
     name: str
@@ -21,24 +24,29 @@ class OcelExtension(ABC):
 
     @staticmethod
     @abstractmethod
-    def has_extension(path: Path) -> bool:
+    def has_extension(path: Path, source: Optional[SqliteSource] = None) -> bool:
         """
-        Check if the extension data exists at the given path.
+        Check if the extension data exists at the given path. Called during import, this check should be cheap.
         """
         pass
 
     @classmethod
     @abstractmethod
-    def import_extension(cls: Type[T], path: Path) -> T:
+    def import_extension(
+        cls: Type[T], path: Path, source: Optional[SqliteSource] = None
+    ) -> T:
         """
-        Create the extension by reading from the given path.
+        Create the extension by reading from the given path. Called on first access of the extension.
         """
         pass
 
     @abstractmethod
-    def export_extension(self, path: Path) -> None:
+    def export_extension(
+        self, path: Path, conn: Optional[sqlite3.Connection] = None
+    ) -> None:
         """
         Write the extension data to the given path.
+        When exporting to SQLite, `conn` is the connection of the export transaction. Extensions should write their tables using it.
         """
         pass
 
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 from pydantic.main import BaseModel
 
 from filters.config_union import FilterConfig
@@ -25,3 +25,24 @@ class OcelListResponse(BaseModel):
 
 class Filter(BaseModel):
     pipeline: list[FilterConfig]
+
+
+class FilterPreview(BaseModel):
+    events: int
+    objects: int
+    event_counts: dict[str, int]
+    object_counts: dict[str, int]
+
+
+class OcelCacheUsage(BaseModel):
+    id: str
+    version: Literal["original", "filtered"]
+    size: int
+    max_size: int
+    methods: dict[str, int]
+
+
+class CacheUsageResponse(BaseModel):
+    total_size: int
+    max_size: int
+    ocels: list[OcelCacheUsage]
@@ -13,6 +13,8 @@ class TaskSummary(BaseModel):
     state: TaskState
     has_result: bool
     metadata: dict[str, Any]
+    progress: Optional[float] = None
+    stage: Optional[str] = None
 
 
 class TaskResponse(BaseModel, Generic[T]):
@@ -67,6 +67,8 @@ class Session:
                 state=task.state,
                 has_result=task.result is not None,
                 metadata=task.metadata,
+                progress=task.progress,
+                stage=task.stage,
             )
             for task in self._tasks.values()
         ]
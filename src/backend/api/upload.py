@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import threading
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional
+
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+from api.exceptions import BadRequest
+from util.tasks import raise_if_cancelled
+
+WRITE_CHUNK_SIZE = 1 << 20
+CANCEL_POLL_INTERVAL = 0.2
+
+
+class ReadAborted(Exception):
+    """Raised by `UploadReader` when the reader decided to stop consuming an upload."""
+
+
+class UploadBuffer:
+    """A file upload that is written to disk chunk by chunk, while computing its SHA-256 hash.
+    The file can be read concurrently while the upload is still in progress, see `reader()`.
+    """
+
+    def __init__(self, path: Path, total_size: Optional[int] = None):
+        self.path = path
+        self.total_size = total_size
+        self.size = 0
+        self.content_hash: Optional[str] = None
+        self._hash = hashlib.sha256()
+        self._file = open(path, "wb")
+        self._condition = threading.Condition()
+        self._done = False
+        self._error: Optional[BaseException] = None
+
+    @property
+    def progress(self) -> Optional[float]:
+        """Fraction of bytes received, if the total size is known."""
+        if self._done:
+            return 1.0
+        if not self.total_size:
+            return None
+        return min(self.size / self.total_size, 1.0)
+
+    def write(self, chunk: bytes):
+        with self._condition:
+            if self._error is not None:
+                raise self._error
+            self._file.write(chunk)
+            self._file.flush()
+            self._hash.update(chunk)
+            self.size += len(chunk)
+            self._condition.notify_all()
+
+    def close(self):
+        """Marks the upload as complete."""
+        with self._condition:
+            if self._done:
+                return
+            self._file.close()
+            self.content_hash = self._hash.hexdigest()
+            self._done = True
+            self._condition.notify_all()
+
+    def abort(self, error: BaseException):
+        """Marks the upload as failed. Pending and future reads and writes raise `error`."""
+        with self._condition:
+            if self._done:
+                return
+            self._file.close()
+            self._error = error
+            self._done = True
+            self._condition.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits for the upload to complete. Returns False on timeout, raises if the upload failed."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._done, timeout)
+            if self._error is not None:
+                raise self._error
+            return self._done
+
+    def wait_for_size(self, size: int, timeout: Optional[float] = None) -> bool:
+        """Waits until at least `size` bytes have been written, or the upload is complete.
+        Returns False on timeout, raises if the upload failed."""
+        with self._condition:
+            ready = self._condition.wait_for(
+                lambda: self.size >= size or self._done, timeout
+            )
+            if self._error is not None:
+                raise self._error
+            return ready
+
+    def reader(
+        self,
+        abort_if: Optional[Callable[[str], bool]] = None,
+        stop_event: Optional[threading.Event] = None,
+    ) -> io.BufferedReader:
+        """Returns a binary file object reading the upload from the start, blocking until the requested bytes have arrived.
+
+        `abort_if` is evaluated with the content hash once the upload is complete.
+        When it returns True, the next read raises `ReadAborted`.
+        Setting `stop_event` makes a blocked read raise `TaskCancelled`, even if no more data arrives.
+        """
+        return io.BufferedReader(
+            UploadReader(self, abort_if=abort_if, stop_event=stop_event)
+        )
+
+
+class UploadReader(io.RawIOBase):
+    def __init__(
+        self,
+        upload: UploadBuffer,
+        abort_if: Optional[Callable[[str], bool]] = None,
+        stop_event: Optional[threading.Event] = None,
+    ):
+        self._upload = upload
+        self._abort_if = abort_if
+        self._stop_event = stop_event
+        self._file = open(upload.path, "rb")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._upload.wait_for_size(
+            self._pos + 1,
+            timeout=CANCEL_POLL_INTERVAL if self._stop_event is not None else None,
+        ):
+            raise_if_cancelled(self._stop_event)
+        available = self._upload.size
+        if self._abort_if is not None and self._upload.content_hash is not None:
+            abort_if, self._abort_if = self._abort_if, None
+            if abort_if(self._upload.content_hash):
+                raise ReadAborted()
+        n = self._file.readinto(memoryview(buffer)[: available - self._pos])
+        self._pos += n
+        return n
+
+    def tell(self) -> int:
+        return self._pos
+
+    @property
+    def total_size(self) -> Optional[int]:
+        """Size of the complete upload, if known. Allows importers to report progress while the upload is still in progress."""
+        if self._upload.content_hash is not None:
+            return self._upload.size
+        return self._upload.total_size
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+async def stream_multipart_file(
+    request: Request, field_name: str
+) -> AsyncIterator[bytes]:
+    """Yields the content of a file field of a multipart/form-data request while the body is being received.
+    Unlike FastAPI's `UploadFile`, the body is not spooled to a temporary file before the route is called.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise BadRequest("Expected a multipart/form-data request")
+
+    header_field, header_value = b"", b""
+    in_field, found = False, False
+    chunks: list[bytes] = []
+    chunks_size = 0
+
+    def on_header_field(data: bytes, start: int, end: int):
+        nonlocal header_field
+        header_field += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        nonlocal header_value
+        header_value += data[start:end]
+
+    def on_header_end():
+        nonlocal header_field, header_value, in_field
+        if header_field.lower() == b"content-disposition":
+            _, options = parse_options_header(header_value)
+            in_field = options.get(b"name") == field_name.encode()
+        header_field, header_value = b"", b""
+
+    def on_part_data(data: bytes, start: int, end: int):
+        nonlocal chunks_size
+        if in_field:
+            chunks.append(data[start:end])
+            chunks_size += end - start
+
+    def on_part_end():
+        nonlocal in_field, found
+        found = found or in_field
+        in_field = False
+
+    parser = MultipartParser(
+        boundary,
+        callbacks={
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },  # type: ignore
+    )
+
+    async for body_chunk in request.stream():
+        parser.write(body_chunk)
+        if chunks_size >= WRITE_CHUNK_SIZE:
+            yield b"".join(chunks)
+            chunks.clear()
+            chunks_size = 0
+    parser.finalize()
+    if chunks:
+        yield b"".join(chunks)
+
+    if not found:
+        raise BadRequest(f"No file uploaded (expected form field '{field_name}')")
@@ -1,10 +1,14 @@
+import sqlite3
+from contextlib import closing
 from pathlib import Path
 from typing import Optional, Type, TypeVar
 
 from pandas import DataFrame
 
 from api.extensions import OcelExtension, register_extension
-from extensions.qel.util import get_table_from_sqlite, get_table_names_from_sqlite
+from extensions.qel.util import get_table_from_sqlite
+from ocel.exporter import write_dataframe
+from util.sqlite import SqliteSource, open_source
 from util.types import PathLike
 
 T = TypeVar("T", bound="QELExtension")
@@ -29,16 +33,29 @@ class QELExtension(OcelExtension):
         self.object_qty_table = object_qty_table
 
     @staticmethod
-    def has_extension(path: Path) -> bool:
-        table_names = get_table_names_from_sqlite(path)
-        return TABLE_EQTY in table_names or TABLE_OBJECT_QTY in table_names
+    def has_extension(path: Path, source: Optional[SqliteSource] = None) -> bool:
+        with open_source(path, source) as source:
+            return source.has_table(TABLE_EQTY) or source.has_table(TABLE_OBJECT_QTY)
 
     @classmethod
-    def import_extension(cls: Type[T], path: Path) -> "QELExtension":
-        eqty_table = get_table_from_sqlite(path, TABLE_EQTY)
-        object_qty_table = get_table_from_sqlite(path, TABLE_OBJECT_QTY)
+    def import_extension(
+        cls: Type[T], path: Path, source: Optional[SqliteSource] = None
+    ) -> "QELExtension":
+        with open_source(path, source) as source:
+            eqty_table = get_table_from_sqlite(source, TABLE_EQTY)
+            object_qty_table = get_table_from_sqlite(source, TABLE_OBJECT_QTY)
         return cls(eqty_table=eqty_table, object_qty_table=object_qty_table)
 
-    def export_extension(self, path: PathLike) -> None:
-        # You would need to implement the logic for writing these tables back to SQLite
-        raise NotImplementedError("Export not yet implemented.")
+    def export_extension(
+        self, path: PathLike, conn: Optional[sqlite3.Connection] = None
+    ) -> None:
+        if conn is None:
+            with closing(sqlite3.connect(path)) as conn, conn:
+                return self.export_extension(path, conn=conn)
+
+        for table_name, table in [
+            (TABLE_EQTY, self.eqty_table),
+            (TABLE_OBJECT_QTY, self.object_qty_table),
+        ]:
+            if table is not None:
+                write_dataframe(conn, table_name, table)
@@ -1,6 +1,7 @@
 from pandas.api.types import is_numeric_dtype, is_datetime64_any_dtype
+import numpy as np
 import pandas as pd
-from typing import Literal, Tuple, Union, Optional, cast
+from typing import Callable, Literal, Tuple, Union, Optional, cast
 
 from pandas.core.frame import DataFrame
 from pandas.core.series import Series
@@ -9,6 +10,7 @@ from pydantic.main import BaseModel
 
 from filters.base import BaseFilterConfig, FilterResult, register_filter
 from lib.attributes import get_objects_with_object_changes
+from ocel.attribute_timeline import attribute_timeline
 
 
 class AttributeFilterConfig(BaseModel):
@@ -29,52 +31,90 @@ class AttributeFilterConfig(BaseModel):
 def filter_by_attribute(
     attribute_df: DataFrame, type_column: str, config: AttributeFilterConfig
 ):
+    return filter_by_attributes(attribute_df, type_column, [config])
+
+
+def filter_by_attributes(
+    attribute_df: DataFrame, type_column: str, configs: list[AttributeFilterConfig]
+):
+    """Evaluates several attribute filters on the same target type and attribute in one scan.
+    The column is read and converted (to numbers/dates) at most once for all filters."""
     df = attribute_df
-    col = config.attribute
+    col = configs[0].attribute
+    target_type = configs[0].target_type
 
     if col not in df.columns:
-        raise ValueError(f"Attribute '{col}' not found in {config.target_type} data")
+        raise ValueError(f"Attribute '{col}' not found in {target_type} data")
 
     series = cast(Series, df[col])
     mask = pd.Series(True, index=series.index)
-
-    # Handle numeric filtering
-    if config.number_range is not None:
-        if is_numeric_dtype(series):
-            numeric_series = series
-        else:
-            numeric_series = pd.to_numeric(series, errors="coerce")
-
-        if config.number_range[0] is not None:
-            mask &= numeric_series >= float(config.number_range[0])
-        if config.number_range[1] is not None:
-            mask &= numeric_series <= float(config.number_range[1])
-
-    # Handle date filtering
-    elif config.time_range is not None:
-        if is_datetime64_any_dtype(series):
-            date_series = series
-        else:
-            date_series = pd.to_datetime(series, errors="coerce")
-
-        if config.time_range[0] is not None:
-            mask &= date_series >= pd.to_datetime(config.time_range[0])
-        if config.time_range[1] is not None:
-            mask &= date_series <= pd.to_datetime(config.time_range[1])
-
-    # Handle nominal filtering
-    if config.values is not None:
-        mask &= series.isin(config.values)
-
-    if config.regex is not None:
-        mask &= series.astype(str).str.contains(config.regex, regex=True, na=False)
-
-    is_not_target_type = attribute_df[type_column] != config.target_type
+    numeric_series: Optional[Series] = None
+    date_series: Optional[Series] = None
+
+    for config in configs:
+        # Handle numeric filtering
+        if config.number_range is not None:
+            if numeric_series is None:
+                if is_numeric_dtype(series):
+                    numeric_series = series
+                else:
+                    numeric_series = pd.to_numeric(series, errors="coerce")
+
+            if config.number_range[0] is not None:
+                mask &= numeric_series >= float(config.number_range[0])
+            if config.number_range[1] is not None:
+                mask &= numeric_series <= float(config.number_range[1])
+
+        # Handle date filtering
+        elif config.time_range is not None:
+            if date_series is None:
+                if is_datetime64_any_dtype(series):
+                    date_series = series
+                else:
+                    date_series = pd.to_datetime(series, errors="coerce")
+
+            if config.time_range[0] is not None:
+                mask &= date_series >= pd.to_datetime(config.time_range[0])
+            if config.time_range[1] is not None:
+                mask &= date_series <= pd.to_datetime(config.time_range[1])
+
+        # Handle nominal filtering
+        if config.values is not None:
+            mask &= series.isin(config.values)
+
+        if config.regex is not None:
+            mask &= series.astype(str).str.contains(config.regex, regex=True, na=False)
+
+    is_not_target_type = attribute_df[type_column] != target_type
 
     final_mask = cast(Series, is_not_target_type | mask)
     return final_mask
 
 
+def restricted_attribute_mask(
+    df: DataFrame,
+    type_column: str,
+    configs: list[AttributeFilterConfig],
+    rows: np.ndarray,
+    complete: Optional[Callable[[DataFrame], DataFrame]] = None,
+) -> np.ndarray:
+    """Evaluates attribute filters (see `filter_by_attributes`) only on the given rows of the target type.
+    All other rows are kept, as the filters cannot remove them. `complete` can add attribute values to the evaluated rows.
+    Returns a mask over all rows of `df`."""
+    keep = np.ones(len(df), dtype=bool)
+    is_target_type = (df[type_column] == configs[0].target_type).to_numpy(dtype=bool)
+    positions = np.flatnonzero(rows & is_target_type)
+    if not len(positions):
+        return keep
+    subset = df.iloc[positions]
+    if complete is not None:
+        subset = complete(subset)
+    keep[positions] = filter_by_attributes(subset, type_column, configs).to_numpy(
+        dtype=bool
+    )
+    return keep
+
+
 class EventAttributeFilterConfig(BaseFilterConfig, AttributeFilterConfig):
     type: Literal["event_attribute"]
 
@@ -96,14 +136,39 @@ class ObjectAttributeFilterConfig(BaseFilterConfig, AttributeFilterConfig):
 
 @register_filter(ObjectAttributeFilterConfig)
 def filter_by_object_attribute(ocel: OCEL, config: ObjectAttributeFilterConfig):
+    # Indexed like ocel.objects
     enriched_objects = get_objects_with_object_changes(ocel)
-    filtered_rows = enriched_objects[
-        filter_by_attribute(
-            enriched_objects,
-            ocel.object_type_column,
-            config=AttributeFilterConfig(**config.model_dump()),
-        )
-    ]
-    valid_ids = filtered_rows[ocel.object_id_column].unique()
+    mask = filter_by_attribute(
+        enriched_objects,
+        ocel.object_type_column,
+        config=AttributeFilterConfig(**config.model_dump()),
+    )
+
+    return FilterResult(objects=mask)
+
 
-    return FilterResult(objects=ocel.objects[ocel.object_id_column].isin(valid_ids))
+def event_attribute_mask(
+    ocel: OCEL, configs: list[EventAttributeFilterConfig], rows: np.ndarray
+) -> FilterResult:
+    """Evaluates event attribute filters on the same attribute, restricted to the given event rows."""
+    keep = restricted_attribute_mask(
+        ocel.events,
+        ocel.event_activity,
+        [AttributeFilterConfig(**config.model_dump()) for config in configs],
+        rows,
+    )
+    return FilterResult(events=pd.Series(keep, index=ocel.events.index))
+
+
+def object_attribute_mask(
+    ocel: OCEL, configs: list[ObjectAttributeFilterConfig], rows: np.ndarray
+) -> FilterResult:
+    """Evaluates object attribute filters on the same attribute, restricted to the given object rows."""
+    keep = restricted_attribute_mask(
+        ocel.objects,
+        ocel.object_type_column,
+        [AttributeFilterConfig(**config.model_dump()) for config in configs],
+        rows,
+        complete=attribute_timeline(ocel).complete_objects,
+    )
+    return FilterResult(objects=pd.Series(keep, index=ocel.objects.index))
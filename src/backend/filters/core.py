@@ -1,46 +1,232 @@
-from typing import Optional, cast
-import pm4py
-from pm4py.objects.ocel.obj import OCEL
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, cast
+
+import numpy as np
 import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
 
+from api.config import config
 from filters.base import FILTER_REGISTRY, FilterResult
 from filters.config_union import FilterConfig
+from filters.planner import RestrictedMaskFunction, plan_filters
+from ocel.entity_ids import (
+    EntityIds,
+    e2e_codes,
+    event_ids,
+    object_change_codes,
+    object_ids,
+)
+from ocel.relation_index import category_codes, e2o_index, o2o_index
+from ocel.utils import clone_pm4py_ocel
+from util.cache import ocel_cached
+
+MaskFunction = Callable[[FilterConfig], FilterResult]
+"""Computes the masks of a single filter"""
+
+RestrictedStepFunction = Callable[
+    [RestrictedMaskFunction, list[FilterConfig], np.ndarray], FilterResult
+]
+"""Evaluates a merged step of restricted filters on the given rows, using the passed mask function"""
+
+
+def compute_filter_mask(ocel: OCEL, config: FilterConfig) -> FilterResult:
+    handler = FILTER_REGISTRY.get(type(config))
+    if handler is None:
+        raise ValueError(f"No filter registered for config type {type(config)}")
+    return handler(ocel, config)
+
 
+def compute_restricted_step(
+    ocel: OCEL,
+    evaluate: RestrictedMaskFunction,
+    configs: list[FilterConfig],
+    rows: np.ndarray,
+) -> FilterResult:
+    return evaluate(ocel, configs, rows)
+
+
+def compute_combined_masks(
+    ocel: OCEL,
+    filters: list[FilterConfig],
+    compute_mask: Optional[MaskFunction] = None,
+    max_workers: Optional[int] = None,
+    compute_restricted: Optional[RestrictedStepFunction] = None,
+) -> FilterResult:
+    """Combines the masks of all filters. `compute_mask` can be passed to look up the masks of single filters in a cache,
+    `compute_restricted` to look up the masks of restricted steps, which depend on the filter configs and the evaluated rows.
+
+    Filters are split into steps by `plan_filters`.
+    Filters working on whole columns or indexes (time frame, types, relation counts) only read from the OCEL and are combined with AND,
+    so they are evaluated concurrently on up to `max_workers` threads (default `FILTER_MAX_WORKERS`).
+    Most of the work happens in pandas/NumPy operations releasing the GIL, while a process pool would have to copy the OCEL to each worker.
+    Attribute filters are evaluated afterwards, merged per attribute, cheapest first and restricted to the rows that remain.
+    Steps are skipped once no rows are left on their side.
+    """
+    if compute_mask is None:
+        compute_mask = partial(compute_filter_mask, ocel)
+    if compute_restricted is None:
+        compute_restricted = partial(compute_restricted_step, ocel)
+    if max_workers is None:
+        max_workers = config.FILTER_MAX_WORKERS
 
-def compute_combined_masks(ocel: OCEL, filters: list[FilterConfig]) -> FilterResult:
     combined = FilterResult(
         events=pd.Series(True, index=ocel.events.index),
         objects=pd.Series(True, index=ocel.objects.index),
     )
 
-    for config in filters:
-        handler = FILTER_REGISTRY.get(type(config))
-        if handler is None:
-            raise ValueError(f"No filter registered for config type {type(config)}")
-        result = handler(ocel, config)
+    plan = plan_filters(ocel, filters)
+    eager = [step.configs[0] for step in plan if step.restricted is None]
+    restricted = [step for step in plan if step.restricted is not None]
+
+    if len(eager) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(eager)), thread_name_prefix="ocel-filter"
+        ) as pool:
+            results = list(pool.map(compute_mask, eager))
+    else:
+        results = [compute_mask(filter_config) for filter_config in eager]
+
+    for result in results:
         combined = combined.and_merge(result)
 
+    for step in restricted:
+        rows = cast(pd.Series, getattr(combined, step.side)).to_numpy(dtype=bool)
+        if not rows.any():
+            continue
+        evaluate = cast(RestrictedMaskFunction, step.restricted)
+        combined = combined.and_merge(compute_restricted(evaluate, step.configs, rows))
+
     return combined
 
 
-def apply_filters(ocel: OCEL, filters: list[FilterConfig]) -> OCEL:
-    masks = compute_combined_masks(ocel, filters)
+def keep_by_code(ids: EntityIds, mask: pd.Series) -> np.ndarray:
+    """Converts a mask over the rows of the events/objects table to a mask over entity codes."""
+    keep = np.zeros(len(ids), dtype=bool)
+    codes = ids.row_codes[mask.to_numpy(dtype=bool)]
+    keep[codes[codes >= 0]] = True
+    return keep
+
+
+def lookup(keep: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Looks up a mask over entity codes for a column of codes, where unknown (negative) codes are not kept."""
+    return (codes >= 0) & keep[np.maximum(codes, 0)] if len(keep) else codes >= 0
 
-    filtered_event_ids: Optional[pd.Series] = (
-        cast(pd.Series, ocel.events[ocel.event_id_column][masks.events])
-        if masks.events is not None
-        else None
+
+def codes_in(codes: np.ndarray, n: int) -> np.ndarray:
+    """Returns a mask over `n` entity codes, marking the codes contained in a column of codes."""
+    present = np.zeros(n, dtype=bool)
+    present[codes[codes >= 0]] = True
+    return present
+
+
+def propagate_masks(
+    ocel: OCEL, masks: FilterResult
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the events and objects (masks over entity codes) and the relations (mask over rows) remaining
+    after applying the masks.
+
+    The selection is propagated like `pm4py.filter_ocel_events` followed by `pm4py.filter_ocel_objects`:
+    - Filtering events keeps the relations of the selected events, and removes all objects without any of these relations.
+    - Filtering objects then keeps the relations of the selected (remaining) objects, and removes all events without any of these relations.
+    """
+    e2o = e2o_index(ocel)
+    eids, oids = event_ids(ocel), object_ids(ocel)
+    keep_events = np.ones(len(eids), dtype=bool)
+    keep_objects = np.ones(len(oids), dtype=bool)
+    keep_relations = np.ones(len(ocel.relations), dtype=bool)
+
+    if masks.events is not None:
+        keep_events = keep_by_code(eids, masks.events)
+        keep_relations = lookup(keep_events, e2o.relation_event_codes)
+        keep_objects = codes_in(e2o.relation_object_codes[keep_relations], len(oids))
+    if masks.objects is not None:
+        keep_objects &= keep_by_code(oids, masks.objects)
+        keep_relations &= lookup(keep_objects, e2o.relation_object_codes)
+        keep_events &= codes_in(e2o.relation_event_codes[keep_relations], len(eids))
+    return keep_events, keep_objects, keep_relations
+
+
+def apply_masks(ocel: OCEL, masks: FilterResult) -> OCEL:
+    """Returns a copy of the OCEL with the events and objects selected by the masks, propagated as in `propagate_masks`.
+    O2O, E2E and object changes are kept when all of the events/objects they refer to are kept.
+    Instead of rebuilding every table with `isin` on string IDs, the masks are converted to masks over entity codes
+    and carried over to the other tables with array lookups on their cached code columns.
+    """
+    if masks.events is None and masks.objects is None:
+        return clone_pm4py_ocel(ocel)
+
+    keep_events, keep_objects, keep_relations = propagate_masks(ocel, masks)
+    eids, oids = event_ids(ocel), object_ids(ocel)
+
+    filtered = clone_pm4py_ocel(ocel)
+    filtered.events = ocel.events[lookup(keep_events, eids.row_codes)]
+    filtered.objects = ocel.objects[lookup(keep_objects, oids.row_codes)]
+    filtered.relations = ocel.relations[keep_relations]
+    eid_codes, eid_2_codes = e2e_codes(ocel)
+    filtered.e2e = ocel.e2e[
+        lookup(keep_events, eid_codes) & lookup(keep_events, eid_2_codes)
+    ]
+    o2o = o2o_index(ocel)
+    filtered.o2o = ocel.o2o[
+        lookup(keep_objects, o2o.source_codes) & lookup(keep_objects, o2o.target_codes)
+    ]
+    filtered.object_changes = ocel.object_changes[
+        lookup(keep_objects, object_change_codes(ocel))
+    ]
+    return filtered
+
+
+@ocel_cached("events", "objects")
+def type_codes(ocel: OCEL) -> tuple[tuple[np.ndarray, np.ndarray], ...]:
+    """Returns the codes and categories of the activity of each event and the type of each object."""
+    return (
+        category_codes(ocel.events["ocel:activity"]),
+        category_codes(ocel.objects["ocel:type"]),
     )
 
-    filtered_object_ids: Optional[pd.Series] = (
-        cast(pd.Series, ocel.objects[ocel.object_id_column][masks.objects])
-        if masks.objects is not None
-        else None
+
+def count_by_type(
+    codes: np.ndarray, categories: np.ndarray, rows: Optional[np.ndarray]
+) -> pd.Series:
+    """Counts the selected rows (all rows if None) per category, including categories without any rows left."""
+    if rows is not None:
+        codes = codes[rows]
+    counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+    return pd.Series(counts, index=categories)
+
+
+def count_remaining(ocel: OCEL, masks: FilterResult) -> tuple[pd.Series, pd.Series]:
+    """Returns the number of events per activity and objects per object type remaining after applying the masks,
+    as in the result of `apply_masks`. Counts are taken from the propagated masks and cached type codes alone,
+    without building the filtered OCEL."""
+    (activity_codes, activities), (otype_codes, otypes) = type_codes(ocel)
+    if masks.events is None and masks.objects is None:
+        return (
+            count_by_type(activity_codes, activities, None),
+            count_by_type(otype_codes, otypes, None),
+        )
+    keep_events, keep_objects, _ = propagate_masks(ocel, masks)
+    return (
+        count_by_type(
+            activity_codes, activities, lookup(keep_events, event_ids(ocel).row_codes)
+        ),
+        count_by_type(
+            otype_codes, otypes, lookup(keep_objects, object_ids(ocel).row_codes)
+        ),
     )
-    if filtered_event_ids is not None:
-        ocel = pm4py.filter_ocel_events(ocel, filtered_event_ids, positive=True)
 
-    if filtered_object_ids is not None:
-        ocel = pm4py.filter_ocel_objects(ocel, filtered_object_ids, positive=True)
 
-    return ocel
+def apply_filters(
+    ocel: OCEL,
+    filters: list[FilterConfig],
+    compute_mask: Optional[MaskFunction] = None,
+    compute_restricted: Optional[RestrictedStepFunction] = None,
+) -> OCEL:
+    masks = compute_combined_masks(
+        ocel,
+        filters,
+        compute_mask=compute_mask,
+        compute_restricted=compute_restricted,
+    )
+    return apply_masks(ocel, masks)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Literal, Optional
+
+import numpy as np
+from pm4py.objects.ocel.obj import OCEL
+
+from filters.attributes import (
+    EventAttributeFilterConfig,
+    ObjectAttributeFilterConfig,
+    event_attribute_mask,
+    object_attribute_mask,
+)
+from filters.base import FilterResult
+from filters.config_union import FilterConfig
+from filters.event_type import EventTypeFilterConfig
+from filters.relation_count import E2OCountFilterConfig
+from filters.time_range import TimeFrameFilterConfig
+
+RestrictedMaskFunction = Callable[[OCEL, list, np.ndarray], FilterResult]
+"""Computes the masks of merged filters, evaluating only the given rows (boolean array over the events/objects table)"""
+
+FILTER_COSTS: dict[type, float] = {
+    EventAttributeFilterConfig: 2,
+    ObjectAttributeFilterConfig: 3,  # Includes completing values from object changes
+}
+"""Estimated cost of each restricted filter per evaluated row, relative to an `isin` on the type column"""
+
+REGEX_COST = 4
+"""Additional cost of attribute filters matching a regex"""
+
+RESTRICTED_FILTERS: dict[type, RestrictedMaskFunction] = {
+    EventAttributeFilterConfig: event_attribute_mask,
+    ObjectAttributeFilterConfig: object_attribute_mask,
+}
+"""Filters that can be merged per attribute and evaluated on the remaining rows only"""
+
+
+@dataclass
+class PlannedStep:
+    """One or more filters evaluated together."""
+
+    configs: list[FilterConfig]
+    side: Literal["events", "objects"]
+    restricted: Optional[RestrictedMaskFunction] = field(default=None)
+    """Set if the step can be evaluated on the remaining rows only"""
+    cost: float = 0
+    """Estimated cost of evaluating a restricted step on all rows of its side"""
+
+
+def side_of(config: FilterConfig) -> Literal["events", "objects"]:
+    if isinstance(
+        config,
+        (TimeFrameFilterConfig, EventTypeFilterConfig, EventAttributeFilterConfig),
+    ):
+        return "events"
+    if isinstance(config, E2OCountFilterConfig) and config.direction == "source":
+        return "events"
+    return "objects"
+
+
+def estimate_cost(ocel: OCEL, config: FilterConfig) -> float:
+    rows = len(ocel.events) if side_of(config) == "events" else len(ocel.objects)
+    cost = FILTER_COSTS[type(config)]
+    if getattr(config, "regex", None) is not None:
+        cost += REGEX_COST
+    return cost * rows
+
+
+def plan_filters(ocel: OCEL, filters: list[FilterConfig]) -> list[PlannedStep]:
+    """Splits the filters into the steps evaluated by `compute_combined_masks`.
+
+    Filters working on whole columns or indexes (time frame, types, relation counts) are always evaluated on all rows
+    and combined with AND, so their order does not change the work done. They come first, in pipeline order.
+    Only the filters in `RESTRICTED_FILTERS` (attribute filters) are evaluated on the rows that remain,
+    so the planner only orders these: Filters on the same target type and attribute are merged into a single step,
+    scanning the column once, and steps are sorted by estimated cost, cheapest first.
+    Selectivities are not estimated, they are unknown for attribute filters without scanning their column.
+    """
+    eager: list[PlannedStep] = []
+    merged: dict[tuple, PlannedStep] = {}
+    for config in filters:
+        restricted = RESTRICTED_FILTERS.get(type(config))
+        if restricted is None:
+            eager.append(PlannedStep(configs=[config], side=side_of(config)))
+            continue
+        key = (type(config), config.target_type, config.attribute)  # type: ignore
+        step = merged.get(key)
+        if step is None:
+            merged[key] = PlannedStep(
+                configs=[config],
+                side=side_of(config),
+                restricted=restricted,
+                cost=estimate_cost(ocel, config),
+            )
+        else:
+            step.configs.append(config)
+            # The column is read once, so the most expensive comparison dominates
+            step.cost = max(step.cost, estimate_cost(ocel, config))
+
+    return eager + sorted(merged.values(), key=lambda step: step.cost)
@@ -1,14 +1,14 @@
-from typing import Literal, Optional, cast
+from typing import Literal, Optional
 
+import numpy as np
 import pandas as pd
-from pandas.core.frame import DataFrame
-from pandas.core.series import Series
 from pm4py.objects.ocel.obj import OCEL
 from pydantic import BaseModel
 
 
 from filters.base import BaseFilterConfig, FilterResult, register_filter
-from lib.relations import getO2OWithTypes
+from ocel.entity_ids import EntityIds
+from ocel.relation_index import CsrIndex, e2o_index, o2o_index
 
 
 class RelationCountFilterConfig(BaseModel):
@@ -19,74 +19,39 @@ class RelationCountFilterConfig(BaseModel):
     qualifier: Optional[str] = None
 
 
-def filter_by_relation_counts(
-    relation_table: pd.DataFrame,
-    source_id_column: str,
-    source_column: str,
-    target_column: str,
-    qualifier_column: str,
-    entity_id_column: str,
-    entity_type_column: str,
-    source_df: pd.DataFrame,
+def relation_count_mask(
+    index: CsrIndex,
+    source_ids: EntityIds,
+    target_types: np.ndarray,
+    qualifier_categories: np.ndarray,
     config: RelationCountFilterConfig,
-):
-    # Get o2o with types if not provided
-    relation_table = cast(
-        DataFrame,
-        relation_table[
-            (relation_table[source_column] == config.source)
-            & (relation_table[target_column] == config.target)
-        ],
-    )
-
+) -> np.ndarray:
+    """Evaluates a relation count filter on a CSR index, counting the related targets of all sources at once.
+    Returns whether to keep each source entity, indexed by code. Entities not of the source type are always kept.
+    """
+    sources = np.flatnonzero(source_ids.types == config.source)
+    owners, positions = index.gather(sources)
+    matches = target_types[index.targets[positions]] == config.target
     if config.qualifier is not None:
-        relation_table = cast(
-            DataFrame,
-            relation_table[relation_table[qualifier_column] == config.qualifier],
-        )
-
-    # Count how many times each target appears
-    entity_counts = cast(
-        Series, relation_table.groupby(source_id_column).size()
-    ).reset_index(name="entity_count")
+        qualifier_codes = np.flatnonzero(qualifier_categories == config.qualifier)
+        matches &= np.isin(index.qualifiers[positions], qualifier_codes)
+    counts = np.bincount(owners[matches], minlength=len(sources))
 
     min_count, max_count = config.range
-
+    # Entities without matching relations only qualify for an explicit minimum of 0
+    in_range = counts > 0 if min_count != 0 else np.ones(len(sources), dtype=bool)
     if min_count is not None:
-        entity_counts = entity_counts[entity_counts["entity_count"] >= min_count]
+        in_range &= counts >= min_count
     if max_count is not None:
-        entity_counts = entity_counts[entity_counts["entity_count"] <= max_count]
-    entity_counts = cast(Series, entity_counts[source_id_column])
-
-    if min_count == 0:
-        merged = pd.merge(
-            source_df[source_df[entity_type_column] == config.source],
-            relation_table,
-            left_on=entity_id_column,
-            right_on=source_id_column,
-            how="left",
-            indicator=True,
-        )
-        entities_with_no_relations = merged.loc[
-            merged["_merge"] == "left_only", entity_id_column
-        ]
-
-        entity_counts = pd.concat([entity_counts, entities_with_no_relations])
-
-    # Mask for non-target-type objects (always kept)
-    is_not_target_type = source_df[entity_type_column] != config.source
-
-    # Mask for objects meeting the relation count condition
-    is_in_filtered_ids = source_df[entity_id_column].isin(entity_counts)
+        in_range &= counts <= max_count
 
     # Invert if in exclude mode
     if config.mode == "exclude":
-        is_in_filtered_ids = ~is_in_filtered_ids
+        in_range = ~in_range
 
-    # Final mask: keep non-target-type or qualifying objects
-    final_mask = cast(Series, is_not_target_type | is_in_filtered_ids)
-
-    return final_mask
+    keep = np.ones(len(source_ids), dtype=bool)
+    keep[sources] = in_range
+    return keep
 
 
 class E2OCountFilterConfig(BaseFilterConfig, RelationCountFilterConfig):
@@ -96,30 +61,30 @@ class E2OCountFilterConfig(BaseFilterConfig, RelationCountFilterConfig):
 
 @register_filter(E2OCountFilterConfig)
 def filter_by_e2o_count(ocel: OCEL, config: E2OCountFilterConfig):
-    source_column = (
-        ocel.event_activity if config.direction == "source" else ocel.object_type_column
-    )
-    target_column = (
-        ocel.object_type_column if config.direction == "source" else ocel.event_activity
-    )
-    source_id_column = (
-        ocel.event_id_column if config.direction == "source" else ocel.object_id_column
-    )
-    entity_id_column = source_id_column
-    qualifier_column = ocel.qualifier
-    entity_type_column = source_column
-
-    mask = filter_by_relation_counts(
-        relation_table=ocel.relations,
-        source_column=source_column,
-        target_column=target_column,
-        source_id_column=source_id_column,
-        qualifier_column=qualifier_column,
-        entity_id_column=entity_id_column,
-        entity_type_column=entity_type_column,
-        source_df=ocel.events if config.direction == "source" else ocel.objects,
+    index = e2o_index(ocel)
+    if config.direction == "source":
+        csr, source_ids, target_ids = (
+            index.objects_of_events,
+            index.event_ids,
+            index.object_ids,
+        )
+        source_df = ocel.events
+    else:
+        csr, source_ids, target_ids = (
+            index.events_of_objects,
+            index.object_ids,
+            index.event_ids,
+        )
+        source_df = ocel.objects
+
+    keep = relation_count_mask(
+        index=csr,
+        source_ids=source_ids,
+        target_types=target_ids.types,
+        qualifier_categories=index.qualifier_categories,
         config=RelationCountFilterConfig(**config.model_dump()),
     )
+    mask = pd.Series(keep[source_ids.row_codes], index=source_df.index)
 
     return FilterResult(
         events=mask if config.direction == "source" else None,
@@ -134,18 +99,15 @@ class O2OCountFilterConfig(BaseFilterConfig, RelationCountFilterConfig):
 
 @register_filter(O2OCountFilterConfig)
 def filter_by_o2o_count(ocel: OCEL, config: O2OCountFilterConfig):
-    o2oTable = getO2OWithTypes(ocel, direction=config.direction)
-
-    mask = filter_by_relation_counts(
-        relation_table=o2oTable,
-        source_column="source_type",
-        target_column="target_type",
-        source_id_column="source",
-        qualifier_column="qualifier",
-        entity_id_column=ocel.object_id_column,
-        entity_type_column=ocel.object_type_column,
-        source_df=ocel.objects,
+    index = o2o_index(ocel)
+    keep = relation_count_mask(
+        index=index.csr(config.direction),
+        source_ids=index.object_ids,
+        target_types=index.object_ids.types,
+        qualifier_categories=index.qualifier_categories,
         config=RelationCountFilterConfig(**config.model_dump()),
     )
 
-    return FilterResult(objects=mask)
+    return FilterResult(
+        objects=pd.Series(keep[index.object_ids.row_codes], index=ocel.objects.index)
+    )
@@ -4,6 +4,8 @@ from pm4py.objects.ocel.obj import OCEL
 from filters.base import BaseFilterConfig, FilterResult, register_filter
 import pandas as pd
 
+from ocel.time_index import event_time_index
+
 
 class TimeFrameFilterConfig(BaseFilterConfig):
     type: Literal["time_frame"]
@@ -24,11 +26,9 @@ def filter_by_time_range(
 
     events_df = ocel.events
 
-    mask = pd.Series([True] * len(events_df), index=events_df.index)
-    if start_time is not None:
-        mask &= events_df["ocel:timestamp"] >= start_time
-    if end_time is not None:
-        mask &= events_df["ocel:timestamp"] <= end_time
+    mask = pd.Series(
+        event_time_index(ocel).mask(start_time, end_time), index=events_df.index
+    )
     if config.mode == "exclude":
         mask = ~mask
 
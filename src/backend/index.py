@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from fastapi.middleware.cors import CORSMiddleware
+import pandas as pd
 import uvicorn
 
 from api.config import config
@@ -25,6 +26,9 @@ from api.logger import LOGGER_CONFIG
 In this file, all API routes of the OCEAn application are defined.
 """
 
+# Share DataFrame buffers between OCEL copies until modified (see clone_pm4py_ocel)
+pd.set_option("mode.copy_on_write", True)
+
 # Init default sessions
 load_default_ocels()
 
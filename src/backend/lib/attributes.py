@@ -6,6 +6,8 @@ import pm4py
 from pm4py.objects.ocel.obj import OCEL
 from pydantic.fields import Field
 
+from ocel.attribute_timeline import attribute_timeline
+
 
 # --- Attribute Type Models ---
 @dataclass
@@ -82,7 +84,7 @@ def summarize_attributes(
 ) -> dict[str, List[AttributeSummary]]:
     summary_by_type: dict[str, List[AttributeSummary]] = {}
 
-    grouped = df.groupby([type_column, "attribute"])
+    grouped = df.groupby([type_column, "attribute"], observed=True)
 
     for (type_name, attr), group in grouped:  # type:ignore
         values = group["value"].dropna()
@@ -205,12 +207,5 @@ def summarize_object_attributes(ocel: OCEL) -> dict[str, list[AttributeSummary]]
 
 
 def get_objects_with_object_changes(ocel: OCEL) -> pd.DataFrame:
-    object_changes = ocel.object_changes
-    object_changes = (
-        object_changes.groupby([ocel.object_id_column, ocel.object_type_column])
-        .last()
-        .reset_index()[[ocel.object_id_column] + pm4py.ocel_get_attribute_names(ocel)]
-    )
-    object_changes = object_changes.set_index([ocel.object_id_column])
-    objects = ocel.objects.set_index(ocel.object_id_column)
-    return objects.fillna(object_changes).reset_index()
+    """Returns the objects table, with missing attribute values filled with the latest value recorded in the object changes."""
+    return attribute_timeline(ocel).complete_objects(ocel.objects)
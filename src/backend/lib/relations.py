@@ -3,8 +3,11 @@ from typing import Literal, Optional, cast
 from pm4py.objects.ocel.obj import OCEL
 from pydantic.main import BaseModel
 
+import numpy as np
 import pandas as pd
 
+from ocel.relation_index import o2o_index
+
 
 class RelationCountSummary(BaseModel):
     qualifier: str
@@ -16,36 +19,9 @@ class RelationCountSummary(BaseModel):
 
 
 def getO2OWithTypes(ocel, direction: Literal["source", "target"] = "source"):
-    o2o_with_types = pd.merge(
-        ocel.o2o,
-        ocel.objects[[ocel.object_id_column, ocel.object_type_column]],
-        how="left",
-    )
-    o2o_with_types = pd.merge(
-        o2o_with_types,
-        ocel.objects[[ocel.object_id_column, ocel.object_type_column]],
-        how="left",
-        left_on=f"{ocel.object_id_column}_2",
-        right_on=ocel.object_id_column,
-        suffixes=["", "_new"],  # type:ignore
-    )
-    o2o_with_types = o2o_with_types[
-        [
-            ocel.object_id_column,
-            f"{ocel.object_id_column}_2",
-            ocel.qualifier,
-            ocel.object_type_column,
-            f"{ocel.object_type_column}_new",
-        ]
-    ]
-    rename_map = {
-        ocel.object_id_column: direction,
-        f"{ocel.object_id_column}_2": "target" if direction == "source" else "source",
-        ocel.qualifier: "qualifier",
-        ocel.object_type_column: f"{direction}_type",
-        f"{ocel.object_type_column}_new": f"{'target' if direction == 'source' else 'source'}_type",
-    }
-    return o2o_with_types.rename(columns=rename_map)  # type:ignore
+    """Returns the O2O relations (`source`, `target`, `qualifier`) with the types of both objects (`source_type`, `target_type`).
+    With direction `target`, `source` refers to `ocel:oid_2`."""
+    return o2o_index(ocel).typed_relations(direction)
 
 
 def summarize_relation_counts(
@@ -58,7 +34,8 @@ def summarize_relation_counts(
 ) -> list[RelationCountSummary]:
     grouped_relations = (
         relation_table.groupby(
-            [source_id_col, qualifier_col, source_type_col, target_type_col]
+            [source_id_col, qualifier_col, source_type_col, target_type_col],
+            observed=True,
         )
         .size()
         .reset_index()
@@ -66,9 +43,9 @@ def summarize_relation_counts(
     )
 
     summary = (
-        grouped_relations.groupby([qualifier_col, source_type_col, target_type_col])[
-            "count"
-        ]
+        grouped_relations.groupby(
+            [qualifier_col, source_type_col, target_type_col], observed=True
+        )["count"]
         .agg(["min", "max", "sum"])
         .reset_index()
         .rename(columns={"min": "min_count", "max": "max_count"})
@@ -144,18 +121,14 @@ def summarize_e2o_counts(
 def summarize_o2o_counts(
     ocel: OCEL, direction: Optional[Literal["source", "target"]] = "source"
 ):
-    o2o = getO2OWithTypes(ocel, direction=direction or "source")
-
+    # Works on object codes instead of IDs, taken from the cached O2O index
+    index = o2o_index(ocel)
+    codes = np.arange(len(index.object_ids), dtype=index.forward.targets.dtype)
     return summarize_relation_counts(
-        relation_table=o2o,
+        relation_table=index.relation_codes(direction or "source"),
         qualifier_col="qualifier",
         source_type_col="source_type",
         target_type_col="target_type",
         source_id_col="source",
-        source_df=ocel.objects.rename(
-            columns={
-                ocel.object_id_column: "source",
-                ocel.object_type_column: "source_type",
-            }
-        ),
+        source_df=pd.DataFrame({"source": codes, "source_type": index.types_of(codes)}),
     )
@@ -68,7 +68,7 @@ class State(Module):
             ],
             page=page,
             page_size=page_size,
-            relation_table=ocel.ocel.relations,
+            get_relations=ocel.e2o_index.objects_of,
             from_field=ocel.ocel.event_id_column,
             to_field=ocel.ocel.object_id_column,
         )
@@ -117,7 +117,7 @@ class State(Module):
             ],
             page=page,
             page_size=page_size,
-            relation_table=ocel.ocel.o2o,
+            get_relations=ocel.o2o_index.targets_of,
             from_field=ocel.ocel.object_id_column,
             to_field="ocel:oid_2",
         )
@@ -1,5 +1,5 @@
 from math import ceil
-from typing import Literal, Optional, Tuple, cast
+from typing import Callable, Literal, Optional, Tuple, cast
 
 import pandas as pd
 from pandas.core.frame import DataFrame
@@ -29,10 +29,13 @@ def get_paginated_dataframe(
     non_attribute_fields: list[str],
     page: int,
     page_size: int,
-    relation_table: DataFrame,
+    get_relations: Callable[[pd.Series], DataFrame],
     from_field: str,
     to_field: str,
 ) -> PaginatedResponse:
+    """Returns a page of events/objects with their attributes and relations.
+    `get_relations` looks up the relations (`from_field`, `to_field`, `ocel:qualifier`) of a batch of IDs.
+    """
     start = (page - 1) * page_size
     end = start + page_size
     paginated_df = df.iloc[start:end].copy()
@@ -40,7 +43,7 @@ def get_paginated_dataframe(
     total_pages = ceil(total_items / page_size)
 
     # Only consider relations for this page
-    related = relation_table[relation_table[from_field].isin(paginated_df[from_field])]
+    related = get_relations(paginated_df[from_field])
 
     # Pivot relation data
     relations = related.pivot_table(
@@ -48,6 +51,7 @@ def get_paginated_dataframe(
         columns="ocel:qualifier",
         values=to_field,
         aggfunc=lambda x: list(x),
+        observed=True,
     ).reset_index()
 
     # Bundle relation columns into one 'relations' dict
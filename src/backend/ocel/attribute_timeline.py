@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.entity_ids import object_change_codes, object_ids
+from ocel.time_index import TimeBound, timestamp_ns
+from util.cache import ocel_cached
+
+
+class AttributeHistory:
+    """The recorded values of one object attribute, grouped by object code (CSR) and sorted by time within each object.
+    The values of object `i` are `values[offsets[i]:offsets[i + 1]]`, set at `times` (int64 nanoseconds)."""
+
+    def __init__(self, offsets: np.ndarray, times: np.ndarray, values: pd.Series):
+        self.offsets = offsets
+        self.times = times
+        self.values = values
+
+    def positions(self, codes: np.ndarray, at: TimeBound = None) -> np.ndarray:
+        """Returns the position of the latest value of each object (set at or before `at`, if given), -1 if there is none.
+        Uses a binary search over all objects' time ranges at once."""
+        codes = np.asarray(codes, dtype=np.int64)
+        first = self.offsets[codes]
+        if at is None:
+            last = self.offsets[codes + 1] - 1
+            return np.where(last >= first, last, -1)
+
+        t = timestamp_ns(at)
+        lo, hi = first.copy(), self.offsets[codes + 1]
+        max_position = max(len(self.times) - 1, 0)
+        while (active := lo < hi).any():
+            mid = (lo + hi) // 2
+            before = self.times[np.minimum(mid, max_position)] <= t
+            lo = np.where(active & before, mid + 1, lo)
+            hi = np.where(active & ~before, mid, hi)
+        return np.where(lo > first, lo - 1, -1)
+
+    def lookup(self, codes: np.ndarray, at: TimeBound = None) -> pd.Series:
+        """Returns the latest value of each object (as of `at`, if given), missing if there is none."""
+        positions = self.positions(codes, at)
+        valid = positions >= 0
+        values = self.values.take(np.where(valid, positions, 0)).reset_index(drop=True)
+        return values.where(valid) if not valid.all() else values
+
+
+class AttributeTimeline:
+    """Point-in-time store of the object attribute values recorded in `object_changes`, one `AttributeHistory` per attribute.
+
+    Answers "latest value" and "value as of time t" for many objects at once with vectorized lookups.
+    """
+
+    def __init__(self, ocel: OCEL):
+        changes = ocel.object_changes
+        self.object_ids = object_ids(ocel)
+        codes = object_change_codes(ocel)
+        times = (
+            changes["ocel:timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        )
+        self.attributes: dict[str, AttributeHistory] = {}
+        for attr in changes.columns:
+            if str(attr).startswith("ocel:"):
+                continue
+            rows = np.flatnonzero(changes[attr].notna().to_numpy() & (codes >= 0))
+            if not len(rows):
+                continue
+            # Sort by object, then time (stable, keeping the row order for equal times)
+            rows = rows[np.lexsort((times[rows], codes[rows]))]
+            offsets = np.zeros(len(self.object_ids) + 1, dtype=np.int64)
+            np.cumsum(
+                np.bincount(codes[rows], minlength=len(self.object_ids)),
+                out=offsets[1:],
+            )
+            self.attributes[attr] = AttributeHistory(
+                offsets=offsets,
+                times=times[rows],
+                values=changes[attr].iloc[rows].reset_index(drop=True),
+            )
+
+    def values(
+        self,
+        attr: str,
+        oids: Iterable[str] | pd.Series,
+        at: TimeBound = None,
+    ) -> pd.Series:
+        """Returns the latest recorded value of an attribute for each of the given objects (as of `at`, if given).
+        The result is indexed like `oids`, with missing values for unknown objects or objects without recorded values.
+        """
+        codes = self.object_ids.encode(oids)
+        index = oids.index if isinstance(oids, pd.Series) else pd.RangeIndex(len(codes))
+        history = self.attributes.get(attr)
+        if history is None:
+            return pd.Series(np.nan, index=index)
+        values = history.lookup(np.maximum(codes, 0), at).where(codes >= 0)
+        values.index = index
+        return values
+
+    def complete_objects(
+        self, objects: pd.DataFrame, at: TimeBound = None
+    ) -> pd.DataFrame:
+        """Fills the missing attribute values of an objects table with the latest recorded values (as of `at`, if given).
+        Attributes without a column in the objects table are not added."""
+        filled = {}
+        row_codes = self.object_ids.encode(objects["ocel:oid"])
+        valid = row_codes >= 0
+        for attr, history in self.attributes.items():
+            if attr not in objects.columns or not objects[attr].hasnans:
+                continue
+            values = history.lookup(np.where(valid, row_codes, 0), at)
+            values.index = objects.index
+            filled[attr] = objects[attr].fillna(values.where(valid))
+        return objects.assign(**filled) if filled else objects
+
+
+@ocel_cached("objects", "object_changes")
+def attribute_timeline(ocel: OCEL) -> AttributeTimeline:
+    return AttributeTimeline(ocel)
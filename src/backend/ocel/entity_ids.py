@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from util.cache import ocel_cached
+
+CODE_DTYPE = np.int32
+
+
+class EntityIds:
+    """Dictionary of the event or object IDs of an OCEL, assigning each ID a dense int32 code.
+
+    Codes follow the sorted order of the IDs, so sorting or comparing codes is equivalent to sorting or comparing the IDs.
+    Along with the IDs, the type (activity or object type) of each entity is stored, indexed by code.
+    Computations on relations can work on codes, materializing the string IDs only for their result.
+    This is a compute-only index that adds memory: The string ID columns of the pm4py tables are kept,
+    since pm4py, the filters and the exporters rely on them.
+    """
+
+    def __init__(self, ids: pd.Series, types: pd.Series):
+        codes, uniques = pd.factorize(ids.to_numpy(dtype=object), sort=True)
+        rows = np.flatnonzero(codes >= 0)
+        # Position of the first row of each entity
+        first = np.empty(len(uniques), dtype=np.int64)
+        first[codes[rows[::-1]]] = rows[::-1]
+        self.ids: np.ndarray = np.asarray(uniques, dtype=object)
+        self.types: np.ndarray = types.to_numpy(dtype=object)[first]
+        self.index = pd.Index(self.ids)
+        self.row_codes: np.ndarray = codes.astype(CODE_DTYPE)
+        """Code of each row of the table the IDs were taken from"""
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def encode(self, ids: Iterable[str] | pd.Series | np.ndarray) -> np.ndarray:
+        """Returns the codes of the given IDs, -1 for unknown IDs."""
+        if not isinstance(ids, (pd.Series, np.ndarray, pd.Index)):
+            ids = list(ids)
+        return self.index.get_indexer(ids).astype(CODE_DTYPE)  # type: ignore
+
+    def encode_set(self, ids: Iterable[str]) -> np.ndarray:
+        """Returns the codes of all known IDs out of the given ones."""
+        codes = self.encode(ids)
+        return codes[codes >= 0]
+
+    def codes_of_types(self, types: Iterable[str]) -> np.ndarray:
+        """Returns the codes of all entities of the given types."""
+        return np.flatnonzero(np.isin(self.types, list(types))).astype(CODE_DTYPE)
+
+    def decode(self, codes: pd.Series) -> pd.Series:
+        """Materializes the IDs of a column of codes. Missing and negative codes become None."""
+        valid = codes.notna() & (codes >= 0)
+        positions = codes.where(valid, 0).to_numpy(dtype=np.int64)
+        ids = pd.Series(self.ids.take(positions), index=codes.index, dtype=object)
+        if not valid.all():
+            ids = ids.where(valid, None)
+        return ids
+
+    def decode_types(self, codes: pd.Series | np.ndarray) -> np.ndarray:
+        """Returns the type of each entity, given a column of valid codes."""
+        return self.types.take(np.asarray(codes, dtype=np.int64))
+
+
+@ocel_cached("events")
+def event_ids(ocel: OCEL) -> EntityIds:
+    return EntityIds(ocel.events["ocel:eid"], ocel.events["ocel:activity"])
+
+
+@ocel_cached("objects")
+def object_ids(ocel: OCEL) -> EntityIds:
+    return EntityIds(ocel.objects["ocel:oid"], ocel.objects["ocel:type"])
+
+
+@ocel_cached("events", "e2e")
+def e2e_codes(ocel: OCEL) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the event codes of `ocel:eid` and `ocel:eid_2` for each row of the e2e table"""
+    ids = event_ids(ocel)
+    return ids.encode(ocel.e2e["ocel:eid"]), ids.encode(ocel.e2e["ocel:eid_2"])
+
+
+@ocel_cached("objects", "object_changes")
+def object_change_codes(ocel: OCEL) -> np.ndarray:
+    """Returns the object code of each row of the object_changes table"""
+    return object_ids(ocel).encode(ocel.object_changes["ocel:oid"])
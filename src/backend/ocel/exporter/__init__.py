@@ -0,0 +1,12 @@
+from .json import iter_ocel2_json, write_ocel2_json
+from .sqlite import write_dataframe, write_ocel2_sqlite
+from .xml import iter_ocel2_xml, write_ocel2_xml
+
+__all__ = [
+    "iter_ocel2_json",
+    "iter_ocel2_xml",
+    "write_dataframe",
+    "write_ocel2_json",
+    "write_ocel2_sqlite",
+    "write_ocel2_xml",
+]
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from typing import Any, Iterator, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+EPOCH_STRING = "1970-01-01T00:00:00.000000Z"
+"""Timestamp of initial object attribute values"""
+
+CHUNK_SIZE = 10_000
+"""Number of events/objects serialized at once by the streaming writers"""
+
+
+def attribute_names(df: pd.DataFrame) -> list[str]:
+    """Returns the attribute columns of an OCEL table (all columns not starting with `ocel:`)."""
+    return [col for col in df.columns if not str(col).startswith("ocel:")]
+
+
+def attribute_type(series: pd.Series) -> str:
+    """Returns the OCEL 2.0 attribute type (string, integer, float, boolean, time) of a column."""
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+    if pd.api.types.is_integer_dtype(series):
+        return "integer"
+    if pd.api.types.is_float_dtype(series):
+        return "float"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return "time"
+    return "string"
+
+
+def format_times(series: pd.Series) -> pd.Series:
+    """Formats a datetime column as ISO 8601 UTC strings. Naive timestamps are assumed to be UTC."""
+    if getattr(series.dt, "tz", None) is not None:
+        series = series.dt.tz_convert("UTC")
+    return series.dt.strftime(TIME_FORMAT)
+
+
+def python_values(series: pd.Series) -> list[Any]:
+    """Converts a column to a list of built-in Python values, with timestamps formatted and missing values as None."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        series = format_times(series)
+    if not series.hasnans:
+        return series.tolist()
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def table_attribute_types(
+    df: pd.DataFrame, type_col: str, attributes: list[str]
+) -> dict[str, dict[str, str]]:
+    """Maps each event/object type to the attributes having values for that type, and their OCEL 2.0 types."""
+    if df.empty or not attributes:
+        return {str(t): {} for t in df[type_col].unique()}
+    has_value = (
+        df[attributes].notna().groupby(df[type_col], sort=False, observed=True).any()
+    )
+    types = {attr: attribute_type(df[attr]) for attr in attributes}
+    return {
+        str(t): {attr: types[attr] for attr in attributes if row[attr]}
+        for t, row in has_value.iterrows()
+    }
+
+
+def group_rows(keys: pd.Series, index: pd.Index) -> tuple[np.ndarray, np.ndarray]:
+    """Groups the rows of a table by the entity (event/object) they belong to.
+    Returns `rows` and `offsets`, such that `rows[offsets[i]:offsets[i + 1]]` are the positions of the rows belonging to `index[i]`.
+    Rows referencing unknown entities are omitted.
+    """
+    codes = index.get_indexer(keys)
+    valid = np.flatnonzero(codes >= 0)
+    rows = valid[np.argsort(codes[valid], kind="stable")]
+    counts = np.bincount(codes[valid], minlength=len(index))
+    offsets = np.zeros(len(index) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return rows, offsets
+
+
+def chunk_ranges(n: int, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple[int, int]]:
+    for start in range(0, n, chunk_size):
+        yield start, min(start + chunk_size, n)
+
+
+class GroupedColumns:
+    """Columns of a table (e.g. relations), grouped by the events/objects they belong to.
+    Values are converted to Python values one chunk of entities at a time.
+    """
+
+    def __init__(
+        self, df: pd.DataFrame, key_col: str, index: pd.Index, columns: list[str]
+    ):
+        self.df = df
+        self.columns = columns
+        self.rows, self.offsets = group_rows(df[key_col], index)
+
+    def chunk(self, start: int, end: int) -> tuple[dict[str, list[Any]], np.ndarray]:
+        """Returns the Python values of all rows belonging to entities `start` to `end`,
+        and the offsets of each entity's rows within these lists."""
+        lo, hi = self.offsets[start], self.offsets[end]
+        rows = self.rows[lo:hi]
+        values = {col: python_values(self.df[col].iloc[rows]) for col in self.columns}
+        return values, self.offsets[start : end + 1] - lo
+
+
+def object_changes_table(ocel: OCEL) -> pd.DataFrame:
+    """Returns the object changes with a single `value` column, holding the value of the changed field."""
+    changes = ocel.object_changes
+    fields = changes["ocel:field"]
+    value = np.full(len(changes), None, dtype=object)
+    for field in fields.dropna().unique():
+        if field in changes.columns:
+            mask = (fields == field).to_numpy()
+            value[mask] = python_values(changes.loc[mask, field])
+    return pd.DataFrame(
+        {
+            "ocel:oid": changes["ocel:oid"],
+            "ocel:timestamp": changes["ocel:timestamp"],
+            "ocel:field": fields,
+            "value": pd.Series(value, index=changes.index, dtype=object),
+        }
+    )
+
+
+class EventRecord(NamedTuple):
+    id: str
+    type: str
+    time: Optional[str]
+    attributes: list[tuple[str, Any]]
+    relationships: list[tuple[str, Optional[str]]]
+
+
+class ObjectRecord(NamedTuple):
+    id: str
+    type: str
+    attributes: list[tuple[str, Any]]
+    """Initial attribute values"""
+    changes: list[tuple[str, Optional[str], Any]]
+    """Attribute changes (name, time, value)"""
+    relationships: list[tuple[str, Optional[str]]]
+
+
+def event_type_attributes(ocel: OCEL) -> dict[str, dict[str, str]]:
+    events = ocel.events
+    return table_attribute_types(events, "ocel:activity", attribute_names(events))
+
+
+def object_type_attributes(ocel: OCEL) -> dict[str, dict[str, str]]:
+    """Maps each object type to its attributes, including attributes only occurring in object changes."""
+    objects, changes = ocel.objects, ocel.object_changes
+    types = table_attribute_types(objects, "ocel:type", attribute_names(objects))
+    fields = changes[["ocel:type", "ocel:field"]].dropna().drop_duplicates()
+    for otype, field in fields.itertuples(index=False):
+        if field in changes.columns:
+            type_attributes = types.setdefault(str(otype), {})
+            type_attributes.setdefault(field, attribute_type(changes[field]))
+    return types
+
+
+def iter_events(ocel: OCEL, chunk_size: int = CHUNK_SIZE) -> Iterator[EventRecord]:
+    """Iterates all events with their non-null attribute values and E2O relationships."""
+    events = ocel.events
+    attributes = attribute_names(events)
+    relations = GroupedColumns(
+        ocel.relations,
+        "ocel:eid",
+        pd.Index(events["ocel:eid"]),
+        ["ocel:oid", "ocel:qualifier"],
+    )
+
+    for start, end in chunk_ranges(len(events), chunk_size):
+        chunk = events.iloc[start:end]
+        ids = python_values(chunk["ocel:eid"])
+        types = python_values(chunk["ocel:activity"])
+        times = python_values(chunk["ocel:timestamp"])
+        attribute_values = [(attr, python_values(chunk[attr])) for attr in attributes]
+        rels, offsets = relations.chunk(start, end)
+        rel_oids, rel_qualifiers = rels["ocel:oid"], rels["ocel:qualifier"]
+
+        for i in range(end - start):
+            lo, hi = offsets[i], offsets[i + 1]
+            yield EventRecord(
+                id=ids[i],
+                type=types[i],
+                time=times[i],
+                attributes=[
+                    (attr, values[i])
+                    for attr, values in attribute_values
+                    if values[i] is not None
+                ],
+                relationships=list(zip(rel_oids[lo:hi], rel_qualifiers[lo:hi])),
+            )
+
+
+def iter_objects(ocel: OCEL, chunk_size: int = CHUNK_SIZE) -> Iterator[ObjectRecord]:
+    """Iterates all objects with their non-null initial attribute values, attribute changes and O2O relationships."""
+    objects = ocel.objects
+    attributes = attribute_names(objects)
+    index = pd.Index(objects["ocel:oid"])
+    changes = GroupedColumns(
+        object_changes_table(ocel),
+        "ocel:oid",
+        index,
+        ["ocel:field", "ocel:timestamp", "value"],
+    )
+    o2o = GroupedColumns(ocel.o2o, "ocel:oid", index, ["ocel:oid_2", "ocel:qualifier"])
+
+    for start, end in chunk_ranges(len(objects), chunk_size):
+        chunk = objects.iloc[start:end]
+        ids = python_values(chunk["ocel:oid"])
+        types = python_values(chunk["ocel:type"])
+        attribute_values = [(attr, python_values(chunk[attr])) for attr in attributes]
+        chg, chg_offsets = changes.chunk(start, end)
+        chg_fields, chg_times, chg_values = (
+            chg["ocel:field"],
+            chg["ocel:timestamp"],
+            chg["value"],
+        )
+        rels, rel_offsets = o2o.chunk(start, end)
+        rel_oids, rel_qualifiers = rels["ocel:oid_2"], rels["ocel:qualifier"]
+
+        for i in range(end - start):
+            c_lo, c_hi = chg_offsets[i], chg_offsets[i + 1]
+            r_lo, r_hi = rel_offsets[i], rel_offsets[i + 1]
+            yield ObjectRecord(
+                id=ids[i],
+                type=types[i],
+                attributes=[
+                    (attr, values[i])
+                    for attr, values in attribute_values
+                    if values[i] is not None
+                ],
+                changes=list(
+                    zip(
+                        chg_fields[c_lo:c_hi],
+                        chg_times[c_lo:c_hi],
+                        chg_values[c_lo:c_hi],
+                    )
+                ),
+                relationships=list(zip(rel_oids[r_lo:r_hi], rel_qualifiers[r_lo:r_hi])),
+            )
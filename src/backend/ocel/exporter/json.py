@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Iterator
+
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.exporter.base import (
+    CHUNK_SIZE,
+    EPOCH_STRING,
+    event_type_attributes,
+    iter_events,
+    iter_objects,
+    object_type_attributes,
+)
+from util.types import PathLike
+
+
+def type_declarations(types: dict[str, dict[str, str]]) -> list[dict[str, Any]]:
+    return [
+        {
+            "name": name,
+            "attributes": [
+                {"name": attr, "type": attr_type}
+                for attr, attr_type in attributes.items()
+            ],
+        }
+        for name, attributes in types.items()
+    ]
+
+
+def relationships(rels: list[tuple[str, Any]]) -> list[dict[str, Any]]:
+    return [{"objectId": oid, "qualifier": qualifier or ""} for oid, qualifier in rels]
+
+
+def iter_object_dicts(ocel: OCEL) -> Iterator[dict[str, Any]]:
+    for obj in iter_objects(ocel):
+        yield {
+            "id": obj.id,
+            "type": obj.type,
+            "attributes": [
+                {"name": attr, "time": EPOCH_STRING, "value": value}
+                for attr, value in obj.attributes
+            ]
+            + [
+                {"name": attr, "time": time, "value": value}
+                for attr, time, value in obj.changes
+                if value is not None
+            ],
+            "relationships": relationships(obj.relationships),
+        }
+
+
+def iter_event_dicts(ocel: OCEL) -> Iterator[dict[str, Any]]:
+    for event in iter_events(ocel):
+        yield {
+            "id": event.id,
+            "type": event.type,
+            "time": event.time,
+            "attributes": [
+                {"name": attr, "value": value} for attr, value in event.attributes
+            ],
+            "relationships": relationships(event.relationships),
+        }
+
+
+def iter_json_array(items: Iterator[Any], chunk_size: int) -> Iterator[str]:
+    yield "["
+    parts: list[str] = []
+    first = True
+    for item in items:
+        parts.append(json.dumps(item, ensure_ascii=False))
+        if len(parts) >= chunk_size:
+            yield ("" if first else ",") + ",".join(parts)
+            parts.clear()
+            first = False
+    if parts:
+        yield ("" if first else ",") + ",".join(parts)
+    yield "]"
+
+
+def iter_ocel2_json(ocel: OCEL, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Serializes a pm4py OCEL to OCEL 2.0 JSON, yielding encoded chunks of `chunk_size` events/objects.
+
+    Replaces `pm4py.write_ocel2_json`, which builds the whole document in memory before writing.
+    """
+
+    def iter_parts() -> Iterator[str]:
+        object_types = type_declarations(object_type_attributes(ocel))
+        event_types = type_declarations(event_type_attributes(ocel))
+        yield '{"objectTypes":' + json.dumps(object_types, ensure_ascii=False)
+        yield ',"eventTypes":' + json.dumps(event_types, ensure_ascii=False)
+        yield ',"objects":'
+        yield from iter_json_array(iter_object_dicts(ocel), chunk_size)
+        yield ',"events":'
+        yield from iter_json_array(iter_event_dicts(ocel), chunk_size)
+        yield "}\n"
+
+    for part in iter_parts():
+        yield part.encode("utf-8")
+
+
+def write_ocel2_json(ocel: OCEL, path: PathLike) -> None:
+    with open(path, "wb") as f:
+        f.writelines(iter_ocel2_json(ocel))
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable, Union
+
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from api.extensions import OcelExtension
+from ocel.exporter.base import (
+    EPOCH_STRING,
+    attribute_names,
+    attribute_type,
+    chunk_ranges,
+    python_values,
+)
+from util.sqlite import quote_identifier
+from util.types import PathLike
+
+INSERT_BATCH_SIZE = 50_000
+
+SQL_TYPES = {
+    "integer": "INTEGER",
+    "float": "REAL",
+    "boolean": "BOOLEAN",
+    "time": "TIMESTAMP",
+    "string": "TEXT",
+}
+
+Column = Union[pd.Series, list[Any]]
+
+
+def write_ocel2_sqlite(
+    ocel: OCEL, path: PathLike, extensions: Iterable[OcelExtension] = ()
+) -> None:
+    """Writes a pm4py OCEL to an OCEL 2.0 SQLite file.
+
+    Replaces `pm4py.write_ocel2_sqlite`. All tables are written with batched `executemany` calls inside a single transaction,
+    with journaling and syncing disabled, as the file is written from scratch.
+    The given extensions supporting SQLite write their tables within the same transaction.
+    """
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("BEGIN")
+        try:
+            write_tables(conn, ocel)
+            for extension in extensions:
+                if ".sqlite" in extension.supported_extensions:
+                    extension.export_extension(Path(path), conn=conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+
+def write_tables(conn: sqlite3.Connection, ocel: OCEL):
+    events, objects = ocel.events, ocel.objects
+
+    # Events
+    create_table(conn, "event", {"ocel_id": "TEXT", "ocel_type": "TEXT"})
+    insert_rows(
+        conn,
+        "event",
+        {"ocel_id": events["ocel:eid"], "ocel_type": events["ocel:activity"]},
+    )
+    event_attributes = attribute_names(events)
+    event_tables = write_type_map(conn, "event", events["ocel:activity"])
+    for activity, group in events.groupby("ocel:activity", sort=False, observed=True):
+        attributes = [attr for attr in event_attributes if group[attr].notna().any()]
+        table = event_tables[str(activity)]
+        create_table(
+            conn,
+            table,
+            {"ocel_id": "TEXT", "ocel_time": "TIMESTAMP"}
+            | {attr: sql_type(events[attr]) for attr in attributes},
+        )
+        insert_rows(
+            conn,
+            table,
+            {"ocel_id": group["ocel:eid"], "ocel_time": group["ocel:timestamp"]}
+            | {attr: group[attr] for attr in attributes},
+        )
+
+    # Objects, with initial attribute values and changes in the same table
+    create_table(conn, "object", {"ocel_id": "TEXT", "ocel_type": "TEXT"})
+    insert_rows(
+        conn,
+        "object",
+        {"ocel_id": objects["ocel:oid"], "ocel_type": objects["ocel:type"]},
+    )
+    changes = ocel.object_changes
+    object_attributes = attribute_names(objects)
+    object_tables = write_type_map(
+        conn,
+        "object",
+        pd.concat([objects["ocel:type"], changes["ocel:type"]], ignore_index=True),
+    )
+    objects_by_type = dict(
+        list(objects.groupby("ocel:type", sort=False, observed=True))
+    )
+    changes_by_type = dict(
+        list(changes.groupby("ocel:type", sort=False, observed=True))
+    )
+    for otype, table in object_tables.items():
+        group = objects_by_type.get(otype, objects.iloc[:0])
+        type_changes = changes_by_type.get(otype, changes.iloc[:0])
+        fields = set(type_changes["ocel:field"].dropna())
+        attributes = [
+            attr
+            for attr in object_attributes
+            if group[attr].notna().any() or attr in fields
+        ]
+        change_attributes = [attr for attr in changes.columns if attr in fields]
+        attributes += [attr for attr in change_attributes if attr not in attributes]
+        create_table(
+            conn,
+            table,
+            {"ocel_id": "TEXT", "ocel_time": "TIMESTAMP", "ocel_changed_field": "TEXT"}
+            | {
+                attr: sql_type(objects[attr] if attr in objects else changes[attr])
+                for attr in attributes
+            },
+        )
+        insert_rows(
+            conn,
+            table,
+            {
+                "ocel_id": group["ocel:oid"],
+                "ocel_time": [EPOCH_STRING] * len(group),
+                "ocel_changed_field": [None] * len(group),
+            }
+            | {attr: group[attr] for attr in attributes if attr in group},
+        )
+        insert_rows(
+            conn,
+            table,
+            {
+                "ocel_id": type_changes["ocel:oid"],
+                "ocel_time": type_changes["ocel:timestamp"],
+                "ocel_changed_field": type_changes["ocel:field"],
+            }
+            | {attr: type_changes[attr] for attr in change_attributes},
+        )
+
+    # Relations
+    relations = ocel.relations
+    create_table(
+        conn,
+        "event_object",
+        {"ocel_event_id": "TEXT", "ocel_object_id": "TEXT", "ocel_qualifier": "TEXT"},
+    )
+    insert_rows(
+        conn,
+        "event_object",
+        {
+            "ocel_event_id": relations["ocel:eid"],
+            "ocel_object_id": relations["ocel:oid"],
+            "ocel_qualifier": relations["ocel:qualifier"],
+        },
+    )
+    o2o = ocel.o2o
+    create_table(
+        conn,
+        "object_object",
+        {"ocel_source_id": "TEXT", "ocel_target_id": "TEXT", "ocel_qualifier": "TEXT"},
+    )
+    insert_rows(
+        conn,
+        "object_object",
+        {
+            "ocel_source_id": o2o["ocel:oid"],
+            "ocel_target_id": o2o["ocel:oid_2"],
+            "ocel_qualifier": o2o["ocel:qualifier"],
+        },
+    )
+
+
+def sql_type(series: pd.Series) -> str:
+    return SQL_TYPES[attribute_type(series)]
+
+
+def write_type_map(
+    conn: sqlite3.Connection, prefix: str, types: pd.Series
+) -> dict[str, str]:
+    """Writes the `<prefix>_map_type` table. Returns the per-type table name for each type."""
+    tables: dict[str, str] = {}
+    # Avoid clashes with the relation tables event_object and object_object
+    used = {"object"}
+    for name in types.dropna().astype(str).unique():
+        suffix = re.sub(r"[^0-9A-Za-z]", "", name) or "type"
+        unique_suffix, i = suffix, 1
+        while unique_suffix.lower() in used:
+            i += 1
+            unique_suffix = f"{suffix}{i}"
+        used.add(unique_suffix.lower())
+        tables[name] = f"{prefix}_{unique_suffix}"
+
+    table = f"{prefix}_map_type"
+    create_table(conn, table, {"ocel_type": "TEXT", "ocel_type_map": "TEXT"})
+    insert_rows(
+        conn,
+        table,
+        {
+            "ocel_type": list(tables),
+            "ocel_type_map": [t.split("_", 1)[1] for t in tables.values()],
+        },
+    )
+    return tables
+
+
+def write_dataframe(conn: sqlite3.Connection, table: str, df: pd.DataFrame):
+    """Creates a table with the columns of a DataFrame (including a named index) and inserts all rows."""
+    if df.index.name is not None:
+        df = df.reset_index()
+    create_table(conn, table, {str(col): sql_type(df[col]) for col in df.columns})
+    insert_rows(conn, table, {str(col): df[col] for col in df.columns})
+
+
+def create_table(conn: sqlite3.Connection, table: str, columns: dict[str, str]):
+    definition = ", ".join(
+        f"{quote_identifier(col)} {sql_type}" for col, sql_type in columns.items()
+    )
+    conn.execute(f"CREATE TABLE {quote_identifier(table)} ({definition})")
+
+
+def insert_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    columns: dict[str, Column],
+    batch_size: int = INSERT_BATCH_SIZE,
+):
+    """Inserts rows given column-wise, converting and inserting `batch_size` rows at once."""
+    if not columns:
+        return
+    names = list(columns)
+    n = len(next(iter(columns.values())))
+    sql = (
+        f"INSERT INTO {quote_identifier(table)} "
+        f"({', '.join(quote_identifier(col) for col in names)}) "
+        f"VALUES ({', '.join('?' * len(names))})"
+    )
+    for start, end in chunk_ranges(n, batch_size):
+        values = [
+            python_values(col.iloc[start:end])
+            if isinstance(col, pd.Series)
+            else col[start:end]
+            for col in columns.values()
+        ]
+        conn.executemany(sql, zip(*values))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from typing import Any, Iterator
+from xml.sax.saxutils import escape, quoteattr
+
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.exporter.base import (
+    CHUNK_SIZE,
+    EPOCH_STRING,
+    event_type_attributes,
+    iter_events,
+    iter_objects,
+    object_type_attributes,
+)
+from util.types import PathLike
+
+
+def format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return escape(str(value))
+
+
+def iter_type_declarations(tag: str, types: dict[str, dict[str, str]]) -> Iterator[str]:
+    yield f"<{tag}s>"
+    for name, attributes in types.items():
+        yield f"<{tag} name={quoteattr(name)}><attributes>"
+        for attr, attr_type in attributes.items():
+            yield f"<attribute name={quoteattr(str(attr))} type={quoteattr(attr_type)}/>"
+        yield f"</attributes></{tag}>"
+    yield f"</{tag}s>"
+
+
+def iter_relationships(relationships: list[tuple[str, Any]]) -> Iterator[str]:
+    yield "<objects>"
+    for oid, qualifier in relationships:
+        yield (
+            f"<relationship object-id={quoteattr(str(oid))}"
+            f" qualifier={quoteattr(str(qualifier or ''))}/>"
+        )
+    yield "</objects>"
+
+
+def iter_ocel2_xml_parts(ocel: OCEL) -> Iterator[str]:
+    yield '<?xml version="1.0" encoding="utf-8"?>\n<log>'
+    yield from iter_type_declarations("object-type", object_type_attributes(ocel))
+    yield from iter_type_declarations("event-type", event_type_attributes(ocel))
+
+    yield "<objects>"
+    for obj in iter_objects(ocel):
+        yield f"<object id={quoteattr(str(obj.id))} type={quoteattr(str(obj.type))}><attributes>"
+        for attr, value in obj.attributes:
+            yield (
+                f"<attribute name={quoteattr(str(attr))} time={quoteattr(EPOCH_STRING)}>"
+                f"{format_value(value)}</attribute>"
+            )
+        for attr, time, value in obj.changes:
+            if value is not None:
+                yield (
+                    f"<attribute name={quoteattr(str(attr))} time={quoteattr(time or '')}>"
+                    f"{format_value(value)}</attribute>"
+                )
+        yield "</attributes>"
+        yield from iter_relationships(obj.relationships)
+        yield "</object>"
+    yield "</objects>"
+
+    yield "<events>"
+    for event in iter_events(ocel):
+        yield (
+            f"<event id={quoteattr(str(event.id))} type={quoteattr(str(event.type))}"
+            f" time={quoteattr(event.time or '')}><attributes>"
+        )
+        for attr, value in event.attributes:
+            yield f"<attribute name={quoteattr(str(attr))}>{format_value(value)}</attribute>"
+        yield "</attributes>"
+        yield from iter_relationships(event.relationships)
+        yield "</event>"
+    yield "</events>"
+    yield "</log>\n"
+
+
+def iter_ocel2_xml(ocel: OCEL, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Serializes a pm4py OCEL to OCEL 2.0 XML, yielding encoded chunks of `chunk_size` elements.
+
+    Replaces `pm4py.write_ocel2_xml`, which builds the whole element tree in memory before writing.
+    """
+    parts: list[str] = []
+    for part in iter_ocel2_xml_parts(ocel):
+        parts.append(part)
+        if len(parts) >= chunk_size:
+            yield "".join(parts).encode("utf-8")
+            parts.clear()
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+def write_ocel2_xml(ocel: OCEL, path: PathLike) -> None:
+    with open(path, "wb") as f:
+        f.writelines(iter_ocel2_xml(ocel))
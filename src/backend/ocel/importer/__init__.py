@@ -0,0 +1,12 @@
+from .base import ImportSelection, apply_selection
+from .json import read_ocel2_json
+from .sqlite import read_ocel2_sqlite
+from .xml import read_ocel2_xml
+
+__all__ = [
+    "ImportSelection",
+    "apply_selection",
+    "read_ocel2_json",
+    "read_ocel2_sqlite",
+    "read_ocel2_xml",
+]
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import IO, Any, Optional, Protocol
+
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+
+class ProgressCallback(Protocol):
+    """Receives the fraction (0 to 1) of the input that has been processed so far, and optionally the current stage."""
+
+    def __call__(self, progress: Optional[float], stage: Optional[str] = None): ...
+
+
+EPOCH = pd.Timestamp(0, tz="UTC")
+
+
+@dataclass(frozen=True)
+class ImportSelection:
+    """Restricts an import to a part of the log.
+
+    Selected are the events within `[start, end)` having one of the given `activities`
+    and, when passing `object_types`, being related to an object of these types.
+    Objects are restricted to the given types, and to objects related to a selected event when filtering events.
+    Relations, O2O relations and attribute changes are kept between selected events/objects only,
+    attribute changes at or after `end` are dropped.
+    """
+
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    activities: Optional[frozenset[str]] = None
+    object_types: Optional[frozenset[str]] = None
+
+    @property
+    def filters_events(self) -> bool:
+        return not (self.start is None and self.end is None and self.activities is None)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.filters_events and self.object_types is None
+
+    @property
+    def start_timestamp(self) -> Optional[pd.Timestamp]:
+        return utc_timestamp(self.start) if self.start is not None else None
+
+    @property
+    def end_timestamp(self) -> Optional[pd.Timestamp]:
+        return utc_timestamp(self.end) if self.end is not None else None
+
+
+def utc_timestamp(value: datetime) -> pd.Timestamp:
+    """Converts a datetime to a UTC timestamp. Naive datetimes are assumed to be UTC."""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def stream_size(source: IO[bytes]) -> Optional[int]:
+    """Returns the total size of a binary stream in bytes, if known.
+    Streams not backed by a file (like upload readers) can provide it via a `total_size` attribute of their raw stream.
+    """
+    try:
+        return os.fstat(source.fileno()).st_size
+    except (AttributeError, OSError):
+        return getattr(getattr(source, "raw", source), "total_size", None)
+
+
+def text_column(values: list[Any] | pd.Series) -> pd.Series:
+    """Converts an ID/type/qualifier column to strings, keeping missing values."""
+    series = pd.Series(values, dtype=object)
+    if not all(isinstance(v, str) for v in series):
+        series = series.where(series.isna(), series.astype(str))
+    return series
+
+
+def timestamp_column(values: list[Any] | pd.Series) -> pd.Series:
+    """Parses a column of ISO 8601 timestamps to UTC datetimes. Invalid values become NaT."""
+    return pd.Series(
+        pd.to_datetime(
+            pd.Series(values, dtype=object), utc=True, format="ISO8601", errors="coerce"
+        )
+    )
+
+
+def empty_events() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ocel:eid": pd.Series(dtype=object),
+            "ocel:timestamp": pd.Series(dtype="datetime64[ns, UTC]"),
+            "ocel:activity": pd.Series(dtype=object),
+        }
+    )
+
+
+def empty_objects() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ocel:oid": pd.Series(dtype=object),
+            "ocel:type": pd.Series(dtype=object),
+        }
+    )
+
+
+def empty_object_changes() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ocel:oid": pd.Series(dtype=object),
+            "ocel:type": pd.Series(dtype=object),
+            "ocel:timestamp": pd.Series(dtype="datetime64[ns, UTC]"),
+            "ocel:field": pd.Series(dtype=object),
+        }
+    )
+
+
+def finalize_events(events: pd.DataFrame) -> pd.DataFrame:
+    """Drops events without or with duplicate IDs, and sorts events by timestamp."""
+    events = events[events["ocel:eid"].notna()]
+    events = events.drop_duplicates(subset="ocel:eid")
+    return events.sort_values("ocel:timestamp", kind="stable", ignore_index=True)
+
+
+def enrich_e2o(
+    eids: pd.Series,
+    oids: pd.Series,
+    qualifiers: pd.Series,
+    events: pd.DataFrame,
+    objects: pd.DataFrame,
+) -> pd.DataFrame:
+    """Builds the E2O relations table, enriched with activity, timestamp and object type.
+    Relations referencing unknown events or objects are dropped."""
+    event_pos = pd.Index(events["ocel:eid"]).get_indexer(eids)
+    object_pos = pd.Index(objects["ocel:oid"]).get_indexer(oids)
+    valid = (event_pos >= 0) & (object_pos >= 0)
+    event_pos, object_pos = event_pos[valid], object_pos[valid]
+
+    return pd.DataFrame(
+        {
+            "ocel:eid": eids.to_numpy()[valid],
+            "ocel:oid": oids.to_numpy()[valid],
+            "ocel:qualifier": qualifiers.to_numpy()[valid],
+            "ocel:activity": events["ocel:activity"].array.take(event_pos),
+            "ocel:timestamp": events["ocel:timestamp"].array.take(event_pos),
+            "ocel:type": objects["ocel:type"].array.take(object_pos),
+        }
+    )
+
+
+def filter_o2o(o2o: pd.DataFrame, objects: pd.DataFrame) -> pd.DataFrame:
+    """Drops O2O relations referencing unknown objects."""
+    known = objects["ocel:oid"]
+    return o2o[
+        o2o["ocel:oid"].isin(known) & o2o["ocel:oid_2"].isin(known)  # type: ignore
+    ].reset_index(drop=True)
+
+
+CATEGORICAL_COLUMNS = {
+    "ocel:activity": [("events", "ocel:activity"), ("relations", "ocel:activity")],
+    "ocel:type": [
+        ("objects", "ocel:type"),
+        ("relations", "ocel:type"),
+        ("object_changes", "ocel:type"),
+    ],
+    "ocel:qualifier": [
+        ("relations", "ocel:qualifier"),
+        ("o2o", "ocel:qualifier"),
+        ("e2e", "ocel:qualifier"),
+    ],
+}
+"""Columns stored as categoricals, sharing one set of categories per column name across all tables"""
+
+
+def categorize_columns(tables: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """Converts the activity, object type and qualifier columns to categoricals.
+    All tables containing the same column share its categories, so their codes are comparable.
+    """
+    tables = dict(tables)
+    for columns in CATEGORICAL_COLUMNS.values():
+        present = [(t, col) for t, col in columns if col in tables[t].columns]
+        if not present:
+            continue
+        categories = pd.unique(
+            pd.concat(
+                [tables[t][col].dropna().astype(str) for t, col in present],
+                ignore_index=True,
+            )
+        )
+        dtype = pd.CategoricalDtype(sorted(categories))
+        for t, col in present:
+            series = tables[t][col]
+            is_str = isinstance(series.dtype, pd.CategoricalDtype) or (
+                pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty")
+            )
+            if not is_str:
+                series = series.where(series.isna(), series.astype(str))
+            tables[t] = tables[t].assign(**{col: series.astype(dtype)})
+    return tables
+
+
+def make_ocel(
+    events: pd.DataFrame,
+    objects: pd.DataFrame,
+    relations: pd.DataFrame,
+    object_changes: pd.DataFrame,
+    o2o: pd.DataFrame,
+    e2e: Optional[pd.DataFrame] = None,
+) -> OCEL:
+    if e2e is None:
+        e2e = pd.DataFrame(
+            {"ocel:eid": [], "ocel:eid_2": [], "ocel:qualifier": []}, dtype=object
+        )
+    tables = categorize_columns(
+        {
+            "events": events,
+            "objects": objects,
+            "relations": relations,
+            "object_changes": object_changes,
+            "o2o": o2o,
+            "e2e": e2e,
+        }
+    )
+    return OCEL(**tables)
+
+
+def apply_selection(ocel: OCEL, selection: ImportSelection) -> OCEL:
+    """Restricts an imported OCEL to an `ImportSelection`.
+    Used for formats that are parsed completely, the SQLite importer applies the selection within its queries instead.
+    """
+    events, objects, relations = ocel.events, ocel.objects, ocel.relations
+    if selection.object_types is not None:
+        objects = objects[objects["ocel:type"].isin(selection.object_types)]
+        relations = relations[relations["ocel:type"].isin(selection.object_types)]
+        events = events[events["ocel:eid"].isin(relations["ocel:eid"])]
+    if selection.activities is not None:
+        events = events[events["ocel:activity"].isin(selection.activities)]
+    if (start := selection.start_timestamp) is not None:
+        events = events[events["ocel:timestamp"] >= start]
+    if (end := selection.end_timestamp) is not None:
+        events = events[events["ocel:timestamp"] < end]
+    if selection.filters_events:
+        relations = relations[relations["ocel:eid"].isin(events["ocel:eid"])]
+        objects = objects[objects["ocel:oid"].isin(relations["ocel:oid"])]
+
+    object_changes = ocel.object_changes
+    object_changes = object_changes[
+        object_changes["ocel:oid"].isin(objects["ocel:oid"])
+    ]
+    if end is not None:
+        object_changes = object_changes[object_changes["ocel:timestamp"] < end]
+    e2e = ocel.e2e
+    e2e = e2e[
+        e2e["ocel:eid"].isin(events["ocel:eid"])
+        & e2e["ocel:eid_2"].isin(events["ocel:eid"])
+    ]
+    return make_ocel(
+        events=events.reset_index(drop=True),
+        objects=objects.reset_index(drop=True),
+        relations=relations.reset_index(drop=True),
+        object_changes=object_changes.reset_index(drop=True),
+        o2o=filter_o2o(ocel.o2o, objects),
+        e2e=e2e.reset_index(drop=True),
+    )
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Optional
+
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.importer.base import (
+    empty_events,
+    empty_object_changes,
+    empty_objects,
+    enrich_e2o,
+    filter_o2o,
+    finalize_events,
+    make_ocel,
+    text_column,
+    timestamp_column,
+)
+from util.tasks import raise_if_cancelled
+
+CHUNK_SIZE = 100_000
+
+EPOCH_PREFIXES = ("1970-01-01T00:00:00", "1970-01-01 00:00:00")
+
+TRUE_VALUES = {"true", "1", "yes"}
+
+
+def is_initial_time(time: str | None) -> bool:
+    """Checks if an object attribute timestamp marks an initial value (missing or 1970-01-01T00:00:00)."""
+    return not time or time.startswith(EPOCH_PREFIXES)
+
+
+def attribute_column(values: list[Any], attribute_type: str | None) -> pd.Series:
+    """Converts raw attribute values to a typed column, according to the OCEL 2.0 attribute type."""
+    series = pd.Series(values, dtype=object)
+    match attribute_type:
+        case "integer" | "float":
+            return pd.to_numeric(series, errors="coerce")
+        case "time":
+            return timestamp_column(series)
+        case "boolean":
+            return series.map(
+                lambda v: v if v is None else str(v).lower() in TRUE_VALUES
+            )
+        case _:
+            return series
+
+
+class ChunkedTable:
+    """Collects rows column-wise and converts them to DataFrame chunks of bounded size.
+    Rows may contain arbitrary (attribute) columns. Missing values are filled with None.
+    This keeps the peak memory close to the size of the final table, as raw Python values only exist for a single chunk.
+    """
+
+    def __init__(
+        self,
+        convert: Callable[[dict[str, list[Any]]], pd.DataFrame],
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        self._convert = convert
+        self._chunk_size = chunk_size
+        self._columns: dict[str, list[Any]] = {}
+        self._num_rows = 0
+        self._chunks: list[pd.DataFrame] = []
+
+    def __len__(self):
+        return self._num_rows + sum(len(chunk) for chunk in self._chunks)
+
+    def append(self, row: dict[str, Any]):
+        n = self._num_rows
+        for col, values in self._columns.items():
+            values.append(row.get(col))
+        for col, value in row.items():
+            if col not in self._columns:
+                self._columns[col] = [None] * n + [value]
+        self._num_rows += 1
+        if self._num_rows >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self._num_rows:
+            return
+        self._chunks.append(self._convert(self._columns))
+        self._columns = {}
+        self._num_rows = 0
+
+    def to_frame(self, empty: pd.DataFrame) -> pd.DataFrame:
+        """Concatenates all chunks. Returns `empty` if no rows have been added."""
+        self.flush()
+        if not self._chunks:
+            return empty
+        chunks, self._chunks = self._chunks, []
+        return pd.concat(chunks, ignore_index=True)
+
+
+class OcelBuilder:
+    """Incrementally builds a pm4py OCEL from events, objects, relations and attribute changes.
+    Used by the streaming importers. Attribute values are converted chunk-wise, using the declared OCEL 2.0 attribute types.
+    """
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE):
+        self.attribute_types: dict[str, str] = {}
+        self._events = ChunkedTable(self._convert_entities, chunk_size)
+        self._objects = ChunkedTable(self._convert_entities, chunk_size)
+        self._object_changes = ChunkedTable(self._convert_entities, chunk_size)
+        self._e2o = ChunkedTable(self._convert_relations, chunk_size)
+        self._o2o = ChunkedTable(self._convert_relations, chunk_size)
+
+    @property
+    def num_events(self) -> int:
+        return len(self._events)
+
+    @property
+    def num_objects(self) -> int:
+        return len(self._objects)
+
+    def declare_attribute(self, name: str, attribute_type: str):
+        """Registers the type of an attribute. The first declaration of an attribute name is used."""
+        self.attribute_types.setdefault(name, attribute_type)
+
+    def add_event(
+        self,
+        eid: str,
+        activity: str,
+        timestamp: Any,
+        attributes: dict[str, Any] | None = None,
+    ):
+        self._events.append(
+            {
+                "ocel:eid": eid,
+                "ocel:timestamp": timestamp,
+                "ocel:activity": activity,
+                **(attributes or {}),
+            }
+        )
+
+    def add_object(
+        self, oid: str, otype: str, attributes: dict[str, Any] | None = None
+    ):
+        """Adds an object, with initial attribute values."""
+        self._objects.append(
+            {"ocel:oid": oid, "ocel:type": otype, **(attributes or {})}
+        )
+
+    def add_object_change(
+        self, oid: str, otype: str, timestamp: Any, field: str, value: Any
+    ):
+        self._object_changes.append(
+            {
+                "ocel:oid": oid,
+                "ocel:type": otype,
+                "ocel:timestamp": timestamp,
+                "ocel:field": field,
+                field: value,
+            }
+        )
+
+    def add_e2o(self, eid: str, oid: str, qualifier: str | None):
+        self._e2o.append(
+            {"ocel:eid": eid, "ocel:oid": oid, "ocel:qualifier": qualifier}
+        )
+
+    def add_o2o(self, oid: str, oid_2: str, qualifier: str | None):
+        self._o2o.append(
+            {"ocel:oid": oid, "ocel:oid_2": oid_2, "ocel:qualifier": qualifier}
+        )
+
+    def _convert_entities(self, columns: dict[str, list[Any]]) -> pd.DataFrame:
+        data = {}
+        for col, values in columns.items():
+            if col == "ocel:timestamp":
+                data[col] = timestamp_column(values)
+            elif col.startswith("ocel:"):
+                data[col] = text_column(values)
+            else:
+                data[col] = attribute_column(values, self.attribute_types.get(col))
+        return pd.DataFrame(data)
+
+    def _convert_relations(self, columns: dict[str, list[Any]]) -> pd.DataFrame:
+        return pd.DataFrame(
+            {col: text_column(values) for col, values in columns.items()}
+        )
+
+    def build(self, stop_event: Optional[threading.Event] = None) -> OCEL:
+        """Assembles the OCEL. Checks for cancellation (`stop_event`) between tables."""
+        events = finalize_events(self._events.to_frame(empty_events()))
+        raise_if_cancelled(stop_event)
+
+        objects = self._objects.to_frame(empty_objects())
+        objects = objects[objects["ocel:oid"].notna()]
+        objects = objects.drop_duplicates(subset="ocel:oid", ignore_index=True)
+
+        object_changes = self._object_changes.to_frame(empty_object_changes())
+        object_changes = object_changes[
+            object_changes["ocel:oid"].isin(objects["ocel:oid"])  # type: ignore
+        ].sort_values("ocel:timestamp", kind="stable", ignore_index=True)
+        raise_if_cancelled(stop_event)
+
+        e2o = self._e2o.to_frame(
+            pd.DataFrame(
+                columns=["ocel:eid", "ocel:oid", "ocel:qualifier"], dtype=object
+            )
+        )
+        relations = enrich_e2o(
+            eids=e2o["ocel:eid"],
+            oids=e2o["ocel:oid"],
+            qualifiers=e2o["ocel:qualifier"],
+            events=events,
+            objects=objects,
+        )
+        del e2o
+        raise_if_cancelled(stop_event)
+
+        o2o = filter_o2o(
+            self._o2o.to_frame(
+                pd.DataFrame(
+                    columns=["ocel:oid", "ocel:oid_2", "ocel:qualifier"], dtype=object
+                )
+            ),
+            objects,
+        )
+
+        return make_ocel(
+            events=events,
+            objects=objects,
+            relations=relations,
+            object_changes=object_changes,
+            o2o=o2o,
+        )
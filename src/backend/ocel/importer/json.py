@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import os
+import threading
+from typing import IO, Any, Iterator, Optional
+
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.importer.base import ProgressCallback, stream_size
+from ocel.importer.builder import CHUNK_SIZE, OcelBuilder, is_initial_time
+from util.tasks import raise_if_cancelled
+from util.types import PathLike
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+READ_SIZE = 1 << 20
+PROGRESS_INTERVAL = 10_000
+
+
+def read_ocel2_json(
+    source: PathLike | IO[bytes],
+    progress: Optional[ProgressCallback] = None,
+    stop_event: Optional[threading.Event] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> OCEL:
+    """Reads an OCEL 2.0 JSON file into a pm4py OCEL object. Gzip-compressed files are detected automatically.
+
+    The `objects` and `events` arrays are decoded one element at a time, so only a single element exists as Python dict at any point.
+    All other top-level keys (type declarations) are decoded as a whole.
+    When passing a `progress` callback, it is called periodically with the fraction of (compressed) bytes read.
+    Setting `stop_event` aborts the import with `TaskCancelled`.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return read_ocel2_json(
+                f, progress=progress, stop_event=stop_event, chunk_size=chunk_size
+            )
+
+    total_size = stream_size(source) if progress is not None else None
+
+    binary: IO[bytes] = source
+    if is_gzip(source):
+        binary = gzip.GzipFile(fileobj=source, mode="rb")  # type: ignore
+    reader = JsonStreamReader(io.TextIOWrapper(binary, encoding="utf-8"))
+
+    builder = OcelBuilder(chunk_size=chunk_size)
+    num_elements = 0
+
+    for key, items in reader.iter_object():
+        if key == "objects":
+            handle = parse_object
+        elif key == "events":
+            handle = parse_event
+        else:
+            if key in ("objectTypes", "eventTypes"):
+                parse_types(reader.read_value(), builder)
+            else:
+                reader.read_value()
+            continue
+
+        for item in items():
+            if isinstance(item, dict):
+                handle(item, builder)
+            num_elements += 1
+            if num_elements % PROGRESS_INTERVAL == 0:
+                raise_if_cancelled(stop_event)
+                if total_size:
+                    progress(min(source.tell() / total_size, 1.0))  # type: ignore
+
+    if progress is not None:
+        progress(1.0)
+
+    return builder.build(stop_event=stop_event)
+
+
+def is_gzip(f: IO[bytes]) -> bool:
+    """Checks for the gzip magic number without consuming any bytes."""
+    if hasattr(f, "peek"):
+        return f.peek(2)[:2] == GZIP_MAGIC  # type: ignore
+    start = f.tell()
+    magic = f.read(2)
+    f.seek(start)
+    return magic == GZIP_MAGIC
+
+
+class JsonStreamReader:
+    """Minimal incremental JSON reader over a text stream.
+    Walks the top-level object and arrays token by token, decoding nested values with `json.JSONDecoder.raw_decode`.
+    """
+
+    def __init__(self, stream: IO[str], read_size: int = READ_SIZE):
+        self._stream = stream
+        self._read_size = read_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Reads the next chunk into the buffer, dropping consumed input. Returns False at the end of the stream."""
+        if self._eof:
+            return False
+        chunk = self._stream.read(self._read_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Returns the next non-whitespace character, without consuming it."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                raise ValueError("Invalid OCEL 2.0 JSON file: Unexpected end of file.")
+
+    def _expect(self, *chars: str) -> str:
+        char = self._peek()
+        if char not in chars:
+            expected = " or ".join(chars)
+            raise ValueError(
+                f"Invalid OCEL 2.0 JSON file: Expected {expected}, found '{char}'."
+            )
+        self._pos += 1
+        return char
+
+    def read_value(self) -> Any:
+        """Decodes the next complete JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise ValueError("Invalid OCEL 2.0 JSON file: Malformed value.")
+            # A number at the end of the buffer might continue in the next chunk
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        """Decodes the elements of the next JSON array one by one."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self._expect(",", "]") == "]":
+                return
+
+    def iter_object(self):
+        """Iterates the keys of the next JSON object.
+        For every key, the caller must consume the value, either via `read_value` or by iterating the returned `iter_array`.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(":")
+            yield key, self.iter_array
+            if self._expect(",", "}") == "}":
+                return
+
+
+def parse_types(types: Any, builder: OcelBuilder):
+    for type_ in types if isinstance(types, list) else []:
+        for attr in type_.get("attributes") or []:
+            name, attribute_type = attr.get("name"), attr.get("type")
+            if name is not None and attribute_type is not None:
+                builder.declare_attribute(name, attribute_type)
+
+
+def parse_object(obj: dict[str, Any], builder: OcelBuilder):
+    oid, otype = obj.get("id"), obj.get("type")
+    if oid is None or otype is None:
+        return
+
+    initial = {}
+    for attr in obj.get("attributes") or []:
+        name, time = attr.get("name"), attr.get("time")
+        if name is None:
+            continue
+        if is_initial_time(time):
+            initial.setdefault(name, attr.get("value"))
+        else:
+            builder.add_object_change(oid, otype, time, name, attr.get("value"))
+    builder.add_object(oid, otype, initial)
+
+    for rel in obj.get("relationships") or []:
+        builder.add_o2o(oid, rel.get("objectId"), rel.get("qualifier"))
+
+
+def parse_event(event: dict[str, Any], builder: OcelBuilder):
+    eid, activity = event.get("id"), event.get("type")
+    if eid is None or activity is None:
+        return
+
+    attributes = {
+        attr["name"]: attr.get("value")
+        for attr in event.get("attributes") or []
+        if attr.get("name") is not None
+    }
+    builder.add_event(eid, activity, event.get("time"), attributes)
+
+    for rel in event.get("relationships") or []:
+        builder.add_e2o(eid, rel.get("objectId"), rel.get("qualifier"))
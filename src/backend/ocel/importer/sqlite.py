@@ -0,0 +1,508 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Collection, Iterator, Optional, Sequence, TypeVar
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.importer.base import (
+    EPOCH,
+    ImportSelection,
+    ProgressCallback,
+    empty_events,
+    empty_object_changes,
+    enrich_e2o,
+    filter_o2o,
+    finalize_events,
+    make_ocel,
+    text_column,
+    timestamp_column,
+)
+from util.sqlite import (
+    SqliteSource,
+    fetch_columns,
+    get_table_columns,
+    open_source,
+    quote_identifier,
+)
+from util.tasks import raise_if_cancelled
+from util.types import PathLike
+
+T = TypeVar("T")
+
+Condition = tuple[str, list[Any]]
+"""SQL condition or subquery with its parameters"""
+
+# Reserved column names of the OCEL 2.0 SQLite format
+SQL_ID = "ocel_id"
+SQL_TYPE = "ocel_type"
+SQL_TYPE_MAP = "ocel_type_map"
+SQL_TIME = "ocel_time"
+SQL_CHANGED_FIELD = "ocel_changed_field"
+
+FLOAT_SQL_TYPES = ("REAL", "FLOA", "DOUB", "NUM")
+
+CANCEL_CHECK_INSTRUCTIONS = 100_000
+"""Number of SQLite VM instructions between checks for cancellation"""
+
+
+def read_ocel2_sqlite(
+    path: PathLike,
+    progress: Optional[ProgressCallback] = None,
+    stop_event: Optional[threading.Event] = None,
+    source: Optional[SqliteSource] = None,
+    selection: Optional[ImportSelection] = None,
+) -> OCEL:
+    """Reads an OCEL 2.0 SQLite file into a pm4py OCEL object.
+
+    Replaces `pm4py.read.read_ocel2_sqlite`. All tables are read with batched cursor fetches
+    directly into typed columns, and relations are enriched with event/object data via positional lookups instead of merges.
+    Tables are read one after another on a single read-only connection: Converting the fetched rows holds the GIL,
+    so reading them on several threads does not speed up the import.
+    The relation tables are read last, after the event and object tables have been assembled.
+    When passing a `progress` callback, it is called with the fraction of tables read.
+    Setting `stop_event` interrupts running queries and aborts the import with `TaskCancelled`.
+    The connection of `source` is used when passed.
+    When passing a `selection`, it is applied within the SQL queries, so only the selected rows are read into memory.
+    """
+    with open_source(path, source) as source:
+        with interruptible(source.conn, stop_event):
+            return _read_ocel2_sqlite(
+                source,
+                progress=progress,
+                stop_event=stop_event,
+                selection=selection,
+            )
+
+
+def _read_ocel2_sqlite(
+    source: SqliteSource,
+    progress: Optional[ProgressCallback],
+    stop_event: Optional[threading.Event],
+    selection: Optional[ImportSelection] = None,
+) -> OCEL:
+    for required in ("event", "object", "event_object", "object_object"):
+        if not source.has_table(required):
+            raise ValueError(
+                f"Invalid OCEL 2.0 SQLite file: Table '{required}' not found."
+            )
+
+    conn = source.conn
+    event_types = read_type_map(conn, "event_map_type")
+    object_types = read_type_map(conn, "object_map_type")
+    queries = SelectionQueries(
+        selection or ImportSelection(), event_types, object_types
+    )
+
+    num_tables = len(queries.event_tables) + len(queries.object_tables) + 3
+    num_read = 0
+
+    def read(fn: Callable[..., T], *args) -> T:
+        nonlocal num_read
+        raise_if_cancelled(stop_event)
+        result = fn(conn, *args)
+        num_read += 1
+        if progress is not None:
+            progress(num_read / num_tables)
+        return result
+
+    events = read_events(
+        [
+            read(read_event_type_table, activity, table, queries.event_condition())
+            for activity, table in queries.event_tables.items()
+        ]
+    )
+    objects, object_changes = build_objects(
+        read(read_object_base, queries.object_condition()),
+        [
+            read(read_object_type_table, otype, table, queries)
+            for otype, table in queries.object_tables.items()
+        ],
+    )
+    relations = build_e2o(read(fetch_e2o, queries.e2o_condition()), events, objects)
+    o2o = build_o2o(read(fetch_o2o, queries.o2o_condition()), objects)
+
+    return make_ocel(
+        events=events,
+        objects=objects,
+        relations=relations,
+        object_changes=object_changes,
+        o2o=o2o,
+    )
+
+
+@contextmanager
+def interruptible(
+    conn: sqlite3.Connection, stop_event: Optional[threading.Event] = None
+) -> Iterator[None]:
+    """Interrupts queries running on `conn` once `stop_event` is set, raising `TaskCancelled` instead of the SQLite error."""
+    if stop_event is None:
+        yield
+        return
+    conn.set_progress_handler(stop_event.is_set, CANCEL_CHECK_INSTRUCTIONS)
+    try:
+        yield
+    except sqlite3.OperationalError:
+        raise_if_cancelled(stop_event)
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+
+
+# ----- Selection ------------------------------------------------------------------------------------------
+# region
+
+
+def and_conditions(*conditions: Condition) -> Condition:
+    sql = " AND ".join(f"({c})" for c, _ in conditions if c)
+    return sql, [param for _, params in conditions for param in params]
+
+
+class SelectionQueries:
+    """Builds the WHERE conditions restricting each table to the rows selected by an `ImportSelection`.
+    Selected event and object IDs are expressed as subqueries, evaluated by SQLite without loading any other rows.
+    """
+
+    def __init__(
+        self,
+        selection: ImportSelection,
+        event_tables: dict[str, str],
+        object_tables: dict[str, str],
+    ):
+        self.selection = selection
+        activities, otypes = selection.activities, selection.object_types
+        self.event_tables = {
+            activity: table
+            for activity, table in event_tables.items()
+            if activities is None or activity in activities
+        }
+        self.object_tables = {
+            otype: table
+            for otype, table in object_tables.items()
+            if otypes is None or otype in otypes
+        }
+
+    def time_condition(self) -> Condition:
+        conditions = []
+        if (start := self.selection.start_timestamp) is not None:
+            conditions.append(
+                (f"julianday({SQL_TIME}) >= julianday(?)", [sql_timestamp(start)])
+            )
+        if (end := self.selection.end_timestamp) is not None:
+            conditions.append(
+                (f"julianday({SQL_TIME}) < julianday(?)", [sql_timestamp(end)])
+            )
+        return and_conditions(*conditions)
+
+    def typed_object_ids(self) -> Optional[Condition]:
+        otypes = self.selection.object_types
+        if otypes is None:
+            return None
+        return (
+            f"SELECT {SQL_ID} FROM object WHERE {SQL_TYPE} IN ({placeholders(otypes)})",
+            sorted(otypes),
+        )
+
+    def event_condition(self) -> Condition:
+        """Condition for the `event_<type>` tables"""
+        conditions = [self.time_condition()]
+        if (typed := self.typed_object_ids()) is not None:
+            typed_sql, typed_params = typed
+            conditions.append(
+                (
+                    f"{SQL_ID} IN (SELECT ocel_event_id FROM event_object"
+                    f" WHERE ocel_object_id IN ({typed_sql}))",
+                    typed_params,
+                )
+            )
+        return and_conditions(*conditions)
+
+    def event_ids(self) -> Optional[Condition]:
+        """Subquery of the selected event IDs, None if all events are selected."""
+        if self.selection.is_empty:
+            return None
+        if not self.event_tables:
+            return "SELECT NULL WHERE 0", []
+        condition, params = self.event_condition()
+        where = f" WHERE {condition}" if condition else ""
+        queries = [
+            f"SELECT {SQL_ID} FROM {quote_identifier(table)}{where}"
+            for table in self.event_tables.values()
+        ]
+        return " UNION ALL ".join(queries), params * len(queries)
+
+    def object_ids(self) -> Optional[Condition]:
+        """Subquery of the selected object IDs, None if all objects are selected."""
+        typed = self.typed_object_ids()
+        if not self.selection.filters_events:
+            return typed
+        events_sql, events_params = self.event_ids()  # type: ignore
+        sql = (
+            "SELECT ocel_object_id FROM event_object"
+            f" WHERE ocel_event_id IN ({events_sql})"
+        )
+        if typed is None:
+            return sql, events_params
+        return f"{sql} AND ocel_object_id IN ({typed[0]})", events_params + typed[1]
+
+    def object_condition(self) -> Condition:
+        """Condition for the `object` table"""
+        return in_condition(SQL_ID, self.object_ids())
+
+    def object_change_condition(self, columns: Collection[str]) -> Condition:
+        """Condition for an `object_<type>` table with the given columns, dropping changes at or after the end of the selection.
+        Tables without `ocel_time` or `ocel_changed_field` only contain initial values, so these are not filtered by time.
+        """
+        conditions = [self.object_condition()]
+        has_changes = SQL_TIME in columns and SQL_CHANGED_FIELD in columns
+        if (end := self.selection.end_timestamp) is not None and has_changes:
+            conditions.append(
+                (
+                    f"{SQL_CHANGED_FIELD} IS NULL"
+                    f" OR julianday({SQL_TIME}) < julianday(?)",
+                    [sql_timestamp(end)],
+                )
+            )
+        return and_conditions(*conditions)
+
+    def e2o_condition(self) -> Condition:
+        return and_conditions(
+            in_condition("ocel_event_id", self.event_ids()),
+            in_condition("ocel_object_id", self.object_ids()),
+        )
+
+    def o2o_condition(self) -> Condition:
+        object_ids = self.object_ids()
+        return and_conditions(
+            in_condition("ocel_source_id", object_ids),
+            in_condition("ocel_target_id", object_ids),
+        )
+
+
+def in_condition(column: str, subquery: Optional[Condition]) -> Condition:
+    if subquery is None:
+        return "", []
+    sql, params = subquery
+    return f"{column} IN ({sql})", params
+
+
+def placeholders(values) -> str:
+    return ", ".join("?" * len(values))
+
+
+def sql_timestamp(ts: pd.Timestamp) -> str:
+    """Formats a UTC timestamp for comparison via `julianday`"""
+    return ts.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+# endregion
+
+# ----- Column conversion ------------------------------------------------------------------------------------------
+# region
+
+
+def typed_column(values: list[Any], sql_type: str) -> pd.Series:
+    """Converts a fetched column to a pandas Series, using the declared SQL type to pick a dtype."""
+    if "INT" in sql_type:
+        try:
+            return pd.Series(np.array(values, dtype=np.int64))
+        except (TypeError, ValueError, OverflowError):
+            pass
+    if "INT" in sql_type or any(t in sql_type for t in FLOAT_SQL_TYPES):
+        try:
+            return pd.Series(np.array(values, dtype=np.float64))
+        except (TypeError, ValueError):
+            pass
+    return pd.Series(values, dtype=object)
+
+
+# endregion
+
+# ----- Tables ------------------------------------------------------------------------------------------
+# region
+
+
+def read_type_map(conn: sqlite3.Connection, table_name: str) -> dict[str, str]:
+    """Reads an `*_map_type` table, mapping each type name to its per-type table name."""
+    prefix = table_name.split("_")[0]
+    cols = fetch_columns(
+        conn,
+        f"SELECT {SQL_TYPE}, {SQL_TYPE_MAP} FROM {quote_identifier(table_name)}",
+    )
+    return {
+        str(name): f"{prefix}_{suffix}"
+        for name, suffix in zip(cols[SQL_TYPE], cols[SQL_TYPE_MAP])
+    }
+
+
+def read_table(
+    conn: sqlite3.Connection,
+    table_name: str,
+    where: str = "",
+    params: Sequence[Any] = (),
+) -> tuple[dict[str, list[Any]], dict[str, str]]:
+    """Reads a whole table column-wise. Returns the columns and their declared SQL types."""
+    sql_types = get_table_columns(conn, table_name)
+    sql = f"SELECT * FROM {quote_identifier(table_name)}"
+    if where:
+        sql += f" WHERE {where}"
+    return fetch_columns(conn, sql, params), sql_types
+
+
+def where_clause(condition: Condition) -> str:
+    return f" WHERE {condition[0]}" if condition[0] else ""
+
+
+def read_event_type_table(
+    conn: sqlite3.Connection,
+    activity: str,
+    table_name: str,
+    condition: Condition = ("", []),
+) -> pd.DataFrame:
+    """Reads the `event_<type>` table of a single activity."""
+    cols, sql_types = read_table(conn, table_name, *condition)
+    n = len(cols.get(SQL_ID, []))
+    data: dict[str, Any] = {
+        "ocel:eid": text_column(cols.pop(SQL_ID, [])),
+        "ocel:timestamp": timestamp_column(cols.pop(SQL_TIME, [None] * n)),
+        "ocel:activity": pd.Series([activity] * n, dtype=object),
+    }
+    for col, values in cols.items():
+        data[col] = typed_column(values, sql_types.get(col, ""))
+    return pd.DataFrame(data)
+
+
+def read_object_type_table(
+    conn: sqlite3.Connection,
+    otype: str,
+    table_name: str,
+    queries: Optional[SelectionQueries] = None,
+) -> pd.DataFrame:
+    """Reads the `object_<type>` table of a single object type, containing initial attribute values and changes.
+    When passing `queries`, only the changes of the selected objects are read (see `SelectionQueries.object_change_condition`).
+    """
+    condition: Condition = ("", [])
+    if queries is not None:
+        columns = get_table_columns(conn, table_name)
+        condition = queries.object_change_condition(columns)
+    cols, sql_types = read_table(conn, table_name, *condition)
+    n = len(cols.get(SQL_ID, []))
+    data: dict[str, Any] = {
+        "ocel:oid": text_column(cols.pop(SQL_ID, [])),
+        "ocel:type": pd.Series([otype] * n, dtype=object),
+        "ocel:timestamp": timestamp_column(cols.pop(SQL_TIME, [None] * n)),
+        "ocel:field": text_column(cols.pop(SQL_CHANGED_FIELD, [None] * n)),
+    }
+    for col, values in cols.items():
+        data[col] = typed_column(values, sql_types.get(col, ""))
+    return pd.DataFrame(data)
+
+
+def read_events(event_tables: list[pd.DataFrame]) -> pd.DataFrame:
+    if not event_tables:
+        return empty_events()
+    return finalize_events(pd.concat(event_tables, ignore_index=True))
+
+
+def read_object_base(
+    conn: sqlite3.Connection, condition: Condition = ("", [])
+) -> pd.DataFrame:
+    """Reads the `object` table, containing the type of each object."""
+    cols = fetch_columns(
+        conn,
+        f"SELECT {SQL_ID}, {SQL_TYPE} FROM object" + where_clause(condition),
+        condition[1],
+    )
+    objects = pd.DataFrame(
+        {
+            "ocel:oid": text_column(cols[SQL_ID]),
+            "ocel:type": text_column(cols[SQL_TYPE]),
+        }
+    )
+    return objects[objects["ocel:oid"].notna()].drop_duplicates(subset="ocel:oid")
+
+
+def build_objects(
+    objects: pd.DataFrame, object_tables: list[pd.DataFrame]
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Assembles the objects table (with initial attribute values) and the object_changes table."""
+    initial_tables, change_tables = [], []
+    for table in object_tables:
+        is_change = table["ocel:field"].notna() & (table["ocel:timestamp"] > EPOCH)
+        initial_tables.append(
+            table[~is_change]
+            .drop(columns=["ocel:type", "ocel:timestamp", "ocel:field"])
+            .drop_duplicates(subset="ocel:oid")
+        )
+        change_tables.append(table[is_change])
+
+    if initial_tables:
+        initial = pd.concat(initial_tables, ignore_index=True).drop_duplicates(
+            subset="ocel:oid"
+        )
+        objects = objects.join(initial.set_index("ocel:oid"), on="ocel:oid")
+    objects = objects.reset_index(drop=True)
+
+    if change_tables:
+        object_changes = pd.concat(change_tables, ignore_index=True)
+        object_changes = object_changes[
+            object_changes["ocel:oid"].isin(objects["ocel:oid"])
+        ].sort_values("ocel:timestamp", kind="stable", ignore_index=True)
+    else:
+        object_changes = empty_object_changes()
+    return objects, object_changes
+
+
+def fetch_e2o(
+    conn: sqlite3.Connection, condition: Condition = ("", [])
+) -> dict[str, list[Any]]:
+    return fetch_columns(
+        conn,
+        "SELECT ocel_event_id, ocel_object_id, ocel_qualifier FROM event_object"
+        + where_clause(condition),
+        condition[1],
+    )
+
+
+def build_e2o(
+    cols: dict[str, list[Any]], events: pd.DataFrame, objects: pd.DataFrame
+) -> pd.DataFrame:
+    """Builds the E2O relations, enriched with activity, timestamp and object type.
+    Relations referencing unknown events or objects are dropped."""
+    return enrich_e2o(
+        eids=text_column(cols["ocel_event_id"]),
+        oids=text_column(cols["ocel_object_id"]),
+        qualifiers=text_column(cols["ocel_qualifier"]),
+        events=events,
+        objects=objects,
+    )
+
+
+def fetch_o2o(
+    conn: sqlite3.Connection, condition: Condition = ("", [])
+) -> dict[str, list[Any]]:
+    return fetch_columns(
+        conn,
+        "SELECT ocel_source_id, ocel_target_id, ocel_qualifier FROM object_object"
+        + where_clause(condition),
+        condition[1],
+    )
+
+
+def build_o2o(cols: dict[str, list[Any]], objects: pd.DataFrame) -> pd.DataFrame:
+    """Builds the O2O relations. Relations referencing unknown objects are dropped."""
+    o2o = pd.DataFrame(
+        {
+            "ocel:oid": text_column(cols["ocel_source_id"]),
+            "ocel:oid_2": text_column(cols["ocel_target_id"]),
+            "ocel:qualifier": text_column(cols["ocel_qualifier"]),
+        }
+    )
+    return filter_o2o(o2o, objects)
+
+
+# endregion
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+import threading
+import xml.etree.ElementTree as ET
+from typing import IO, Optional
+
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.importer.base import ProgressCallback, stream_size
+from ocel.importer.builder import CHUNK_SIZE, OcelBuilder, is_initial_time
+from util.tasks import raise_if_cancelled
+from util.types import PathLike
+
+PROGRESS_INTERVAL = 10_000
+
+
+def read_ocel2_xml(
+    source: PathLike | IO[bytes],
+    progress: Optional[ProgressCallback] = None,
+    stop_event: Optional[threading.Event] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> OCEL:
+    """Reads an OCEL 2.0 XML file into a pm4py OCEL object.
+
+    Replaces `pm4py.read.read_ocel2_xml`, which builds a DOM of the whole document.
+    Here, the document is parsed incrementally, and every object/event element is discarded right after
+    its data has been added to the (chunked) columns of the resulting tables.
+    When passing a `progress` callback, it is called periodically with the fraction of bytes read.
+    Setting `stop_event` aborts the import with `TaskCancelled`.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return read_ocel2_xml(
+                f, progress=progress, stop_event=stop_event, chunk_size=chunk_size
+            )
+
+    total_size = stream_size(source) if progress is not None else None
+
+    builder = OcelBuilder(chunk_size=chunk_size)
+    depth = 0
+    section: str | None = None
+    container: ET.Element | None = None
+    num_elements = 0
+
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        tag = local_name(elem.tag)
+        if event == "start":
+            depth += 1
+            if depth == 2:
+                section = tag
+                container = elem
+            continue
+
+        depth -= 1
+        if depth != 2:
+            if depth == 1:
+                section, container = None, None
+            continue
+
+        # Direct child of a top-level section has been parsed completely
+        if section == "objects" and tag == "object":
+            parse_object(elem, builder)
+        elif section == "events" and tag == "event":
+            parse_event(elem, builder)
+        elif section in ("object-types", "event-types"):
+            parse_type(elem, builder)
+
+        # Free the parsed element. Elements that follow are still referenced by the parser.
+        elem.clear()
+        if container is not None:
+            del container[:]
+
+        num_elements += 1
+        if num_elements % PROGRESS_INTERVAL == 0:
+            raise_if_cancelled(stop_event)
+            if total_size:
+                progress(min(source.tell() / total_size, 1.0))  # type: ignore
+
+    if progress is not None:
+        progress(1.0)
+
+    return builder.build(stop_event=stop_event)
+
+
+def local_name(tag: str) -> str:
+    """Strips the namespace from an element tag."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def children(elem: ET.Element, tag: str) -> list[ET.Element]:
+    """Returns the children of the (first) sub-element with the given tag."""
+    for child in elem:
+        if local_name(child.tag) == tag:
+            return list(child)
+    return []
+
+
+def parse_type(elem: ET.Element, builder: OcelBuilder):
+    for attr in children(elem, "attributes"):
+        name, attribute_type = attr.get("name"), attr.get("type")
+        if name is not None and attribute_type is not None:
+            builder.declare_attribute(name, attribute_type)
+
+
+def parse_object(elem: ET.Element, builder: OcelBuilder):
+    oid, otype = elem.get("id"), elem.get("type")
+    if oid is None or otype is None:
+        return
+
+    initial = {}
+    for attr in children(elem, "attributes"):
+        name, time = attr.get("name"), attr.get("time")
+        if name is None:
+            continue
+        if is_initial_time(time):
+            initial.setdefault(name, attr.text)
+        else:
+            builder.add_object_change(oid, otype, time, name, attr.text)
+    builder.add_object(oid, otype, initial)
+
+    for rel in children(elem, "objects"):
+        builder.add_o2o(oid, rel.get("object-id"), rel.get("qualifier"))  # type: ignore
+
+
+def parse_event(elem: ET.Element, builder: OcelBuilder):
+    eid, activity = elem.get("id"), elem.get("type")
+    if eid is None or activity is None:
+        return
+
+    attributes = {
+        attr.get("name"): attr.text
+        for attr in children(elem, "attributes")
+        if attr.get("name") is not None
+    }
+    builder.add_event(eid, activity, elem.get("time"), attributes)  # type: ignore
+
+    for rel in children(elem, "objects"):
+        builder.add_e2o(eid, rel.get("object-id"), rel.get("qualifier"))  # type: ignore
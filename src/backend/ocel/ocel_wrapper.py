@@ -1,40 +1,80 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import functools
 import platform
 import sys
-from uuid import uuid4
+import threading
 import warnings
 from copy import deepcopy
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from threading import Lock
-from typing import Any, Iterable, Literal, Optional
+from typing import IO, Any, Callable, Iterable, Iterator, Literal, Optional
+from uuid import uuid4
 
 import networkx as nx
 import numpy as np
 import pandas as pd
 import pm4py
-from cachetools import LRUCache
+from cachetools.keys import hashkey
 from pm4py.objects.ocel.obj import OCEL
 
+from api.config import config
 from api.extensions import (
     OcelExtension,
     get_registered_extensions,
 )
 from api.logger import logger
+from filters import FilterConfig, FilterResult, apply_filters
+from filters.core import compute_combined_masks, compute_filter_mask, count_remaining
+from filters.planner import RestrictedMaskFunction
 from lib.attributes import (
     AttributeSummary,
     summarize_event_attributes,
     summarize_object_attributes,
 )
 from lib.relations import summarize_e2o_counts, summarize_o2o_counts
-from ocel.utils import add_object_order, filter_relations
-from util.cache import instance_lru_cache
-from util.pandas import mirror_dataframe, mmmm
+from ocel.attribute_timeline import AttributeTimeline, attribute_timeline
+from ocel.entity_ids import EntityIds, event_ids, object_ids
+from ocel.exporter import (
+    iter_ocel2_json,
+    iter_ocel2_xml,
+    write_ocel2_json,
+    write_ocel2_sqlite,
+    write_ocel2_xml,
+)
+from ocel.importer import (
+    ImportSelection,
+    apply_selection,
+    read_ocel2_json,
+    read_ocel2_sqlite,
+    read_ocel2_xml,
+)
+from ocel.importer.base import ProgressCallback
+from ocel.relation_index import E2OIndex, O2OIndex, e2o_index, o2o_index
+from ocel.snapshot import snapshot_cache
+from ocel.time_index import TimeBound, TimeIndex, event_time_index
+from ocel.utils import (
+    add_object_order,
+    clone_pm4py_ocel,
+    filter_relations,
+    ocel_summary,
+    uncategorize_ocel,
+)
+from util.cache import (
+    ByteBudgetCache,
+    GlobalCacheBudget,
+    ValueTooLarge,
+    instance_lru_cache,
+)
+from util.hash import file_hash, filters_hash, mask_hash
+from util.pandas import mirror_dataframe, mmmm, observed_value_counts
+from util.sqlite import SqliteSource, open_source
+from util.tasks import raise_if_cancelled
 from util.types import PathLike
 
-from filters import FilterConfig, apply_filters
+cache_budget = GlobalCacheBudget(maxsize=config.CACHE_MAX_SIZE_MB * 2**20)
+"""Memory budget shared by the caches of all OCELWrapper instances"""
 
 
 class OCELWrapper:
@@ -44,20 +84,25 @@ class OCELWrapper:
         self.ocel = ocel
         # Metadata, to be set manually after creating the instance
         self.meta: dict[str, Any] = {}
-        self._cache_info = {}
 
         # Used to distinguish multiple ocels with the same id but one is filtered form
         self.state_id = str(uuid4())
 
-        # extensions
+        # extensions, imported on first access
         self._extensions: dict[str, OcelExtension] = {}
+        self._extension_loaders: dict[str, Callable[[], OcelExtension]] = {}
+        self._extensions_lock = threading.Lock()
 
         self._init_cache()
 
     def _init_cache(self):
-        # Instance-level cache object (using cachetools)
-        self.cache = LRUCache(maxsize=128)
-        self.cache_lock = Lock()
+        # Instance-level cache object (using cachetools), limited by memory size
+        self.cache_lock = threading.Lock()
+        self.cache = ByteBudgetCache(
+            maxsize=config.OCEL_CACHE_MAX_SIZE_MB * 2**20,
+            lock=self.cache_lock,
+            budget=cache_budget,
+        )
 
     @property
     def id(self) -> str:
@@ -94,7 +139,7 @@ class OCELWrapper:
     @property
     @instance_lru_cache()
     def activity_counts(self) -> pd.Series:
-        return self.ocel.events["ocel:activity"].value_counts()
+        return observed_value_counts(self.ocel.events["ocel:activity"])
 
     @property
     @instance_lru_cache()
@@ -109,7 +154,7 @@ class OCELWrapper:
     @property
     @instance_lru_cache()
     def otype_counts(self) -> pd.Series:
-        return self.ocel.objects["ocel:type"].value_counts()
+        return observed_value_counts(self.ocel.objects["ocel:type"])
 
     @property
     @instance_lru_cache()
@@ -139,6 +184,75 @@ class OCELWrapper:
         """Alias for events_with_activities"""
         return self.events_with_activities
 
+    @property
+    def event_ids(self) -> EntityIds:
+        """Dictionary assigning each event a dense integer code. Cached in addition to the `ocel:eid` column, which it does not replace."""
+        return event_ids(self.ocel)
+
+    @property
+    def object_ids(self) -> EntityIds:
+        """Dictionary assigning each object a dense integer code. Cached in addition to the `ocel:oid` column, which it does not replace."""
+        return object_ids(self.ocel)
+
+    @property
+    def e2o_index(self) -> E2OIndex:
+        """CSR adjacency of the E2O relations in both directions, built once per OCEL"""
+        return e2o_index(self.ocel)
+
+    @property
+    @instance_lru_cache()
+    def relation_codes(self) -> pd.DataFrame:
+        """Event and object codes of the E2O relations, indexed like `relations`.
+        A computation aid held next to the string ID columns of `relations`, adding to the memory of the OCEL.
+        """
+        index = self.e2o_index
+        return pd.DataFrame(
+            {
+                "ocel:eid": index.relation_event_codes,
+                "ocel:oid": index.relation_object_codes,
+            },
+            index=self.ocel.relations.index,
+        )
+
+    @property
+    def o2o_index(self) -> O2OIndex:
+        """CSR adjacency of the O2O relations in both directions, built once per OCEL"""
+        return o2o_index(self.ocel)
+
+    @property
+    @instance_lru_cache()
+    def o2o_codes(self) -> pd.DataFrame:
+        """O2O relationships with object types, with object codes instead of IDs"""
+        relations = self.o2o_index.relation_codes("source")
+        return relations.rename(
+            columns={
+                "source": "ocel:oid_1",
+                "target": "ocel:oid_2",
+                "qualifier": "ocel:qualifier",
+                "source_type": "ocel:type_1",
+                "target_type": "ocel:type_2",
+            }
+        )[["ocel:oid_1", "ocel:oid_2", "ocel:qualifier", "ocel:type_1", "ocel:type_2"]]
+
+    @property
+    def attribute_timeline(self) -> AttributeTimeline:
+        """Time-sorted object attribute values from the object changes, built once per OCEL"""
+        return attribute_timeline(self.ocel)
+
+    @property
+    def event_time_index(self) -> TimeIndex:
+        """Sorted index over the event timestamps, built once per OCEL"""
+        return event_time_index(self.ocel)
+
+    def events_between(
+        self, start: TimeBound = None, end: TimeBound = None
+    ) -> pd.DataFrame:
+        """Returns the events selected by `event_time_index.mask(start, end)`, in their original order.
+        Both bounds are inclusive, and naive bounds are interpreted as UTC. A missing bound leaves that side open.
+        Events without a timestamp are only returned when both bounds are missing."""
+        rows = np.sort(self.event_time_index.rows(start, end))
+        return self.ocel.events.iloc[rows]
+
     def has_object_types(self, otypes: Iterable[str]) -> bool:
         return all(ot in self.otypes for ot in otypes)
 
@@ -152,13 +266,68 @@ class OCELWrapper:
 
     def apply_filter(self, filters: list[FilterConfig]) -> OCELWrapper:
         filtered_ocel = OCELWrapper(
-            apply_filters(self.ocel, filters=filters),
+            apply_filters(
+                self.ocel,
+                filters=filters,
+                compute_mask=self.filter_mask,
+                compute_restricted=self.restricted_filter_mask,
+            ),
             id=self.id,
         )
         filtered_ocel.meta = self.meta
 
         return filtered_ocel
 
+    def _cached_mask(
+        self, key: tuple, compute: Callable[[], FilterResult]
+    ) -> FilterResult:
+        with self.cache_lock:
+            result = self.cache.get(key)
+        if result is None:
+            result = compute()
+            with self.cache_lock:
+                try:
+                    self.cache[key] = result
+                except ValueTooLarge:
+                    pass  # Masks exceeding the whole cache budget are recomputed
+        return result
+
+    def filter_mask(self, config: FilterConfig) -> FilterResult:
+        """Returns the masks of a single filter. Masks are cached by the hash of the filter config,
+        so changing one filter of a pipeline only recomputes the masks of that filter."""
+        key = hashkey("filter_mask", self.state_id, filters_hash([config]))
+        return self._cached_mask(key, lambda: compute_filter_mask(self.ocel, config))
+
+    def restricted_filter_mask(
+        self,
+        evaluate: RestrictedMaskFunction,
+        configs: list[FilterConfig],
+        rows: np.ndarray,
+    ) -> FilterResult:
+        """Returns the masks of merged attribute filters, evaluated on the given rows only.
+        Masks are cached by the hash of the filter configs and the rows, so they are reused as long as
+        the filters evaluated before them are unchanged."""
+        key = hashkey(
+            "restricted_filter_mask",
+            self.state_id,
+            filters_hash(configs),
+            mask_hash(rows),
+        )
+        return self._cached_mask(key, lambda: evaluate(self.ocel, configs, rows))
+
+    def filter_preview(
+        self, filters: list[FilterConfig]
+    ) -> tuple[pd.Series, pd.Series]:
+        """Returns the number of events per activity and objects per object type that remain after applying the filters,
+        computed from the (cached) filter masks without building the filtered OCEL."""
+        masks = compute_combined_masks(
+            self.ocel,
+            filters,
+            compute_mask=self.filter_mask,
+            compute_restricted=self.restricted_filter_mask,
+        )
+        return count_remaining(self.ocel, masks)
+
     # endregion
     # ----- PROCESS DISCOVERY ------------------------------------------------------------------------------------------
     # region
@@ -187,7 +356,9 @@ class OCELWrapper:
 
         # Discover OCPN
         # TODO might use own filter function
-        filtered_ocel = pm4py.filter_ocel_object_types(self.ocel, sorted_otypes)
+        filtered_ocel = pm4py.filter_ocel_object_types(
+            uncategorize_ocel(self.ocel), sorted_otypes
+        )
         ocpn = pm4py.discover_oc_petri_net(
             filtered_ocel,
             inductive_miner_variant=inductive_miner_variant,
@@ -200,7 +371,9 @@ class OCELWrapper:
     def flatten(self, otype: str) -> pd.DataFrame:
         if otype not in self.otypes:
             raise ValueError(f"Object type '{otype}' not found")
-        return pm4py.ocel.ocel_flattening(ocel=self.ocel, object_type=otype)
+        return pm4py.ocel.ocel_flattening(
+            ocel=uncategorize_ocel(self.ocel), object_type=otype
+        )
 
     @instance_lru_cache()
     def directly_follows_graph(self, otype: str) -> dict[tuple[str, str], int]:
@@ -284,24 +457,35 @@ class OCELWrapper:
         if isempty(otype2_filter) or isempty(oid2_filter):
             raise ValueError("Empty filter in object_relations (otype2/oid2)")
 
+        # Work on event/object codes, IDs are materialized for the result only
+        object_ids = self.object_ids
+        oid1_codes = object_ids.encode_set(oid1_filter) if oid1_filter else None
+        oid2_codes = object_ids.encode_set(oid2_filter) if oid2_filter else None
+
         if include_interactions:
-            relations = self.ocel.relations[["ocel:eid", "ocel:oid", "ocel:type"]]
+            relations = pd.DataFrame(
+                {
+                    "ocel:eid": self.relation_codes["ocel:eid"],
+                    "ocel:oid": self.relation_codes["ocel:oid"],
+                    "ocel:type": self.ocel.relations["ocel:type"],
+                }
+            )
 
             # Init relations1 (left side)
             if not otype1_filter_all:
                 relations1 = relations[relations["ocel:type"].isin(otype1_filter)]  # type: ignore
             else:
                 relations1 = relations
-            if oid1_filter is not None:
-                relations1 = relations1[relations1["ocel:oid"].isin(oid1_filter)]  # type: ignore
+            if oid1_codes is not None:
+                relations1 = relations1[relations1["ocel:oid"].isin(oid1_codes)]  # type: ignore
 
             # Init relations2 (right side)
             if not otype2_filter_all:
                 relations2 = relations[relations["ocel:type"].isin(otype2_filter)]  # type: ignore
             else:
                 relations2 = relations
-            if oid2_filter is not None:
-                relations2 = relations2[relations2["ocel:oid"].isin(oid2_filter)]  # type: ignore
+            if oid2_codes is not None:
+                relations2 = relations2[relations2["ocel:oid"].isin(oid2_codes)]  # type: ignore
 
             assert otype1_filter and otype2_filter
             relations1 = relations1.drop_duplicates()  # type: ignore
@@ -325,17 +509,18 @@ class OCELWrapper:
 
         # Add O2O relations
         if include_o2o:
-            if not self.o2o.empty:
+            o2o_codes = self.o2o_codes
+            if not o2o_codes.empty:
                 # Mirror O2O relations
-                o2o = pd.concat([self.o2o, mirror_dataframe(self.o2o)])
+                o2o = pd.concat([o2o_codes, mirror_dataframe(o2o_codes)])
             else:
                 # Empty O2O but need column names
-                o2o = self.o2o.copy()
+                o2o = o2o_codes.copy()
 
             # Ignore self-loops, but warn if they exist:
-            if (self.o2o["ocel:oid_1"] == self.o2o["ocel:oid_2"]).any():
+            if (o2o_codes["ocel:oid_1"] == o2o_codes["ocel:oid_2"]).any():
                 num_self_loops = (
-                    self.o2o["ocel:oid_1"] == self.o2o["ocel:oid_2"]
+                    o2o_codes["ocel:oid_1"] == o2o_codes["ocel:oid_2"]
                 ).sum()
                 logger.warning(
                     f"object_relations currently not supporting O2O self-loops. Dropping {num_self_loops} relations."
@@ -351,10 +536,10 @@ class OCELWrapper:
                 & o2o["ocel:type_2"].isin(otype2_filter)  # type: ignore
             ]
             # Apply oid filters
-            if oid1_filter is not None:
-                o2o = o2o[o2o["ocel:oid_1"].isin(oid1_filter)]  # type: ignore
-            if oid2_filter is not None:
-                o2o = o2o[o2o["ocel:oid_2"].isin(oid2_filter)]  # type: ignore
+            if oid1_codes is not None:
+                o2o = o2o[o2o["ocel:oid_1"].isin(oid1_codes)]  # type: ignore
+            if oid2_codes is not None:
+                o2o = o2o[o2o["ocel:oid_2"].isin(oid2_codes)]  # type: ignore
 
             if include_o2o_qualifiers:
                 o2o.rename(  # type: ignore
@@ -420,15 +605,15 @@ class OCELWrapper:
                     1,
                 )
 
-                oids1 = oid1_filter or set(
-                    self.objects[self.objects["ocel:type"].isin(otype1_filter)][  # type: ignore
-                        "ocel:oid"
-                    ]
+                oids1 = (
+                    oid1_codes
+                    if oid1_codes is not None
+                    else object_ids.codes_of_types(otype1_filter)
                 )
-                oids2 = oid2_filter or set(
-                    self.objects[self.objects["ocel:type"].isin(otype2_filter)][  # type: ignore
-                        "ocel:oid"
-                    ]
+                oids2 = (
+                    oid2_codes
+                    if oid2_codes is not None
+                    else object_ids.codes_of_types(otype2_filter)
                 )
                 side_filter1_oid = np.where(
                     og["ocel:oid_1"].isin(oids2),  # type: ignore
@@ -488,6 +673,11 @@ class OCELWrapper:
             if not include_frequencies:
                 og.drop(columns=["ocel:eid"], inplace=True, errors="ignore")  # type: ignore
 
+        og["ocel:oid_1"] = object_ids.decode(og["ocel:oid_1"])  # type: ignore
+        og["ocel:oid_2"] = object_ids.decode(og["ocel:oid_2"])  # type: ignore
+        if "ocel:eid" in og.columns:
+            og["ocel:eid"] = self.event_ids.decode(og["ocel:eid"])  # type: ignore
+
         assert name1 is None or name2 is None or name1 != name2
         if name1 is not None:
             og.rename(  # type: ignore
@@ -569,8 +759,12 @@ class OCELWrapper:
     @instance_lru_cache()
     def o2o(self):
         """O2O relationships, with object types"""
-        return self.join_otypes(
-            self.ocel.o2o.rename(columns={"ocel:oid": "ocel:oid_1"})
+        o2o_codes, ids = self.o2o_codes, self.object_ids.ids
+        return o2o_codes.assign(
+            **{
+                "ocel:oid_1": ids[o2o_codes["ocel:oid_1"].to_numpy()],
+                "ocel:oid_2": ids[o2o_codes["ocel:oid_2"].to_numpy()],
+            }
         )
 
     @instance_lru_cache()
@@ -638,17 +832,23 @@ class OCELWrapper:
     @property
     @instance_lru_cache()
     def num_events_per_object(self):
-        return self.join_otype(
-            self.ocel.relations.groupby("ocel:oid")["ocel:eid"]
-            .count()
-            .rename("num_events")
-            .reset_index()
+        object_ids = self.object_ids
+        counts = self.e2o_index.events_of_objects.degrees()
+        codes = np.flatnonzero(counts)
+        return pd.DataFrame(
+            {
+                "ocel:oid": object_ids.ids[codes],
+                "num_events": counts[codes],
+                "ocel:type": object_ids.types[codes],
+            }
         )
 
     @property
     @instance_lru_cache()
     def median_num_events_per_otype(self):
-        return self.num_events_per_object.groupby("ocel:type")["num_events"].median()
+        return self.num_events_per_object.groupby("ocel:type", observed=True)[
+            "num_events"
+        ].median()
 
     @instance_lru_cache()
     def sort_otypes(self) -> list[str]:
@@ -677,29 +877,56 @@ class OCELWrapper:
         if include_qualifiers:
             columns.append("ocel:qualifier")
         relations = self.filter_relations(otypes=otypes, copy=False)
+        codes = self.relation_codes.loc[relations.index]
+        oid_codes = codes["ocel:oid"].to_numpy(dtype=np.int64)
+        # Unique key of each (event, object) pair
+        pairs = oid_codes * len(self.event_ids) + codes["ocel:eid"].to_numpy()
         relations = relations[columns]
         if not include_qualifiers:
-            relations = relations.drop_duplicates(subset=["ocel:eid", "ocel:oid"])
+            keep = ~pd.Series(pairs).duplicated().to_numpy()
+            relations, oid_codes = relations[keep], oid_codes[keep]
         elif not self.are_qualifiers_unique():
             # An e2o relation might be present multiple times because of multiple qualifiers.
             # Group these relations and retain the qualifiers in a set.
             # (Otherwise, lifecycle indices do not make sense - an event would be following itself.)
-            e2o = relations.groupby(["ocel:eid", "ocel:oid"])
-            relations = e2o[["ocel:activity", "ocel:timestamp", "ocel:type"]].first()
-            relations["ocel:qualifiers"] = e2o["ocel:qualifier"].agg(set)
-            relations = relations.reset_index()
+            e2o = relations.assign(**{"@@oid_code": oid_codes}).groupby(
+                pairs, sort=False
+            )
+            qualifiers = e2o["ocel:qualifier"].agg(set)
+            relations = e2o[
+                [
+                    "ocel:eid",
+                    "ocel:activity",
+                    "ocel:timestamp",
+                    "ocel:oid",
+                    "ocel:type",
+                    "@@oid_code",
+                ]
+            ].first()
+            relations["ocel:qualifiers"] = qualifiers
+            relations = relations.reset_index(drop=True)
+            oid_codes = relations.pop("@@oid_code").to_numpy()
         else:
             relations = relations.copy()
             relations["ocel:qualifiers"] = relations["ocel:qualifier"].apply(
                 lambda q: {q}
             )
             relations.drop(columns=["ocel:qualifier"], inplace=True)
-        # Compute lifecycle indices
-        relations["ocel:lifecycle_index"] = (
-            relations.sort_values(["ocel:oid", "ocel:timestamp"])
-            .groupby("ocel:oid")
-            .cumcount()
+        # Compute lifecycle indices, ordering the relations by object and timestamp
+        timestamps = relations["ocel:timestamp"].to_numpy(dtype="datetime64[ns]")
+        # Missing timestamps are sorted last
+        sort_keys = np.where(
+            np.isnat(timestamps), np.iinfo(np.int64).max, timestamps.view(np.int64)
         )
+        order = np.lexsort((sort_keys, oid_codes))
+        sorted_oids = oid_codes[order]
+        positions = np.arange(len(order))
+        is_first = np.ones(len(order), dtype=bool)
+        is_first[1:] = sorted_oids[1:] != sorted_oids[:-1]
+        first_positions = np.maximum.accumulate(np.where(is_first, positions, 0))
+        lifecycle_indices = np.empty(len(order), dtype=np.int64)
+        lifecycle_indices[order] = positions - first_positions
+        relations["ocel:lifecycle_index"] = lifecycle_indices
         return relations
 
     # endregion
@@ -711,14 +938,16 @@ class OCELWrapper:
     @instance_lru_cache()
     def type_relations(self) -> pd.DataFrame:
         x: pd.Series = self.ocel.relations.groupby(
-            ["ocel:activity", "ocel:type", "ocel:qualifier"]
+            ["ocel:activity", "ocel:type", "ocel:qualifier"], observed=True
         ).size()  # type: ignore
         return x.reset_index(name="freq")
 
     @property
     @instance_lru_cache()
     def type_relation_frequencies(self) -> pd.Series:
-        return self.type_relations.groupby(["ocel:activity", "ocel:type"])["freq"].sum()
+        return self.type_relations.groupby(
+            ["ocel:activity", "ocel:type"], observed=True
+        )["freq"].sum()
 
     @property
     @instance_lru_cache()
@@ -727,11 +956,15 @@ class OCELWrapper:
         # TODO nonzero does not work here. Due to the groupby calls, there are no zero entries, leading to nonzero being either 1 or NaN.
         type_relations: pd.DataFrame = (
             self.relations.groupby(
-                ["ocel:eid", "ocel:activity", "ocel:type"], as_index=False
+                ["ocel:eid", "ocel:activity", "ocel:type"],
+                as_index=False,
+                observed=True,
             )
             .size()
             .rename(columns={"size": "num_objects"})  # type: ignore
-            .groupby(["ocel:activity", "ocel:type"], as_index=False)["num_objects"]
+            .groupby(["ocel:activity", "ocel:type"], as_index=False, observed=True)[
+                "num_objects"
+            ]
             .pipe(mmmm, nonzero=False, dtype=int)  # type: ignore
         )
         type_relations["always"] = np.where(
@@ -759,14 +992,18 @@ class OCELWrapper:
         """
         event_otypes = (
             self.relations.groupby(
-                ["ocel:eid", "ocel:type", "ocel:qualifier"], as_index=False
+                ["ocel:eid", "ocel:type", "ocel:qualifier"],
+                as_index=False,
+                observed=True,
             )
             .agg({"ocel:oid": "size", "ocel:activity": "first"})
             .rename(columns={"ocel:oid": "num_objs"})
         )
         act_otype_counts = (
             event_otypes.groupby(
-                ["ocel:activity", "ocel:type", "ocel:qualifier"], as_index=False
+                ["ocel:activity", "ocel:type", "ocel:qualifier"],
+                as_index=False,
+                observed=True,
             )["num_objs"]
             .agg(["min", "max", "mean", np.count_nonzero])
             .rename(columns={"count_nonzero": "nonzero_abs"})
@@ -791,7 +1028,7 @@ class OCELWrapper:
 
         # Unique without qualifier filtering (sum over qualifiers of min/max/mean)
         rel_stats_overall = self.objects_per_activity.groupby(
-            ["ocel:activity", "ocel:type"], as_index=False
+            ["ocel:activity", "ocel:type"], as_index=False, observed=True
         )[["min", "max", "nonzero_rel"]].agg("sum")
         rel_stats_overall.insert(2, "ocel:qualifier", None)
 
@@ -857,7 +1094,10 @@ class OCELWrapper:
     def are_qualifiers_unique(self) -> bool:
         """Returns true iff e2o qualifiers are uniquely determined by activity and object type."""
         return (
-            self.type_relations.groupby(["ocel:activity", "ocel:type"]).size() == 1
+            self.type_relations.groupby(
+                ["ocel:activity", "ocel:type"], observed=True
+            ).size()
+            == 1
         ).all()  # type: ignore
 
     # endregion
@@ -868,7 +1108,17 @@ class OCELWrapper:
         self, df: pd.DataFrame, col_oid: str = "ocel:oid", col_otype: str = "ocel:type"
     ) -> pd.DataFrame:
         """Enriches a DataFrame containing an object ID column with their object types."""
-        return df.join(self.obj_otypes.rename(col_otype), on=col_oid)
+        return df.assign(**{col_otype: self._otypes_of(df[col_oid])})
+
+    def _otypes_of(self, oids: pd.Series) -> pd.Series:
+        codes = pd.Series(self.object_ids.encode(oids), index=oids.index)
+        valid = codes >= 0
+        otypes = pd.Series(
+            self.object_ids.decode_types(codes.where(valid, 0)),
+            index=oids.index,
+            dtype=object,
+        )
+        return otypes.where(valid, np.nan) if not valid.all() else otypes
 
     def join_otypes(
         self,
@@ -879,9 +1129,12 @@ class OCELWrapper:
         col_otype_2: str = "ocel:type_2",
     ) -> pd.DataFrame:
         """Enriches a DataFrame containing two object ID columns with their object types."""
-        df = df.join(self.obj_otypes.rename(col_otype_1), on=col_oid_1)
-        df = df.join(self.obj_otypes.rename(col_otype_2), on=col_oid_2)
-        return df
+        return df.assign(
+            **{
+                col_otype_1: self._otypes_of(df[col_oid_1]),
+                col_otype_2: self._otypes_of(df[col_oid_2]),
+            }
+        )
 
     def join_activity(
         self,
@@ -917,17 +1170,17 @@ class OCELWrapper:
         return str(self)
 
     def __deepcopy__(self, memo: dict[int, Any]):
-        # TODO revisit this. Are the underlying DataFrames mutable? If not, might optimize this
-        pm4py_ocel = deepcopy(self.ocel, memo)
+        # The DataFrames are copied lazily (Copy-on-Write), see clone_pm4py_ocel
+        pm4py_ocel = clone_pm4py_ocel(self.ocel)
         ocel = OCELWrapper(ocel=pm4py_ocel, id=str(uuid4()))
         ocel.meta = deepcopy(self.meta, memo)
         return ocel
 
     @property
-    def cache_size(self):
-        return {
-            name: cache_info.currsize for name, cache_info in self._cache_info.items()
-        }
+    def cache_size(self) -> dict[str, int]:
+        """Memory used by the cached results of each method, in bytes"""
+        with self.cache_lock:
+            return self.cache.size_by_method()
 
     # endregion
 
@@ -962,7 +1215,8 @@ class OCELWrapper:
 
     # ----- EXTENTIONS ------------------------------------------------------------------------------------------
     # region
-    def load_extension(self):
+    def load_extension(self, source: Optional[SqliteSource] = None):
+        """Detects the extensions contained in the OCEL file. Their data is only imported on first access (`get_extension`)."""
         path = self.meta.get("path")
 
         if not path:
@@ -971,23 +1225,41 @@ class OCELWrapper:
 
         path = Path(path)
 
-        for ext_cls in get_registered_extensions():
-            try:
-                if (
-                    path.suffix in ext_cls.supported_extensions
-                    and ext_cls.has_extension(path)
-                ):
-                    print("test")
-                    self._extensions[ext_cls.name] = ext_cls.import_extension(path)
-            except Exception as e:
-                logger.warning(f"Extension load failed for '{ext_cls.name}': {e}")
+        with open_source(path, source) as source:
+            for ext_cls in get_registered_extensions():
+                try:
+                    if path.suffix in ext_cls.supported_extensions and (
+                        ext_cls.has_extension(path, source=source)
+                    ):
+                        self._extension_loaders[ext_cls.name] = functools.partial(
+                            ext_cls.import_extension, path
+                        )
+                except Exception as e:
+                    logger.warning(f"Extension check failed for '{ext_cls.name}': {e}")
+
+    def extension_names(self) -> list[str]:
+        """Returns the names of all extensions contained in the OCEL, without importing them."""
+        return list(self._extensions) + [
+            name for name in self._extension_loaders if name not in self._extensions
+        ]
 
     def get_extension(self, name: str) -> Optional[OcelExtension]:
+        with self._extensions_lock:
+            loader = self._extension_loaders.pop(name, None)
+            if loader is not None:
+                try:
+                    self._extensions[name] = loader()
+                except Exception as e:
+                    logger.warning(f"Extension load failed for '{name}': {e}")
         return self._extensions.get(name)
 
     def get_extensions_list(self) -> list[OcelExtension]:
-        """Returns a list of all loaded extensions."""
-        return list(self._extensions.values())
+        """Returns a list of all extensions, importing them if not done yet."""
+        return [
+            extension
+            for name in self.extension_names()
+            if (extension := self.get_extension(name)) is not None
+        ]
 
     # endregion
     # ----- IMPORT WRAPPER FUNCTIONS ------------------------------------------------------------------------------------------
@@ -999,8 +1271,26 @@ class OCELWrapper:
         version_info: bool = False,
         output: bool = True,
         upload_date: datetime | None = None,
+        progress: Optional[ProgressCallback] = None,
+        content_hash: Optional[str] = None,
+        source: Optional[IO[bytes]] = None,
+        stop_event: Optional[threading.Event] = None,
+        selection: Optional[ImportSelection] = None,
     ) -> OCELWrapper:
+        """Imports an OCEL 2.0 file. When passing `source`, the file content is read from that stream instead of `path`.
+        The snapshot cache is looked up by `content_hash`, which is computed from `path` unless passed or reading from a stream.
+        The current stage and progress are reported via `progress`. Setting `stop_event` aborts the import with `TaskCancelled`.
+        Passing a `selection` imports only a part of the log. Such imports bypass the snapshot cache.
+        """
+
+        def report_stage(stage: str):
+            if progress is not None:
+                progress(0.0, stage)
+
         report = {}
+        if selection is not None and selection.is_empty:
+            selection = None
+        use_snapshots = snapshot_cache is not None and selection is None
         if not isinstance(path, Path):
             path = Path(path)
 
@@ -1017,35 +1307,70 @@ class OCELWrapper:
         if output:
             logger.info("\n".join(init_output))
 
-        with warnings.catch_warnings(record=True):
-            match path.suffix:
-                case ".sqlite":
-                    pm4py_ocel = pm4py.read.read_ocel2_sqlite(str(path))
-                case ".xmlocel":
-                    pm4py_ocel = pm4py.read.read_ocel2_xml(str(path))
-                case ".jsonocel":
-                    pm4py_ocel = pm4py.read.read_ocel2_xml(str(path))
-                case _:
-                    raise ValueError(f"Unsupported extension: {path.suffix}")
-
-        ocel = OCELWrapper(pm4py_ocel)
-
-        report["ocelStrPm4py"] = str(pm4py_ocel)
-        report["ocelStr"] = str(ocel)
-
-        ocel.meta = {
-            "path": str(path),
-            "fileName": original_file_name or str(path.name),
-            "importReport": report,
-            "uploadDate": upload_date.isoformat()
-            if upload_date
-            else datetime.now().isoformat(),
-        }
-
-        ocel.load_extension()
+        pm4py_ocel = None
+        if use_snapshots and (content_hash or source is None):
+            if not content_hash:
+                report_stage("Hashing file")
+                content_hash = file_hash(path)
+            raise_if_cancelled(stop_event)
+            report_stage("Loading snapshot")
+            pm4py_ocel = snapshot_cache.load(content_hash)  # type: ignore
+        report["fromSnapshot"] = pm4py_ocel is not None
+        report["partial"] = selection is not None
+
+        # Connection shared by the SQLite importer and extension checks, opened on first use
+        with SqliteSource(path) as sqlite:
+            if pm4py_ocel is None:
+                report_stage("Parsing")
+                with warnings.catch_warnings(record=True):
+                    match path.suffix:
+                        case ".sqlite":
+                            pm4py_ocel = read_ocel2_sqlite(
+                                path,
+                                progress=progress,
+                                stop_event=stop_event,
+                                source=sqlite,
+                                selection=selection,
+                            )
+                        case ".xmlocel":
+                            pm4py_ocel = read_ocel2_xml(
+                                source or path, progress=progress, stop_event=stop_event
+                            )
+                        case ".jsonocel":
+                            pm4py_ocel = read_ocel2_json(
+                                source or path, progress=progress, stop_event=stop_event
+                            )
+                        case _:
+                            raise ValueError(f"Unsupported extension: {path.suffix}")
+                if selection is not None and path.suffix != ".sqlite":
+                    pm4py_ocel = apply_selection(pm4py_ocel, selection)
+                raise_if_cancelled(stop_event)
+                if use_snapshots and content_hash is not None:
+                    report_stage("Writing snapshot")
+                    snapshot_cache.store(content_hash, pm4py_ocel)  # type: ignore
+
+            ocel = OCELWrapper(pm4py_ocel)
+
+            report["ocelStrPm4py"] = ocel_summary(pm4py_ocel)
+            report["ocelStr"] = str(ocel)
+
+            ocel.meta = {
+                "path": str(path),
+                "fileName": original_file_name or str(path.name),
+                "importReport": report,
+                "uploadDate": upload_date.isoformat()
+                if upload_date
+                else datetime.now().isoformat(),
+            }
+
+            raise_if_cancelled(stop_event)
+            report_stage("Loading extensions")
+            ocel.load_extension(source=sqlite)
+        if progress is not None:
+            progress(1.0)
 
         if output:
-            logger.info(pm4py_ocel)
+            logger.info(ocel_summary(pm4py_ocel))
 
         return ocel
 
@@ -1056,11 +1381,21 @@ class OCELWrapper:
     ):
         match ext:
             case ".xml":
-                pm4py.write_ocel2_xml(self.ocel, str(file_path))
+                write_ocel2_xml(self.ocel, file_path)
             case ".json":
-                pm4py.write_ocel2_json(self.ocel, str(file_path))
+                write_ocel2_json(self.ocel, file_path)
             case _:
-                pm4py.write_ocel2_sqlite(self.ocel, str(file_path))
+                write_ocel2_sqlite(
+                    self.ocel, file_path, extensions=self.get_extensions_list()
+                )
+
+    def iter_ocel(self, ext: Literal[".json", ".xml"]) -> Iterator[bytes]:
+        """Serializes the OCEL chunk by chunk, for streaming it without writing a file first."""
+        match ext:
+            case ".xml":
+                return iter_ocel2_xml(self.ocel)
+            case ".json":
+                return iter_ocel2_json(self.ocel)
 
     # endregion
     #
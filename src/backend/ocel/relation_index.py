@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from typing import Iterable, Literal
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.entity_ids import CODE_DTYPE, EntityIds, event_ids, object_ids
+from util.cache import ocel_cached
+
+
+def category_codes(series: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the codes (-1 for missing values) and categories of a column, categorical or not."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return (
+            series.cat.codes.to_numpy().astype(CODE_DTYPE),
+            series.cat.categories.to_numpy(dtype=object),
+        )
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes.astype(CODE_DTYPE), np.asarray(uniques, dtype=object)
+
+
+def category_values(codes: np.ndarray, categories: np.ndarray) -> np.ndarray:
+    """Inverse of `category_codes`, with None for missing values."""
+    values = categories.take(np.maximum(codes, 0)) if len(categories) else codes
+    return np.where(codes >= 0, values, None)
+
+
+class CsrIndex:
+    """Adjacency of a relation in compressed sparse row (CSR) form.
+
+    The targets related to source `i` are `targets[offsets[i]:offsets[i + 1]]`, with the qualifier codes in `qualifiers`
+    and the positions of the underlying relation table rows in `rows`, all in the original row order.
+    """
+
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        targets: np.ndarray,
+        qualifiers: np.ndarray,
+        rows: np.ndarray,
+    ):
+        self.offsets = offsets
+        self.targets = targets
+        self.qualifiers = qualifiers
+        self.rows = rows
+
+    @staticmethod
+    def build(
+        sources: np.ndarray, targets: np.ndarray, qualifiers: np.ndarray, n: int
+    ) -> CsrIndex:
+        """Builds the index from the source and target codes of a relation table, with `n` being the number of sources.
+        Rows with unknown sources or targets (negative codes) are omitted."""
+        valid = np.flatnonzero((sources >= 0) & (targets >= 0))
+        rows = valid[np.argsort(sources[valid], kind="stable")]
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources[valid], minlength=n), out=offsets[1:])
+        return CsrIndex(
+            offsets=offsets,
+            targets=targets[rows],
+            qualifiers=qualifiers[rows],
+            rows=rows,
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def degrees(self) -> np.ndarray:
+        """Returns the number of relations of each source"""
+        return np.diff(self.offsets)
+
+    def sources(self) -> np.ndarray:
+        """Returns the source code of each relation, aligned with `targets`"""
+        return np.repeat(np.arange(len(self), dtype=CODE_DTYPE), self.degrees())
+
+    def gather(self, sources: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Looks up the relations of a batch of source codes.
+        Returns `owners`, the position of the source in the batch, and `positions`, the position in `targets`/`qualifiers`, for each relation.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        starts = self.offsets[sources]
+        counts = self.offsets[sources + 1] - starts
+        owners = np.repeat(np.arange(len(sources)), counts)
+        # Position within each source's slice, added to the slice start
+        shifts = np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.arange(counts.sum()) - shifts + np.repeat(starts, counts)
+        return owners, positions
+
+
+class E2OIndex:
+    """Event-to-object relations of an OCEL, as CSR adjacency in both directions, working on entity codes (see `EntityIds`)."""
+
+    def __init__(self, ocel: OCEL):
+        relations = ocel.relations
+        self.event_ids = event_ids(ocel)
+        self.object_ids = object_ids(ocel)
+        eids = self.event_ids.encode(relations["ocel:eid"])
+        oids = self.object_ids.encode(relations["ocel:oid"])
+        self.relation_event_codes = eids
+        """Event code of each row of the relations table"""
+        self.relation_object_codes = oids
+        """Object code of each row of the relations table"""
+        qualifiers, self.qualifier_categories = category_codes(
+            relations["ocel:qualifier"]
+        )
+        self.objects_of_events = CsrIndex.build(
+            eids, oids, qualifiers, len(self.event_ids)
+        )
+        self.events_of_objects = CsrIndex.build(
+            oids, eids, qualifiers, len(self.object_ids)
+        )
+
+    def objects_of(self, eids: Iterable[str] | pd.Series) -> pd.DataFrame:
+        """Returns the E2O relations (`ocel:eid`, `ocel:oid`, `ocel:qualifier`) of a batch of events."""
+        return self._lookup(
+            self.objects_of_events,
+            self.event_ids,
+            self.object_ids,
+            eids,
+            ("ocel:eid", "ocel:oid"),
+        )
+
+    def events_of(self, oids: Iterable[str] | pd.Series) -> pd.DataFrame:
+        """Returns the E2O relations (`ocel:oid`, `ocel:eid`, `ocel:qualifier`) of a batch of objects."""
+        return self._lookup(
+            self.events_of_objects,
+            self.object_ids,
+            self.event_ids,
+            oids,
+            ("ocel:oid", "ocel:eid"),
+        )
+
+    def _lookup(
+        self,
+        index: CsrIndex,
+        source_ids: EntityIds,
+        target_ids: EntityIds,
+        ids: Iterable[str] | pd.Series,
+        columns: tuple[str, str],
+    ) -> pd.DataFrame:
+        sources = source_ids.encode_set(ids)
+        owners, positions = index.gather(sources)
+        return pd.DataFrame(
+            {
+                columns[0]: source_ids.ids[sources[owners]],
+                columns[1]: target_ids.ids[index.targets[positions]],
+                "ocel:qualifier": category_values(
+                    index.qualifiers[positions], self.qualifier_categories
+                ),
+            }
+        )
+
+
+class O2OIndex:
+    """Object-to-object relations of an OCEL, as CSR adjacency from `ocel:oid` to `ocel:oid_2` (forward) and back (reverse).
+    Along with the qualifier codes, the type code of each object is stored, so relations can be filtered by source and target type.
+    """
+
+    def __init__(self, ocel: OCEL):
+        o2o = ocel.o2o
+        self.object_ids = object_ids(ocel)
+        self.type_codes, self.type_categories = category_codes(
+            pd.Series(self.object_ids.types, dtype=object)
+        )
+        sources = self.object_ids.encode(o2o["ocel:oid"])
+        targets = self.object_ids.encode(o2o["ocel:oid_2"])
+        self.source_codes = sources
+        """Object code of `ocel:oid` for each row of the o2o table"""
+        self.target_codes = targets
+        """Object code of `ocel:oid_2` for each row of the o2o table"""
+        qualifiers, self.qualifier_categories = category_codes(o2o["ocel:qualifier"])
+        n = len(self.object_ids)
+        self.forward = CsrIndex.build(sources, targets, qualifiers, n)
+        self.reverse = CsrIndex.build(targets, sources, qualifiers, n)
+
+    def csr(self, direction: Literal["source", "target"] = "source") -> CsrIndex:
+        """Returns the index from the given end of the relations (`source` for `ocel:oid`, `target` for `ocel:oid_2`)."""
+        return self.forward if direction == "source" else self.reverse
+
+    def relation_codes(
+        self, direction: Literal["source", "target"] = "source"
+    ) -> pd.DataFrame:
+        """Returns all relations as a table of object codes (`source`, `target`), with categorical `qualifier`, `source_type` and `target_type`.
+        With direction `target`, relations are reversed, i.e. `source` refers to `ocel:oid_2`."""
+        csr = self.csr(direction)
+        sources = csr.sources()
+        return pd.DataFrame(
+            {
+                "source": sources,
+                "target": csr.targets,
+                "qualifier": pd.Categorical.from_codes(
+                    csr.qualifiers, self.qualifier_categories
+                ),
+                "source_type": self.types_of(sources),
+                "target_type": self.types_of(csr.targets),
+            }
+        )
+
+    def typed_relations(
+        self, direction: Literal["source", "target"] = "source"
+    ) -> pd.DataFrame:
+        """Like `relation_codes`, but with object IDs instead of codes."""
+        relations = self.relation_codes(direction)
+        return relations.assign(
+            source=self.object_ids.ids[relations["source"].to_numpy()],
+            target=self.object_ids.ids[relations["target"].to_numpy()],
+        )
+
+    def types_of(self, codes: np.ndarray) -> pd.Categorical:
+        return pd.Categorical.from_codes(
+            self.type_codes[codes],  # type: ignore
+            self.type_categories,
+        )
+
+    def targets_of(
+        self,
+        oids: Iterable[str] | pd.Series,
+        direction: Literal["source", "target"] = "source",
+    ) -> pd.DataFrame:
+        """Returns the O2O relations (`ocel:oid`, `ocel:oid_2`, `ocel:qualifier`) of a batch of objects.
+        With direction `target`, the relations pointing to the given objects are returned, with these in `ocel:oid_2`."""
+        csr = self.csr(direction)
+        sources = self.object_ids.encode_set(oids)
+        owners, positions = csr.gather(sources)
+        source_col, target_col = (
+            ("ocel:oid", "ocel:oid_2")
+            if direction == "source"
+            else ("ocel:oid_2", "ocel:oid")
+        )
+        return pd.DataFrame(
+            {
+                source_col: self.object_ids.ids[sources[owners]],
+                target_col: self.object_ids.ids[csr.targets[positions]],
+                "ocel:qualifier": category_values(
+                    csr.qualifiers[positions], self.qualifier_categories
+                ),
+            }
+        )
+
+
+@ocel_cached("events", "objects", "relations")
+def e2o_index(ocel: OCEL) -> E2OIndex:
+    return E2OIndex(ocel)
+
+
+@ocel_cached("objects", "o2o")
+def o2o_index(ocel: OCEL) -> O2OIndex:
+    return O2OIndex(ocel)
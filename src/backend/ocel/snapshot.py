@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from api.config import config
+from api.logger import logger
+from ocel.importer.base import make_ocel
+
+SNAPSHOT_VERSION = 2
+"""Incremented whenever the snapshot format or the importers' output changes, invalidating existing snapshots."""
+
+SNAPSHOT_TABLES = ["events", "objects", "relations", "object_changes", "o2o", "e2e"]
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a table cannot be stored in a snapshot, or a snapshot was written by another version."""
+
+
+# ----- COLUMN ENCODING ---------------------------------------------------------------------------------------------------
+# region
+
+
+def encode_column(
+    values: pd.Series | pd.Index, key: str, arrays: dict[str, np.ndarray]
+) -> dict[str, Any]:
+    """Stores a column as plain NumPy arrays in `arrays` (using keys starting with `key`),
+    returning the metadata needed by `decode_column`. Object columns must only contain strings and missing values."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = np.asarray(pd.Categorical(values).codes)
+        arrays[f"{key}.codes"] = codes
+        return {
+            "kind": "categorical",
+            "ordered": bool(dtype.ordered),
+            "categories": encode_column(dtype.categories, f"{key}.categories", arrays),
+        }
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        arrays[f"{key}.values"] = np.asarray(
+            values.to_numpy(f"datetime64[{dtype.unit}]")
+        )
+        return {"kind": "datetimetz", "tz": str(dtype.tz)}
+    if isinstance(dtype, np.dtype) and dtype.kind in "biufcmM":
+        arrays[f"{key}.values"] = np.asarray(values)
+        return {"kind": "numpy"}
+    if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+        missing = np.asarray(pd.isna(values), dtype=bool)
+        strings = np.asarray(values, dtype=object)[~missing]
+        if not all(isinstance(s, str) for s in strings):
+            raise SnapshotFormatError("Object column with non-string values")
+        arrays[f"{key}.missing"] = missing
+        arrays[f"{key}.offsets"] = np.concatenate(
+            [[0], np.cumsum(np.fromiter(map(len, strings), dtype=np.int64))]
+        )
+        arrays[f"{key}.text"] = np.frombuffer(
+            "".join(strings).encode("utf-8"), dtype=np.uint8
+        )
+        return {"kind": "string", "dtype": str(dtype)}
+    if pd.api.types.is_extension_array_dtype(dtype):
+        # Nullable integer, float and boolean columns
+        missing = np.asarray(pd.isna(values), dtype=bool)
+        numpy_dtype = dtype.numpy_dtype  # type: ignore
+        arrays[f"{key}.missing"] = missing
+        arrays[f"{key}.values"] = values.to_numpy(
+            dtype=numpy_dtype, na_value=np.zeros(1, dtype=numpy_dtype)[0]
+        )
+        return {"kind": "masked", "dtype": str(dtype)}
+    raise SnapshotFormatError(f"Unsupported column type {dtype}")
+
+
+def decode_column(meta: dict[str, Any], key: str, arrays) -> pd.Index:
+    match meta["kind"]:
+        case "categorical":
+            categories = decode_column(meta["categories"], f"{key}.categories", arrays)
+            return pd.Index(
+                pd.Categorical.from_codes(
+                    arrays[f"{key}.codes"],
+                    categories=categories,
+                    ordered=meta["ordered"],
+                )
+            )
+        case "datetimetz":
+            return (
+                pd.DatetimeIndex(arrays[f"{key}.values"])
+                .tz_localize("UTC")
+                .tz_convert(meta["tz"])
+            )
+        case "numpy":
+            return pd.Index(arrays[f"{key}.values"], tupleize_cols=False)
+        case "string":
+            missing = arrays[f"{key}.missing"]
+            offsets = arrays[f"{key}.offsets"].tolist()
+            text = arrays[f"{key}.text"].tobytes().decode("utf-8")
+            values = np.full(len(missing), None, dtype=object)
+            values[~missing] = [
+                text[start:end] for start, end in zip(offsets[:-1], offsets[1:])
+            ]
+            return pd.Index(values, dtype=meta["dtype"], tupleize_cols=False)
+        case "masked":
+            values = pd.array(arrays[f"{key}.values"], dtype=meta["dtype"])
+            values[arrays[f"{key}.missing"]] = pd.NA
+            return pd.Index(values)
+        case kind:
+            raise SnapshotFormatError(f"Unknown column kind {kind}")
+
+
+def encode_table(
+    df: pd.DataFrame, key: str, arrays: dict[str, np.ndarray]
+) -> dict[str, Any]:
+    if not all(isinstance(name, str) for name in df.columns):
+        raise SnapshotFormatError("Non-string column names")
+    return {
+        "index": encode_column(df.index, f"{key}.index", arrays),
+        "columns": [
+            [name, encode_column(df[name], f"{key}.{i}", arrays)]
+            for i, name in enumerate(df.columns)
+        ],
+    }
+
+
+def decode_table(meta: dict[str, Any], key: str, arrays) -> pd.DataFrame:
+    index = decode_column(meta["index"], f"{key}.index", arrays)
+    return pd.DataFrame(
+        {
+            name: decode_column(column, f"{key}.{i}", arrays).array
+            for i, (name, column) in enumerate(meta["columns"])
+        },
+        index=index,
+        columns=[name for name, _ in meta["columns"]],
+    )
+
+
+# endregion
+
+
+def snapshot_versions() -> dict[str, str | int]:
+    """Versions that must match between writing and loading a snapshot"""
+    return {"snapshot": SNAPSHOT_VERSION, "pandas": pd.__version__}
+
+
+class SnapshotCache:
+    """Content-addressed cache of imported OCELs on disk.
+
+    Each snapshot is a single file named after the SHA-256 hash of the original file content.
+    It is an uncompressed `.npz` archive of plain NumPy arrays (strings as UTF-8 buffers with offsets, categoricals as codes),
+    loaded with `allow_pickle=False`, so a snapshot can never execute code. A JSON manifest within the archive
+    describes the tables and records the versions they were written with, snapshots of other versions are discarded.
+    The directory is created accessible to the current user only, and the cache is disabled if it is owned by someone else.
+    The file modification time serves as last-access time, the least recently used snapshots are deleted when exceeding `max_size`.
+    """
+
+    def __init__(self, directory: Path, max_size: int):
+        self.directory = directory
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._usable: Optional[bool] = None
+
+    def path(self, content_hash: str) -> Path:
+        return self.directory / f"{content_hash}.v{SNAPSHOT_VERSION}.snapshot"
+
+    @property
+    def usable(self) -> bool:
+        """Creates the directory on first use, checking that no other user can write to it."""
+        with self._lock:
+            if self._usable is None:
+                self._usable = self._prepare_directory()
+            return self._usable
+
+    def _prepare_directory(self) -> bool:
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if os.name != "posix":
+                return True
+            stat = self.directory.lstat()
+            if self.directory.is_symlink() or stat.st_uid != os.getuid():
+                logger.warning(
+                    f"Snapshot cache disabled: {self.directory} is not a directory owned by the current user"
+                )
+                return False
+            if stat.st_mode & 0o077:
+                os.chmod(self.directory, 0o700)
+        except OSError as err:
+            logger.warning(f"Snapshot cache disabled: {err}")
+            return False
+        return True
+
+    def has(self, content_hash: str) -> bool:
+        return self.usable and self.path(content_hash).exists()
+
+    def load(self, content_hash: str) -> Optional[OCEL]:
+        if not self.usable:
+            return None
+        path = self.path(content_hash)
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                manifest = json.loads(arrays["manifest"].tobytes())
+                if manifest["versions"] != snapshot_versions():
+                    raise SnapshotFormatError(
+                        f"Written with versions {manifest['versions']}"
+                    )
+                tables = {
+                    name: decode_table(manifest["tables"][name], name, arrays)
+                    for name in SNAPSHOT_TABLES
+                }
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except Exception as err:
+            logger.warning(f"Discarding unreadable OCEL snapshot {path.name}: {err}")
+            path.unlink(missing_ok=True)
+            return None
+        return make_ocel(**tables)
+
+    def store(self, content_hash: str, ocel: OCEL):
+        """Writes a snapshot of the OCEL tables, then evicts old snapshots. Errors are logged, not raised."""
+        if not self.usable:
+            return
+        path = self.path(content_hash)
+        tmp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        try:
+            arrays: dict[str, np.ndarray] = {}
+            manifest = {
+                "versions": snapshot_versions(),
+                "tables": {
+                    name: encode_table(getattr(ocel, name), name, arrays)
+                    for name in SNAPSHOT_TABLES
+                },
+            }
+            arrays["manifest"] = np.frombuffer(
+                json.dumps(manifest).encode("utf-8"), dtype=np.uint8
+            )
+            with open(tmp_path, "wb") as f:
+                np.savez(f, allow_pickle=False, **arrays)
+            # Atomic, concurrent imports of the same file never see a partial snapshot
+            os.replace(tmp_path, path)
+        except Exception as err:
+            logger.warning(f"Failed to write OCEL snapshot {path.name}: {err}")
+            tmp_path.unlink(missing_ok=True)
+            return
+        self.evict()
+
+    def evict(self):
+        """Deletes the least recently used snapshots until the total size is within the limit."""
+        with self._lock:
+            snapshots = []
+            for path in self.directory.glob("*.snapshot"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                snapshots.append((stat.st_mtime, stat.st_size, path))
+
+            total_size = sum(size for _, size, _ in snapshots)
+            for _, size, path in sorted(snapshots, key=lambda s: s[0]):
+                if total_size <= self.max_size:
+                    break
+                path.unlink(missing_ok=True)
+                total_size -= size
+                logger.info(f"Evicted OCEL snapshot {path.name} ({size} bytes)")
+
+
+snapshot_cache: Optional[SnapshotCache] = (
+    SnapshotCache(
+        directory=config.SNAPSHOT_CACHE_DIR,
+        max_size=config.SNAPSHOT_CACHE_MAX_SIZE_MB * 10**6,
+    )
+    if config.SNAPSHOT_CACHE_MAX_SIZE_MB > 0
+    else None
+)
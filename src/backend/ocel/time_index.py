@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from util.cache import ocel_cached
+
+NAT = np.iinfo(np.int64).min
+"""Integer representation of NaT, sorting before all valid timestamps"""
+
+NS_PER_DAY = 86_400 * 10**9
+
+TimeBound = Optional[datetime | pd.Timestamp | str]
+
+
+def timestamp_ns(t: datetime | pd.Timestamp | str) -> int:
+    """Converts a timestamp to nanoseconds since the epoch. Naive timestamps are assumed to be UTC."""
+    ts = pd.Timestamp(t)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return ts.value
+
+
+class TimeIndex:
+    """Sorted index over a timestamp column, as int64 nanoseconds (UTC) with a sort permutation.
+
+    Time range selections are resolved with binary search on the sorted timestamps,
+    costing O(log n) plus the size of the output instead of comparing every timestamp.
+    """
+
+    def __init__(self, timestamps: pd.Series):
+        self.tz = getattr(timestamps.dtype, "tz", None)
+        self.times: np.ndarray = timestamps.to_numpy(dtype="datetime64[ns]").view(
+            np.int64
+        )
+        self.order: np.ndarray = np.argsort(self.times, kind="stable")
+        self.sorted_times: np.ndarray = self.times[self.order]
+        self.first_valid = int(np.searchsorted(self.sorted_times, NAT, side="right"))
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def bounds(self, start: TimeBound = None, end: TimeBound = None) -> tuple[int, int]:
+        """Returns the range of positions in sorted order with `start <= timestamp <= end`.
+        Without any bound, all rows are included, including missing timestamps."""
+        if start is None and end is None:
+            return 0, len(self)
+        lo = self.first_valid
+        if start is not None:
+            lo = max(lo, int(np.searchsorted(self.sorted_times, timestamp_ns(start))))
+        hi = len(self)
+        if end is not None:
+            hi = int(
+                np.searchsorted(self.sorted_times, timestamp_ns(end), side="right")
+            )
+        return lo, max(lo, hi)
+
+    def count(self, start: TimeBound = None, end: TimeBound = None) -> int:
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+    def rows(self, start: TimeBound = None, end: TimeBound = None) -> np.ndarray:
+        """Returns the row positions within the time range, in time order."""
+        lo, hi = self.bounds(start, end)
+        return self.order[lo:hi]
+
+    def mask(self, start: TimeBound = None, end: TimeBound = None) -> np.ndarray:
+        """Returns a boolean array marking the rows within the time range."""
+        mask = np.zeros(len(self), dtype=bool)
+        mask[self.rows(start, end)] = True
+        return mask
+
+    def to_timestamp(self, ns: int) -> pd.Timestamp:
+        ts = pd.Timestamp(ns, tz="UTC")
+        return ts.tz_convert(self.tz) if self.tz is not None else ts.tz_localize(None)
+
+    @property
+    def min(self) -> pd.Timestamp:
+        """The earliest timestamp, NaT if there is none"""
+        if self.first_valid == len(self):
+            return pd.NaT  # type: ignore
+        return self.to_timestamp(self.sorted_times[self.first_valid])
+
+    @property
+    def max(self) -> pd.Timestamp:
+        """The latest timestamp, NaT if there is none"""
+        if self.first_valid == len(self):
+            return pd.NaT  # type: ignore
+        return self.to_timestamp(self.sorted_times[-1])
+
+    def count_per_day(
+        self, codes: np.ndarray, n: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Counts the rows per (UTC) day and code (e.g. activity codes in `[0, n)`), skipping missing timestamps and codes.
+        Returns the days (datetime64[D]), codes and counts of all non-empty combinations, ordered by day and code."""
+        rows = self.order[self.first_valid :]
+        days = self.sorted_times[self.first_valid :] // NS_PER_DAY
+        codes = codes[rows]
+        valid = codes >= 0
+        days, codes = days[valid], codes[valid].astype(np.int64)
+        if not len(days):
+            empty = np.array([], dtype=np.int64)
+            return empty.astype("datetime64[D]"), empty, empty
+        keys = (days - days[0]) * n + codes
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        return (
+            (unique_keys // n + days[0]).astype("datetime64[D]"),
+            unique_keys % n,
+            counts,
+        )
+
+
+@ocel_cached("events")
+def event_time_index(ocel: OCEL) -> TimeIndex:
+    return TimeIndex(ocel.events["ocel:timestamp"])
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import copy
 import inspect
 import re
-from copy import deepcopy
+from collections import Counter
 from datetime import datetime
 from typing import TYPE_CHECKING, Callable, Iterable, Sequence
 
@@ -10,6 +11,10 @@ import numpy as np
 import pandas as pd
 from pm4py.objects.ocel.obj import OCEL
 
+from ocel.relation_index import e2o_index
+from ocel.time_index import event_time_index
+from util.pandas import observed_value_counts
+
 if TYPE_CHECKING:
     from ocel.ocel_wrapper import OCELWrapper
 
@@ -84,6 +89,67 @@ def filter_activity(
     return df[predicate]  # type: ignore
 
 
+OCEL_TABLES = ["events", "objects", "relations", "object_changes", "o2o", "e2e"]
+
+
+def clone_pm4py_ocel(ocel: OCEL) -> OCEL:
+    """Returns a copy of a pm4py OCEL in constant time, sharing the column data with the original.
+    Relies on pandas Copy-on-Write (enabled in `index.py`): A table is only copied when one of the two OCELs modifies it.
+    Without Copy-on-Write, the tables are deep-copied."""
+    deep = not pd.options.mode.copy_on_write
+    clone = copy.copy(ocel)
+    for name in OCEL_TABLES:
+        df = getattr(ocel, name, None)
+        if isinstance(df, pd.DataFrame):
+            setattr(clone, name, df.copy(deep=deep))
+    clone.globals = copy.deepcopy(ocel.globals)
+    clone.parameters = copy.deepcopy(ocel.parameters)
+    return clone
+
+
+def uncategorize_ocel(ocel: OCEL) -> OCEL:
+    """Returns a copy of the OCEL with its categorical columns (activities, object types, qualifiers) converted to strings.
+    Used before handing the OCEL to pm4py algorithms: Discovery rejects categorical activity columns,
+    and grouping by a categorical column yields empty groups for unused categories."""
+    clone = clone_pm4py_ocel(ocel)
+    for name in OCEL_TABLES:
+        df = getattr(clone, name, None)
+        if not isinstance(df, pd.DataFrame):
+            continue
+        categorical = {
+            col: object
+            for col, dtype in df.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        }
+        if categorical:
+            setattr(clone, name, df.astype(categorical))
+    return clone
+
+
+def ocel_summary(ocel: OCEL) -> str:
+    """Returns the same summary as `str(ocel)`, counting only the activities and object types present in the tables.
+    pm4py's `OCEL.get_summary` groups by the categorical type columns without `observed=True`."""
+    activities = ocel.events[ocel.event_activity]
+    otypes = ocel.objects[ocel.object_type_column]
+    activities_per_type = ocel.relations.groupby(
+        ocel.object_type_column, observed=True
+    )[ocel.event_activity].nunique()
+    return "".join(
+        [
+            "Object-Centric Event Log (",
+            f"number of events: {len(ocel.events)}",
+            f", number of objects: {len(ocel.objects)}",
+            f", number of activities: {activities.nunique()}",
+            f", number of object types: {otypes.nunique()}",
+            f", events-objects relationships: {len(ocel.relations)})\n",
+            f"Activities occurrences: {Counter(observed_value_counts(activities).to_dict())}\n",
+            f"Object types occurrences (number of objects): {Counter(observed_value_counts(otypes).to_dict())}\n",
+            f"Unique activities per object type: {Counter(activities_per_type.to_dict())}\n",
+            "Please use <THIS>.get_extended_table() to get a dataframe representation of the events related to the objects.",
+        ]
+    )
+
+
 def filter_pm4py_ocel(
     ocel: OCEL,
     otypes: list[str] | None = None,
@@ -111,7 +177,7 @@ def filter_pm4py_ocel(
             return df[col].isin(qualifiers)
         return df[col].map(lambda x: True)
 
-    ocel2 = deepcopy(ocel)
+    ocel2 = clone_pm4py_ocel(ocel)
 
     # E2O relations table
     relations_filter = ocel2.relations["ocel:eid"].map(lambda x: True)
@@ -127,14 +193,16 @@ def filter_pm4py_ocel(
         relations_filter = relations_filter & ocel2.relations["ocel:qualifier"].isin(
             qualifiers
         )
-    if min_timestamp is not None:
-        relations_filter = relations_filter & (
-            ocel2.relations["ocel:timestamp"] >= min_timestamp
-        )
-    if max_timestamp is not None:
-        relations_filter = relations_filter & (
-            ocel2.relations["ocel:timestamp"] <= max_timestamp
+    if min_timestamp is not None or max_timestamp is not None:
+        # Select the events in the time window via the timestamp index, then their relations
+        index = e2o_index(ocel)
+        event_rows = event_time_index(ocel).rows(min_timestamp, max_timestamp)
+        _, positions = index.objects_of_events.gather(
+            index.event_ids.row_codes[event_rows]
         )
+        in_window = np.zeros(len(ocel2.relations), dtype=bool)
+        in_window[index.objects_of_events.rows[positions]] = True
+        relations_filter = relations_filter & in_window
     ocel2.relations = ocel2.relations[relations_filter]
 
     # Retain events & objects that have E2O relations
@@ -1,14 +1,27 @@
 import datetime
 from pathlib import Path
-import shutil
 from tempfile import NamedTemporaryFile
 from typing import Annotated, Literal, Optional
 
+import numpy as np
+from fastapi import APIRouter, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
 from api.dependencies import ApiOcel, ApiSession
 from api.exceptions import BadRequest, NotFound
 from api.model.events import Date_Distribution_Item, Entity_Time_Info
-from api.model.ocel import Filter, OcelListResponse, OcelMetadata, UploadingOcelMetadata
+from api.model.ocel import (
+    CacheUsageResponse,
+    Filter,
+    FilterPreview,
+    OcelCacheUsage,
+    OcelListResponse,
+    OcelMetadata,
+    UploadingOcelMetadata,
+)
 from api.model.response import TempFileResponse
+from api.upload import UploadBuffer, stream_multipart_file
 from lib.attributes import AttributeSummary
 from lib.relations import RelationCountSummary
 from ocel.default_ocel import (
@@ -17,11 +30,12 @@ from ocel.default_ocel import (
     filter_default_ocels,
     get_default_ocel,
 )
-from tasks.ocel import import_ocel_task
+from ocel.importer import ImportSelection
+from ocel.ocel_wrapper import cache_budget
+from ocel.relation_index import category_codes
+from tasks.ocel import import_ocel_task, upload_ocel_task
 from util.constants import SUPPORTED_FILE_TYPES
-from util.tasks import TaskState
-
-from fastapi import APIRouter, File, Query, Response, UploadFile
+from util.tasks import TaskCancelled, TaskState
 
 ocels_router = APIRouter(prefix="/ocels", tags=["ocels"])
 
@@ -45,9 +59,7 @@ def getOcels(session: ApiSession) -> OcelListResponse:
                 created_at=value.original.meta["uploadDate"],
                 id=key,
                 name=value.original.meta["fileName"],
-                extensions=[
-                    extension.name for extension in value.original.get_extensions_list()
-                ],
+                extensions=value.original.extension_names(),
             )
             for key, value in session.ocels.items()
         ],
@@ -63,6 +75,41 @@ def getOcels(session: ApiSession) -> OcelListResponse:
     )
 
 
+@ocels_router.get(
+    "/cache",
+    summary="Report cache memory usage",
+    description=(
+        "Returns the memory used by the cached results of the session's OCELs in bytes, "
+        "per OCEL and per method, along with the process-wide total and budget."
+    ),
+    operation_id="getCacheUsage",
+)
+def get_cache_usage(session: ApiSession) -> CacheUsageResponse:
+    versions = [
+        (id, version, ocel)
+        for id, filtered_ocel in session.ocels.items()
+        for version, ocel in (
+            ("original", filtered_ocel.original),
+            ("filtered", filtered_ocel.filtered),
+        )
+        if ocel is not None
+    ]
+    return CacheUsageResponse(
+        total_size=cache_budget.currsize,
+        max_size=cache_budget.maxsize,
+        ocels=[
+            OcelCacheUsage(
+                id=id,
+                version=version,
+                size=ocel.cache.currsize,
+                max_size=ocel.cache.maxsize,
+                methods=ocel.cache_size,
+            )
+            for id, version, ocel in versions
+        ],
+    )
+
+
 @ocels_router.post(
     "/ocel",
     summary="Set the current active OCEL",
@@ -145,29 +192,28 @@ def get_event_counts(
 def get_time_info(
     ocel: ApiOcel,
 ) -> Entity_Time_Info:
-    events = ocel.events
-    timestamp_column_name = ocel.ocel.event_timestamp
-    activity_column_name = ocel.ocel.event_activity
-
-    # Group by date and activity, then count
-    time_frame_count = (  # type:ignore
-        events.groupby([events[timestamp_column_name].dt.date, activity_column_name])
-        .size()
-        .reset_index(name="count")
-    )
-
-    # Build distribution per date
-    date_distribution = []
-    for date, group in time_frame_count.groupby(timestamp_column_name):
-        row = {
-            "date": str(date),
-            "entity_count": dict(zip(group[activity_column_name], group["count"])),
-        }
-        date_distribution.append(Date_Distribution_Item(**row))
+    time_index = ocel.event_time_index
+    activity_codes, activities = category_codes(ocel.events["ocel:activity"])
+
+    # Count events per date and activity
+    days, codes, counts = time_index.count_per_day(activity_codes, len(activities))
+    boundaries = np.flatnonzero(np.diff(days.astype(np.int64))) + 1
+    date_distribution = [
+        Date_Distribution_Item(
+            date=str(day[0]),
+            entity_count=dict(zip(activities[day_codes].tolist(), day_counts.tolist())),
+        )
+        for day, day_codes, day_counts in zip(
+            np.split(days, boundaries),
+            np.split(codes, boundaries),
+            np.split(counts, boundaries),
+        )
+        if len(day)
+    ]
 
     # Get start and end time of events
-    start_time = events[timestamp_column_name].min().isoformat(timespec="microseconds")
-    end_time = events[timestamp_column_name].max().isoformat(timespec="microseconds")
+    start_time = time_index.min.isoformat(timespec="microseconds")
+    end_time = time_index.max.isoformat(timespec="microseconds")
 
     return Entity_Time_Info(
         end_time=end_time,
@@ -229,18 +275,65 @@ def set_filter(ocel: ApiOcel, session: ApiSession, filter: Filter):
     return
 
 
+@ocels_router.post(
+    "/filter/preview",
+    response_model=FilterPreview,
+    summary="Preview the result of a filter pipeline",
+    description=(
+        "Returns the number of events per activity and objects per object type that "
+        "would remain after applying the filter pipeline to the original OCEL. "
+        "Counts are computed from the filter masks and cached indexes; the current "
+        "filter is not changed and no filtered OCEL is built."
+    ),
+    operation_id="previewFilters",
+)
+def preview_filter(ocel: ApiOcel, session: ApiSession, filter: Filter) -> FilterPreview:
+    original = session.get_ocel(ocel.id, use_original=True)
+    event_counts, object_counts = original.filter_preview(filter.pipeline)
+    return FilterPreview(
+        events=int(event_counts.sum()),
+        objects=int(object_counts.sum()),
+        event_counts=event_counts.to_dict(),
+        object_counts=object_counts.to_dict(),
+    )
+
+
 # endregion
 # region Import/Export
 @ocels_router.post(
-    "/import", summary="Import OCEL 2.0 from .sqlite file", operation_id="importOcel"
+    "/import",
+    summary="Import OCEL 2.0 from .sqlite, .xmlocel or .jsonocel file",
+    description=(
+        "Receives the file as a stream: It is written to disk and hashed while "
+        "being uploaded, and XML/JSON files are parsed as soon as the first bytes "
+        "arrive. The upload is tracked as an `upload_ocel_task` with byte progress."
+    ),
+    operation_id="importOcel",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "file": {
+                                "type": "string",
+                                "format": "binary",
+                                "description": "An OCEL 2.0 event log (.sqlite, .xmlocel, .jsonocel, optionally gzip-compressed JSON)",
+                            }
+                        },
+                        "required": ["file"],
+                    }
+                }
+            },
+        }
+    },
 )
-def import_ocel(
+async def import_ocel(
     session: ApiSession,
+    request: Request,
     response: Response,
-    file: Annotated[
-        UploadFile,
-        File(description="An OCEL 2.0 event log (.sqlite format)"),
-    ],
     name: Annotated[
         str,
         Query(
@@ -248,49 +341,86 @@ def import_ocel(
         ),
         # Need original file name because client-side formData creation in generated api wrocels_routerer does not retain it
     ],
+    start: Annotated[
+        Optional[datetime.datetime],
+        Query(description="Only import events at or after this time"),
+    ] = None,
+    end: Annotated[
+        Optional[datetime.datetime],
+        Query(description="Only import events before this time"),
+    ] = None,
+    activities: Annotated[
+        Optional[list[str]],
+        Query(description="Only import events of these activities"),
+    ] = None,
+    object_types: Annotated[
+        Optional[list[str]],
+        Query(
+            description="Only import objects of these types, and events related to them"
+        ),
+    ] = None,
 ) -> Response:
-    if file.filename is None or file.filename == "":
-        raise BadRequest("No file uploaded")
-
-    # Save file
     upload_date = datetime.datetime.now()
     file_name_path = Path(name)
     tmp_file_prefix = upload_date.strftime("%Y%m%d-%H%M%S") + "-" + file_name_path.stem
 
-    match file_name_path.suffix.lower():
+    file_suffix = file_name_path.suffix.lower()
+    if file_suffix == ".gz":
+        # Gzip-compressed JSON is detected by the JSON importer
+        file_suffix = Path(file_name_path.stem).suffix.lower()
+        if file_suffix not in (".json", ".jsonocel"):
+            file_suffix = ".gz"
+
+    match file_suffix:
         case ".xml":
             suffix = ".xmlocel"
         case ".json":
             suffix = ".jsonocel"
         case _:
-            suffix = file_name_path.suffix.lower()
+            suffix = file_suffix
 
     if suffix not in SUPPORTED_FILE_TYPES:
         raise BadRequest(
             f"Unsupported file type: {file_name_path.suffix}. Supported types are: {', '.join(SUPPORTED_FILE_TYPES)}"
         )
-    try:
-        with NamedTemporaryFile(
-            delete=False,
-            prefix=name,
-            suffix=suffix,
-        ) as tmp:
-            shutil.copyfileobj(file.file, tmp)
-            tmp_path = Path(tmp.name)
-    except Exception as err:
-        raise err
-    finally:
-        file.file.close()
 
+    selection = ImportSelection(
+        start=start,
+        end=end,
+        activities=frozenset(activities) if activities is not None else None,
+        object_types=frozenset(object_types) if object_types is not None else None,
+    )
+
+    with NamedTemporaryFile(delete=False, prefix=name, suffix=suffix) as tmp:
+        tmp_path = Path(tmp.name)
+    content_length = request.headers.get("content-length")
+    upload = UploadBuffer(
+        tmp_path, total_size=int(content_length) if content_length else None
+    )
+    metadata = {"file_name": tmp_file_prefix, "upload_date": upload_date.isoformat()}
+
+    upload_ocel_task(session=session, upload=upload, metadata=metadata)  # type: ignore
     import_ocel_task(
         session=session,
         path=tmp_path,
         upload_date=upload_date,
         name=tmp_file_prefix,
         suffix=suffix,
-        metadata={"file_name": tmp_file_prefix, "upload_date": upload_date.isoformat()},  # type: ignore
+        upload=upload,
+        selection=selection,
+        metadata=metadata,  # type: ignore
     )
 
+    try:
+        async for chunk in stream_multipart_file(request, field_name="file"):
+            await run_in_threadpool(upload.write, chunk)
+    except TaskCancelled:
+        raise BadRequest("The upload has been cancelled")
+    except BaseException as err:
+        upload.abort(err)
+        raise
+    upload.close()
+
     response.status_code = 200
 
     return response
@@ -344,8 +474,17 @@ def import_default_ocel(
 def download_ocel(
     ocel: ApiOcel,
     ext: Optional[Literal[".xml", ".json", ".sqlite"]],
-) -> TempFileResponse:
+) -> Response:
     name = ocel.meta["fileName"]
+    if ext == ".xml" or ext == ".json":
+        # Stream the serialized OCEL while it is being generated
+        return StreamingResponse(
+            ocel.iter_ocel(ext),
+            media_type="application/xml" if ext == ".xml" else "application/json",
+            headers={"Content-Disposition": f'attachment; filename="{name}{ext}"'},
+        )
+
+    # SQLite pages are rewritten while writing, so the database is written completely first
     tmp_file_prefix = datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + "-" + name
     file_response = TempFileResponse(
         prefix=tmp_file_prefix, suffix=ext, filename=name + (ext or ".sqlite")
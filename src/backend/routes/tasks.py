@@ -7,6 +7,7 @@ from fastapi.routing import APIRouter
 from api.dependencies import ApiSession
 from api.exceptions import NotFound
 from api.model.tasks import TaskSummary
+from util.tasks import TaskState
 
 tasks_router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -31,4 +32,20 @@ def getTask(session: ApiSession, task_id: str) -> TaskSummary:
         state=task.state,
         has_result=task.result is not None,
         metadata=task.metadata,
+        progress=task.progress,
+        stage=task.stage,
     )
+
+
+@tasks_router.post(
+    "/{task_id}/cancel",
+    summary="cancels a running task",
+    operation_id="cancelTask",
+)
+def cancelTask(session: ApiSession, task_id: str) -> TaskSummary:
+    task = session.get_task(task_id)
+    if task is None:
+        raise NotFound("Task not found")
+    if task.state in (TaskState.PENDING, TaskState.STARTED):
+        task.cancel()
+    return getTask(session, task_id)
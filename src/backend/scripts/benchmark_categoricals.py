@@ -0,0 +1,121 @@
+"""
+Compares memory and latency of categorical activity/object type/qualifier columns against plain object columns.
+
+Usage (from src/backend):
+    python scripts/benchmark_categoricals.py [path/to/log.sqlite ...] [--repeat N]
+
+Without paths, the default OCELs listed in DATA_DIR/event_logs.json are used.
+"""
+
+import argparse
+import gc
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Callable
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # project root
+
+# Ensure root is in sys.path
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from pm4py.objects.ocel.obj import OCEL  # noqa: E402
+
+from filters.event_type import EventTypeFilterConfig  # noqa: E402
+from ocel.default_ocel import DEFAULT_OCELS  # noqa: E402
+from ocel.importer import (  # noqa: E402
+    read_ocel2_json,
+    read_ocel2_sqlite,
+    read_ocel2_xml,
+)
+from ocel.importer.base import CATEGORICAL_COLUMNS  # noqa: E402
+from ocel.ocel_wrapper import OCELWrapper  # noqa: E402
+from ocel.utils import OCEL_TABLES, clone_pm4py_ocel  # noqa: E402
+
+READERS = {
+    ".sqlite": read_ocel2_sqlite,
+    ".xmlocel": read_ocel2_xml,
+    ".jsonocel": read_ocel2_json,
+}
+
+
+def table_bytes(ocel: OCEL) -> int:
+    return sum(
+        int(getattr(ocel, table).memory_usage(deep=True).sum()) for table in OCEL_TABLES
+    )
+
+
+def without_categoricals(ocel: OCEL) -> OCEL:
+    """Returns a copy of the OCEL with the categorical columns converted back to object dtype."""
+    clone = clone_pm4py_ocel(ocel)
+    for columns in CATEGORICAL_COLUMNS.values():
+        for table, col in columns:
+            df = getattr(clone, table)
+            if col in df.columns:
+                setattr(clone, table, df.assign(**{col: df[col].astype(object)}))
+    return clone
+
+
+def measure(fn: Callable[[OCELWrapper], object], ocel: OCEL, repeat: int) -> float:
+    """Returns the best time of `repeat` runs, each on a new wrapper (without cached results)."""
+    times = []
+    for _ in range(repeat):
+        wrapper = OCELWrapper(ocel)
+        gc.collect()
+        start = time.perf_counter()
+        fn(wrapper)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchmark(path: Path, repeat: int):
+    with warnings.catch_warnings(record=True):
+        categorical = READERS[path.suffix](path)
+    plain = without_categoricals(categorical)
+    activities = sorted(categorical.events["ocel:activity"].unique().tolist())[::2]
+    filters = [EventTypeFilterConfig(type="event_type", event_types=activities)]
+
+    operations: dict[str, Callable[[OCELWrapper], object]] = {
+        "type_relations": lambda ocel: ocel.type_relations,
+        "objects_per_activity": lambda ocel: ocel.objects_per_activity,
+        "activity_counts": lambda ocel: ocel.activity_counts,
+        "filter_event_type": lambda ocel: ocel.apply_filter(filters),
+    }
+
+    print(
+        f"\n{path.name}: {len(categorical.events)} events, "
+        f"{len(categorical.objects)} objects, {len(categorical.relations)} E2O"
+    )
+    size_plain, size_categorical = table_bytes(plain), table_bytes(categorical)
+    print(
+        f"{'tables':>22}: object {size_plain / 2**20:9.1f} MiB | "
+        f"categorical {size_categorical / 2**20:9.1f} MiB | "
+        f"{size_plain / max(size_categorical, 1):5.2f}x"
+    )
+    for name, fn in operations.items():
+        t_plain = measure(fn, plain, repeat)
+        t_categorical = measure(fn, categorical, repeat)
+        print(
+            f"{name:>22}: object {t_plain:10.4f}s | "
+            f"categorical {t_categorical:10.4f}s | "
+            f"{t_plain / max(t_categorical, 1e-9):5.2f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", type=Path, nargs="*")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    paths = args.paths or [d.path for d in DEFAULT_OCELS]
+    if not paths:
+        parser.error("No paths given, and no default OCELs found in DATA_DIR")
+    for path in paths:
+        benchmark(Path(path), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compares applying filter masks with `apply_masks` against `pm4py.filter_ocel_events` and `pm4py.filter_ocel_objects`.
+
+Usage (from src/backend):
+    python scripts/benchmark_filter_application.py [path/to/log.sqlite ...] [--repeat N] [--fraction F]
+
+Without paths, the default OCELs listed in DATA_DIR/event_logs.json are used.
+Events and objects are selected at random, keeping the given fraction of each.
+The first run of `apply_masks` includes building the cached entity codes and indexes, and is reported separately.
+"""
+
+import argparse
+import gc
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Callable
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # project root
+
+# Ensure root is in sys.path
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import pm4py  # noqa: E402
+from pm4py.objects.ocel.obj import OCEL  # noqa: E402
+
+from filters import FilterResult  # noqa: E402
+from filters.core import apply_masks  # noqa: E402
+from ocel.default_ocel import DEFAULT_OCELS  # noqa: E402
+from ocel.importer import (  # noqa: E402
+    read_ocel2_json,
+    read_ocel2_sqlite,
+    read_ocel2_xml,
+)
+from ocel.utils import OCEL_TABLES  # noqa: E402
+
+READERS = {
+    ".sqlite": read_ocel2_sqlite,
+    ".xmlocel": read_ocel2_xml,
+    ".jsonocel": read_ocel2_json,
+}
+
+
+def apply_masks_pm4py(ocel: OCEL, masks: FilterResult) -> OCEL:
+    """The previous implementation of `apply_filters`, after computing the masks"""
+    if masks.events is not None:
+        eids = ocel.events["ocel:eid"][masks.events]
+        ocel = pm4py.filter_ocel_events(ocel, eids, positive=True)
+    if masks.objects is not None:
+        oids = ocel.objects["ocel:oid"][masks.objects]
+        ocel = pm4py.filter_ocel_objects(ocel, oids, positive=True)
+    return ocel
+
+
+def measure(fn: Callable[[], OCEL], repeat: int) -> tuple[float, OCEL]:
+    times = []
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result  # type: ignore
+
+
+def table_sizes(ocel: OCEL) -> dict[str, int]:
+    return {table: len(getattr(ocel, table)) for table in OCEL_TABLES}
+
+
+def benchmark(path: Path, repeat: int, fraction: float):
+    with warnings.catch_warnings(record=True):
+        ocel = READERS[path.suffix](path)
+    rng = np.random.default_rng(0)
+    masks = FilterResult(
+        events=pd.Series(rng.random(len(ocel.events)) < fraction, ocel.events.index),
+        objects=pd.Series(rng.random(len(ocel.objects)) < fraction, ocel.objects.index),
+    )
+
+    print(
+        f"\n{path.name}: {len(ocel.events)} events, {len(ocel.objects)} objects, "
+        f"{len(ocel.relations)} E2O, {len(ocel.o2o)} O2O, "
+        f"{len(ocel.object_changes)} object changes"
+    )
+
+    gc.collect()
+    start = time.perf_counter()
+    apply_masks(ocel, masks)
+    t_first = time.perf_counter() - start
+
+    t_pm4py, expected = measure(lambda: apply_masks_pm4py(ocel, masks), repeat)
+    t_native, actual = measure(lambda: apply_masks(ocel, masks), repeat)
+
+    print(f"{'pm4py':>22}: {t_pm4py:10.4f}s")
+    print(f"{'apply_masks (cold)':>22}: {t_first:10.4f}s")
+    print(
+        f"{'apply_masks':>22}: {t_native:10.4f}s | "
+        f"{t_pm4py / max(t_native, 1e-9):6.2f}x"
+    )
+    expected_sizes, actual_sizes = table_sizes(expected), table_sizes(actual)
+    if expected_sizes != actual_sizes:
+        print(f"{'MISMATCH':>22}: pm4py {expected_sizes} | native {actual_sizes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", type=Path, nargs="*")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fraction", type=float, default=0.5)
+    args = parser.parse_args()
+
+    paths = args.paths or [d.path for d in DEFAULT_OCELS]
+    if not paths:
+        parser.error("No paths given, and no default OCELs found in DATA_DIR")
+    for path in paths:
+        benchmark(Path(path), args.repeat, args.fraction)
+
+
+if __name__ == "__main__":
+    main()
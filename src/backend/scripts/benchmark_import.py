@@ -0,0 +1,88 @@
+"""
+Compares the native OCEL 2.0 SQLite reader against pm4py's reader.
+
+Usage (from src/backend):
+    python scripts/benchmark_import.py <path/to/log.sqlite> [--repeat N]
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+from typing import Callable
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # project root
+
+# Ensure root is in sys.path
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import pm4py  # noqa: E402
+from pm4py.objects.ocel.obj import OCEL  # noqa: E402
+
+from ocel.importer import read_ocel2_sqlite  # noqa: E402
+
+
+def table_bytes(ocel: OCEL) -> int:
+    return sum(
+        int(df.memory_usage(deep=True).sum())
+        for df in (ocel.events, ocel.objects, ocel.relations, ocel.object_changes)
+    )
+
+
+def measure(name: str, read: Callable[[], OCEL], repeat: int):
+    times = []
+    peak = 0
+    ocel = None
+    for _ in range(repeat):
+        del ocel
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        with warnings.catch_warnings(record=True):
+            ocel = read()
+        times.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    assert ocel is not None
+    size = table_bytes(ocel)
+    print(
+        f"{name:>8}: best {min(times):8.3f}s | mean {sum(times) / len(times):8.3f}s | "
+        f"peak {peak / 2**20:9.1f} MiB | tables {size / 2**20:9.1f} MiB | "
+        f"{len(ocel.events)} events, {len(ocel.objects)} objects, "
+        f"{len(ocel.relations)} E2O, {len(ocel.object_changes)} changes"
+    )
+    return ocel
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Benchmarking OCEL 2.0 SQLite import of {args.path} ({args.repeat} runs)")
+    reference = measure(
+        "pm4py", lambda: pm4py.read.read_ocel2_sqlite(str(args.path)), args.repeat
+    )
+    native = measure("native", lambda: read_ocel2_sqlite(args.path), args.repeat)
+
+    # Sanity check: Both readers should produce the same entities
+    for table, col in [("events", "ocel:eid"), ("objects", "ocel:oid")]:
+        ref_ids = set(getattr(reference, table)[col])
+        native_ids = set(getattr(native, table)[col])
+        if ref_ids != native_ids:
+            print(f"WARNING: {table} differ ({len(ref_ids ^ native_ids)} IDs)")
+    if len(reference.relations) != len(native.relations):
+        print(
+            f"WARNING: E2O relation count differs "
+            f"({len(reference.relations)} vs. {len(native.relations)})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,33 @@
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from api.session import Session
+from api.upload import ReadAborted, UploadBuffer
+from ocel.importer import ImportSelection
 from ocel.ocel_wrapper import OCELWrapper
-from util.tasks import task
+from ocel.snapshot import snapshot_cache
+from util.constants import STREAMING_FILE_TYPES
+from util.tasks import TaskCancelled, raise_if_cancelled, task
+
+
+@task()
+def upload_ocel_task(
+    session: Session,
+    upload: UploadBuffer,
+    stop_event=None,
+    progress=None,
+):
+    """Tracks an upload received by the import route, reporting the fraction of bytes received.
+    Cancelling this task aborts the upload."""
+    if progress is not None:
+        progress(0.0, "Uploading")
+    while not upload.wait(timeout=0.2):
+        if stop_event is not None and stop_event.is_set():
+            upload.abort(TaskCancelled())
+        if upload.progress is not None and progress is not None:
+            progress(upload.progress)
+    return upload.content_hash
 
 
 @task()
@@ -13,15 +37,58 @@ def import_ocel_task(
     name: str,
     suffix: str,
     upload_date: datetime,
+    upload: Optional[UploadBuffer] = None,
+    selection: Optional[ImportSelection] = None,
     stop_event=None,
-):  # Save file
-    # pm4py-based import
-    ocel = OCELWrapper.read_ocel(
-        str(path),
-        original_file_name=name,
-        version_info=True,
-        output=True,
-        upload_date=upload_date,
-    )
+    progress=None,
+):
+    # Partial imports neither use nor populate the snapshot cache
+    cache = snapshot_cache if selection is None or selection.is_empty else None
+
+    def read_ocel(**kwargs):
+        return OCELWrapper.read_ocel(
+            str(path),
+            original_file_name=name,
+            version_info=True,
+            output=True,
+            upload_date=upload_date,
+            progress=progress,
+            stop_event=stop_event,
+            selection=selection,
+            **kwargs,
+        )
+
+    try:
+        if upload is None:
+            ocel = read_ocel()
+        elif suffix not in STREAMING_FILE_TYPES:
+            if progress is not None:
+                progress(None, "Waiting for upload")
+            while not upload.wait(timeout=0.2):
+                raise_if_cancelled(stop_event)
+            ocel = read_ocel(content_hash=upload.content_hash)
+        else:
+            # Parse while uploading. Once the hash is known, switch to an existing snapshot
+            source = upload.reader(
+                abort_if=cache.has if cache is not None else None,
+                stop_event=stop_event,
+            )
+            try:
+                ocel = read_ocel(source=source)
+            except ReadAborted:
+                ocel = read_ocel(content_hash=upload.content_hash)
+            else:
+                upload.wait()
+                if cache is not None and upload.content_hash is not None:
+                    cache.store(upload.content_hash, ocel.ocel)
+            finally:
+                source.close()
+
+        raise_if_cancelled(stop_event)
+    except TaskCancelled:
+        # The upload cannot be used anymore, stop receiving it
+        if upload is not None:
+            upload.abort(TaskCancelled())
+        raise
 
     session.add_ocel(ocel)
@@ -0,0 +1,254 @@
+import copy
+import os
+import warnings
+
+# Tests must not read or write the snapshot cache of the local installation
+os.environ["SNAPSHOT_CACHE_MAX_SIZE_MB"] = "0"
+
+from datetime import datetime, timedelta, timezone  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import Callable  # noqa: E402
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import pm4py  # noqa: E402
+import pytest  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from pm4py.objects.ocel.obj import OCEL  # noqa: E402
+from pm4py.objects.ocel.util import filtering_utils, ocel_consistency  # noqa: E402
+
+from api.config import config  # noqa: E402
+from api.middleware import ocel_access_middleware  # noqa: E402
+from api.session import Session  # noqa: E402
+from ocel.importer.builder import OcelBuilder  # noqa: E402
+from ocel.utils import uncategorize_ocel  # noqa: E402
+from routes.ocels import ocels_router  # noqa: E402
+
+pd.set_option("mode.copy_on_write", True)  # As in index.py
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "data" / "event_logs"
+PALLET_LOGISTICS = DATA_DIR / "pallet-logistics-v0.9.sqlite"
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def iso(t: datetime) -> str:
+    return t.isoformat().replace("+00:00", "Z")
+
+
+def generate_ocel(num_orders: int = 200, seed: int = 0) -> OCEL:
+    """Generates an order-to-delivery OCEL covering the features used by filters and exporters:
+    Typed event and object attributes, object attribute changes, qualified E2O and O2O relations,
+    and objects without any E2O relation (warehouses)."""
+    rng = np.random.default_rng(seed)
+    builder = OcelBuilder()
+    for name, attribute_type in [
+        ("price", "float"),
+        ("resource", "string"),
+        ("segment", "string"),
+        ("priority", "string"),
+        ("status", "string"),
+        ("weight", "float"),
+    ]:
+        builder.declare_attribute(name, attribute_type)
+
+    customers = [f"c{i}" for i in range(max(num_orders // 10, 1))]
+    for i, cid in enumerate(customers):
+        builder.add_object(cid, "Customer", {"segment": "AB"[i % 2]})
+    for i in range(3):
+        builder.add_object(f"w{i}", "Warehouse", {"city": f"City {i}"})
+
+    resources = ["alice", "bob", "carol"]
+    item_count = 0
+    event_count = 0
+
+    def event(activity: str, t: datetime, oids: list[tuple[str, str]], **attributes):
+        nonlocal event_count
+        eid = f"e{event_count}"
+        event_count += 1
+        builder.add_event(
+            eid,
+            activity,
+            iso(t),
+            {"resource": resources[int(rng.integers(len(resources)))], **attributes},
+        )
+        for oid, qualifier in oids:
+            builder.add_e2o(eid, oid, qualifier)
+
+    for i in range(num_orders):
+        oid = f"o{i}"
+        customer = customers[int(rng.integers(len(customers)))]
+        items = [f"i{item_count + k}" for k in range(int(rng.integers(1, 5)))]
+        item_count += len(items)
+        package = f"p{i}"
+
+        t = START + timedelta(hours=6 * i)
+        builder.add_object(oid, "Order", {"priority": ["low", "high"][i % 2]})
+        builder.add_object(package, "Package")
+        for item in items:
+            builder.add_object(item, "Item", {"weight": float(rng.integers(1, 20))})
+            builder.add_o2o(oid, item, "contains")
+            builder.add_o2o(package, item, "packs")
+        builder.add_o2o(oid, customer, "placed by")
+
+        event(
+            "place order",
+            t,
+            [(oid, "order"), (customer, "customer")] + [(it, "item") for it in items],
+        )
+        builder.add_object_change(oid, "Order", iso(t), "status", "placed")
+
+        t += timedelta(hours=float(rng.uniform(1, 48)))
+        if i % 10 == 9:
+            event("cancel", t, [(oid, "order")])
+            builder.add_object_change(oid, "Order", iso(t), "status", "cancelled")
+            continue
+        event("pay", t, [(oid, "order")], price=float(rng.integers(10, 500)))
+        builder.add_object_change(oid, "Order", iso(t), "status", "paid")
+
+        for item in items:
+            t += timedelta(minutes=float(rng.uniform(5, 120)))
+            event("pick item", t, [(item, "item")])
+            if rng.random() < 0.3:
+                builder.add_object_change(
+                    item, "Item", iso(t), "weight", float(rng.integers(1, 20))
+                )
+
+        t += timedelta(hours=float(rng.uniform(1, 24)))
+        event(
+            "ship",
+            t,
+            [(oid, "order"), (package, "package")] + [(it, "item") for it in items],
+        )
+        builder.add_object_change(oid, "Order", iso(t), "status", "shipped")
+
+        t += timedelta(hours=float(rng.uniform(12, 96)))
+        event("deliver", t, [(package, "package")])
+
+    return builder.build()
+
+
+@pytest.fixture(scope="session")
+def ocel() -> OCEL:
+    """Synthetic OCEL shared by all tests. Must not be modified."""
+    return generate_ocel()
+
+
+TABLE_KEYS = {
+    "events": ["ocel:eid"],
+    "objects": ["ocel:oid"],
+    "relations": ["ocel:eid", "ocel:oid", "ocel:qualifier"],
+    "o2o": ["ocel:oid", "ocel:oid_2", "ocel:qualifier"],
+    "e2e": ["ocel:eid", "ocel:eid_2", "ocel:qualifier"],
+    "object_changes": ["ocel:oid", "ocel:timestamp", "ocel:field"],
+}
+
+
+def normalize_table(df: pd.DataFrame, table: str) -> pd.DataFrame:
+    """Brings a table into a canonical form for comparison: Plain object columns instead of categoricals,
+    rows sorted by their key columns, and columns sorted by name.
+    Attribute columns without any value are dropped, as their presence depends on the tables that were read."""
+    df = df.drop(
+        columns=[
+            col
+            for col in df.columns
+            if not str(col).startswith("ocel:") and df[col].isna().all()
+        ]
+    )
+    df = df.astype(
+        {
+            col: object
+            for col, dtype in df.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        }
+    )
+    keys = [key for key in TABLE_KEYS[table] if key in df.columns]
+    df = df.sort_values(keys, kind="stable") if keys else df
+    return df[sorted(df.columns)].reset_index(drop=True)
+
+
+def assert_tables_equal(actual: OCEL, expected: OCEL, tables=tuple(TABLE_KEYS)):
+    for table in tables:
+        pd.testing.assert_frame_equal(
+            normalize_table(getattr(actual, table), table),
+            normalize_table(getattr(expected, table), table),
+            check_dtype=False,
+            check_index_type=False,
+            obj=table,
+        )
+
+
+def table_ids(ocel: OCEL) -> dict[str, set]:
+    """The rows of each table, as sets of key tuples"""
+    return {
+        table: set(
+            map(tuple, getattr(ocel, table)[TABLE_KEYS[table]].astype(str).to_numpy())
+        )
+        for table in TABLE_KEYS
+    }
+
+
+def write_pm4py(write: Callable[[OCEL, str], None], ocel: OCEL, path: Path) -> Path:
+    """Writes a copy of the OCEL with a pm4py exporter, as those modify the tables of the passed OCEL in place.
+    Categorical columns are converted to strings, which pm4py's exporters group by."""
+    write(copy.deepcopy(uncategorize_ocel(ocel)), str(path))
+    return path
+
+
+@pytest.fixture(scope="session")
+def pm4py_ocel(ocel) -> OCEL:
+    """The synthetic OCEL as pm4py's exporters write it, without objects that are not related to any event"""
+    with warnings.catch_warnings(record=True):
+        return filtering_utils.propagate_relations_filtering(
+            ocel_consistency.apply(copy.deepcopy(ocel))
+        )
+
+
+def read_pm4py(read: Callable[[str], OCEL], path: Path) -> OCEL:
+    """Reads a file with a pm4py importer, dropping pm4py's internal helper columns"""
+    with warnings.catch_warnings(record=True):
+        ocel = read(str(path))
+    ocel.object_changes = ocel.object_changes.drop(
+        columns="@@cumcount", errors="ignore"
+    )
+    return ocel
+
+
+@pytest.fixture(scope="session")
+def pm4py_sqlite(ocel, tmp_path_factory) -> Path:
+    """The synthetic OCEL, written to SQLite by pm4py"""
+    path = tmp_path_factory.mktemp("ocel") / "generated.sqlite"
+    return write_pm4py(pm4py.write_ocel2_sqlite, ocel, path)
+
+
+@pytest.fixture
+def session() -> Session:
+    session = Session()
+    yield session
+    Session.sessions.pop(session.id, None)
+
+
+@pytest.fixture
+def client(session) -> TestClient:
+    """Client of an app serving the OCEL routes, with requests assigned to `session`"""
+    app = FastAPI()
+    app.middleware("http")(ocel_access_middleware)
+    app.include_router(ocels_router)
+    client = TestClient(app)
+    client.cookies.set(config.SESSION_ID_HEADER, session.id)
+    return client
+
+
+@pytest.fixture(scope="session")
+def pm4py_xml(ocel, tmp_path_factory) -> Path:
+    """The synthetic OCEL, written to XML by pm4py"""
+    path = tmp_path_factory.mktemp("ocel") / "generated.xmlocel"
+    return write_pm4py(pm4py.write_ocel2_xml, ocel, path)
+
+
+@pytest.fixture(scope="session")
+def pm4py_json(ocel, tmp_path_factory) -> Path:
+    """The synthetic OCEL, written to JSON by pm4py (which truncates event timestamps to seconds)"""
+    path = tmp_path_factory.mktemp("ocel") / "generated.jsonocel"
+    return write_pm4py(pm4py.write_ocel2_json, ocel, path)
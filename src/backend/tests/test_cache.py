@@ -0,0 +1,105 @@
+import gc
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.conftest import generate_ocel
+from util import cache as cache_module
+from util.cache import ByteBudgetCache, GlobalCacheBudget, ocel_cached
+
+
+def test_byte_budget_cache_evicts_lru():
+    cache = ByteBudgetCache(maxsize=3000)
+    cache["a"] = "a" * 1000
+    cache["b"] = "b" * 1000
+    cache["a"]
+    cache["c"] = "c" * 1000
+    assert list(cache) == ["a", "c"]
+    assert cache.currsize <= cache.maxsize
+    assert set(cache.sizes) == {"a", "c"}
+
+
+def test_global_budget_evicts_from_largest_cache():
+    budget = GlobalCacheBudget(maxsize=5000)
+    small = ByteBudgetCache(maxsize=10**6, lock=threading.Lock(), budget=budget)
+    large = ByteBudgetCache(maxsize=10**6, lock=threading.Lock(), budget=budget)
+    small["x"] = "x" * 1000
+    for i in range(3):
+        large[i] = str(i) * 1000
+    assert set(budget.caches) == {small, large}
+
+    small["y"] = "y" * 1000
+    assert budget.currsize <= budget.maxsize
+    assert list(small) == ["x", "y"]
+    assert list(large) == [1, 2]
+
+
+def test_caches_compare_by_identity():
+    budget = GlobalCacheBudget(maxsize=10**6)
+    a = ByteBudgetCache(maxsize=10**6, budget=budget)
+    b = ByteBudgetCache(maxsize=10**6, budget=budget)
+    assert a != b and a == a
+    assert len(budget.caches) == 2
+    del a
+    assert budget.caches == [b]
+
+
+def test_ocel_cached_computes_functions_concurrently():
+    ocel = generate_ocel(num_orders=5)
+    # Each function waits until the other one is being computed, which times out if computations are serialized
+    barrier = threading.Barrier(2, timeout=5)
+    calls = []
+
+    @ocel_cached("events")
+    def first(ocel):
+        calls.append("first")
+        barrier.wait()
+        return len(ocel.events)
+
+    @ocel_cached("objects")
+    def second(ocel):
+        calls.append("second")
+        barrier.wait()
+        return len(ocel.objects)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(f, ocel) for f in [first, second, first, second]]
+        results = [future.result() for future in futures]
+    assert results == [len(ocel.events), len(ocel.objects)] * 2
+    assert sorted(calls) == ["first", "second"]
+
+
+def test_ocel_cached_recomputes_after_table_change():
+    ocel = generate_ocel(num_orders=5)
+    calls = []
+
+    @ocel_cached("events")
+    def count(ocel):
+        calls.append(1)
+        return len(ocel.events)
+
+    assert count(ocel) == count(ocel) == len(ocel.events)
+    ocel.events = ocel.events.iloc[:3]
+    assert count(ocel) == 3
+    assert len(calls) == 2
+
+
+def test_ocel_cached_does_not_hash_ocel(monkeypatch):
+    ocel = generate_ocel(num_orders=5)
+
+    def fail(self):
+        raise AssertionError("OCEL hashed")
+
+    # pm4py hashes an OCEL by formatting all of its tables
+    monkeypatch.setattr(type(ocel), "__hash__", fail)
+    monkeypatch.setattr(type(ocel), "__eq__", fail)
+
+    @ocel_cached("events")
+    def count(ocel):
+        return len(ocel.events)
+
+    assert count(ocel) == len(ocel.events)
+    key = id(ocel)
+    assert key in cache_module._ocel_caches
+    del ocel
+    gc.collect()
+    assert key not in cache_module._ocel_caches
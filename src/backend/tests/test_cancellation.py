@@ -0,0 +1,87 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+from api.upload import UploadBuffer
+import ocel.importer.json
+import ocel.importer.xml
+from ocel.importer import read_ocel2_json, read_ocel2_sqlite, read_ocel2_xml
+from ocel.ocel_wrapper import OCELWrapper
+from tasks.ocel import import_ocel_task, upload_ocel_task
+from util.tasks import TaskCancelled, TaskState
+
+READERS = {
+    "pm4py_sqlite": read_ocel2_sqlite,
+    "pm4py_xml": read_ocel2_xml,
+    "pm4py_json": read_ocel2_json,
+}
+
+
+@pytest.mark.parametrize("fixture", READERS)
+def test_reader_raises_when_cancelled(request, fixture):
+    stop_event = threading.Event()
+    stop_event.set()
+    with pytest.raises(TaskCancelled):
+        READERS[fixture](request.getfixturevalue(fixture), stop_event=stop_event)
+
+
+@pytest.mark.parametrize("fixture", ["pm4py_xml", "pm4py_json"])
+def test_streaming_reader_stops_after_progress(request, monkeypatch, fixture):
+    module = ocel.importer.xml if fixture == "pm4py_xml" else ocel.importer.json
+    monkeypatch.setattr(module, "PROGRESS_INTERVAL", 1)
+    stop_event = threading.Event()
+    progress = []
+
+    def cancel(fraction, stage=None):
+        progress.append(fraction)
+        stop_event.set()
+
+    with pytest.raises(TaskCancelled):
+        READERS[fixture](
+            request.getfixturevalue(fixture), progress=cancel, stop_event=stop_event
+        )
+    assert len(progress) == 1
+
+
+def test_read_ocel_stops_after_stage(pm4py_xml):
+    stop_event = threading.Event()
+    stages = []
+
+    def cancel(fraction, stage=None):
+        if stage is not None:
+            stages.append(stage)
+            stop_event.set()
+
+    with pytest.raises(TaskCancelled):
+        OCELWrapper.read_ocel(
+            pm4py_xml, output=False, progress=cancel, stop_event=stop_event
+        )
+    assert len(stages) == 1
+
+
+def test_cancel_import_during_upload(session, tmp_path, pm4py_xml):
+    content = pm4py_xml.read_bytes()
+    upload = UploadBuffer(tmp_path / "upload.xmlocel", total_size=len(content))
+    upload.write(content[: len(content) // 2])
+    upload_id = upload_ocel_task(session=session, upload=upload)
+    import_id = import_ocel_task(
+        session=session,
+        path=upload.path,
+        name=pm4py_xml.name,
+        suffix=".xmlocel",
+        upload_date=datetime.now(),
+        upload=upload,
+    )
+
+    session.get_task(import_id).cancel()
+    for task in session.tasks.values():
+        task.join(timeout=30)
+
+    assert session.get_task(import_id).state == TaskState.CANCELLED
+    assert session.get_task(upload_id).state == TaskState.CANCELLED
+    assert not session.running_tasks
+    assert not session.ocels
+    # The import route stops receiving the request body
+    with pytest.raises(TaskCancelled):
+        upload.write(content[len(content) // 2 :])
@@ -0,0 +1,50 @@
+from collections import Counter
+
+import pandas as pd
+
+from ocel.ocel_wrapper import OCELWrapper
+from ocel.utils import clone_pm4py_ocel, ocel_summary, uncategorize_ocel
+
+
+def expected_dfg(ocel, otype: str) -> Counter:
+    relations = ocel.relations[ocel.relations["ocel:type"] == otype]
+    relations = relations.sort_values(["ocel:oid", "ocel:timestamp"], kind="stable")
+    dfg = Counter()
+    for _, trace in relations.groupby("ocel:oid", sort=False):
+        activities = trace["ocel:activity"].astype(str).tolist()
+        dfg.update(zip(activities, activities[1:]))
+    return dfg
+
+
+def test_categorical_columns(ocel):
+    # Discovery must also work with the categorical columns created by the importers
+    assert isinstance(ocel.events["ocel:activity"].dtype, pd.CategoricalDtype)
+    assert isinstance(ocel.relations["ocel:type"].dtype, pd.CategoricalDtype)
+
+
+def test_directly_follows_graph(ocel):
+    wrapper = OCELWrapper(ocel)
+    for otype in ["Order", "Item", "Package"]:
+        assert Counter(wrapper.dfg(otype)) == expected_dfg(ocel, otype)
+
+
+def test_eventually_follows_graph(ocel):
+    efg = OCELWrapper(ocel).efg("Order")
+    assert ("place order", "ship") in efg
+    assert ("ship", "place order") not in efg
+
+
+def test_ocpn(ocel):
+    # The relations of other object types are filtered out, leaving unused categories
+    ocpn = OCELWrapper(ocel).ocpn({"Order", "Item"})
+    assert set(ocpn["object_types"]) == {"Order", "Item"}
+    assert {"place order", "ship"} <= set(ocpn["activities"])
+
+
+def test_summary_omits_unused_categories(ocel):
+    filtered = clone_pm4py_ocel(ocel)
+    filtered.events = ocel.events[ocel.events["ocel:activity"] == "ship"]
+    filtered.relations = ocel.relations[ocel.relations["ocel:activity"] == "ship"]
+    summary = ocel_summary(filtered)
+    assert summary == str(uncategorize_ocel(filtered))
+    assert "place order" not in summary
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pm4py
+import pytest
+from pm4py.objects.ocel.obj import OCEL
+
+from filters import FilterResult
+from filters.core import apply_filters, apply_masks, compute_combined_masks
+from filters.event_type import EventTypeFilterConfig
+from filters.object_type import ObjectTypeFilterConfig
+from filters.time_range import TimeFrameFilterConfig
+from tests.conftest import START, iso, table_ids
+
+
+def apply_masks_pm4py(ocel: OCEL, masks: FilterResult) -> OCEL:
+    """The previous implementation of `apply_filters`, after computing the masks"""
+    eids = ocel.events["ocel:eid"][masks.events] if masks.events is not None else None
+    oids = (
+        ocel.objects["ocel:oid"][masks.objects] if masks.objects is not None else None
+    )
+    if eids is not None:
+        ocel = pm4py.filter_ocel_events(ocel, eids, positive=True)
+    if oids is not None:
+        ocel = pm4py.filter_ocel_objects(ocel, oids, positive=True)
+    return ocel
+
+
+FILTERS = {
+    "event types": [
+        EventTypeFilterConfig(type="event_type", event_types=["pay", "ship"])
+    ],
+    "exclude object type": [
+        ObjectTypeFilterConfig(
+            type="object_type", object_types=["Item"], mode="exclude"
+        )
+    ],
+    "time frame": [
+        TimeFrameFilterConfig(
+            type="time_frame",
+            time_range=(iso(START), iso(START + pd.Timedelta(days=10))),
+        )
+    ],
+    "combined": [
+        EventTypeFilterConfig(
+            type="event_type", event_types=["deliver", "cancel"], mode="exclude"
+        ),
+        ObjectTypeFilterConfig(type="object_type", object_types=["Order", "Package"]),
+    ],
+    "no events": [EventTypeFilterConfig(type="event_type", event_types=[])],
+    "no objects": [ObjectTypeFilterConfig(type="object_type", object_types=[])],
+}
+
+
+@pytest.mark.parametrize("filters", FILTERS.values(), ids=FILTERS.keys())
+def test_apply_filters_matches_pm4py(ocel, filters):
+    expected = apply_masks_pm4py(ocel, compute_combined_masks(ocel, filters))
+    assert table_ids(apply_filters(ocel, filters)) == table_ids(expected)
+
+
+@pytest.mark.parametrize("sides", ["events", "objects", "both"])
+@pytest.mark.parametrize("fraction", [0.05, 0.5, 0.95])
+def test_apply_masks_matches_pm4py(ocel, sides, fraction):
+    rng = np.random.default_rng(int(fraction * 100))
+    masks = FilterResult(
+        events=pd.Series(rng.random(len(ocel.events)) < fraction, ocel.events.index)
+        if sides != "objects"
+        else None,
+        objects=pd.Series(rng.random(len(ocel.objects)) < fraction, ocel.objects.index)
+        if sides != "events"
+        else None,
+    )
+    filtered = apply_masks(ocel, masks)
+    assert table_ids(filtered) == table_ids(apply_masks_pm4py(ocel, masks))
+    assert list(filtered.events.columns) == list(ocel.events.columns)
+
+
+def test_apply_masks_does_not_modify_input(ocel):
+    before = table_ids(ocel)
+    masks = FilterResult(
+        events=pd.Series(False, index=ocel.events.index),
+        objects=pd.Series(True, index=ocel.objects.index),
+    )
+    filtered = apply_masks(ocel, masks)
+    assert all(len(getattr(filtered, table)) == 0 for table in before)
+    assert table_ids(ocel) == before
@@ -0,0 +1,193 @@
+import pandas as pd
+import pytest
+
+from filters import FilterResult
+from filters.attributes import EventAttributeFilterConfig, ObjectAttributeFilterConfig
+from filters.core import compute_combined_masks, compute_filter_mask
+from filters.event_type import EventTypeFilterConfig
+from filters.object_type import ObjectTypeFilterConfig
+from filters.planner import plan_filters
+from filters.relation_count import E2OCountFilterConfig, O2OCountFilterConfig
+from filters.time_range import TimeFrameFilterConfig
+import ocel.ocel_wrapper as ocel_wrapper
+from ocel.ocel_wrapper import OCELWrapper
+from tests.conftest import START, iso
+from util.cache import ByteBudgetCache
+
+PIPELINE = [
+    EventAttributeFilterConfig(
+        type="event_attribute",
+        target_type="pay",
+        attribute="price",
+        number_range=(50, 400),
+    ),
+    ObjectTypeFilterConfig(
+        type="object_type", object_types=["Warehouse"], mode="exclude"
+    ),
+    EventAttributeFilterConfig(
+        type="event_attribute",
+        target_type="pay",
+        attribute="price",
+        number_range=(None, 300),
+    ),
+    TimeFrameFilterConfig(
+        type="time_frame", time_range=(iso(START), iso(START + pd.Timedelta(days=40)))
+    ),
+    EventAttributeFilterConfig(
+        type="event_attribute",
+        target_type="ship",
+        attribute="resource",
+        regex="^(alice|bob)$",
+    ),
+    ObjectAttributeFilterConfig(
+        type="object_attribute",
+        target_type="Order",
+        attribute="priority",
+        values=["high"],
+    ),
+    ObjectAttributeFilterConfig(
+        type="object_attribute",
+        target_type="Item",
+        attribute="weight",
+        number_range=(3, None),
+    ),
+    E2OCountFilterConfig(type="e2o_count", source="Order", target="ship", range=(0, 1)),
+    O2OCountFilterConfig(type="o2o_count", source="Order", target="Item", range=(1, 3)),
+    EventTypeFilterConfig(type="event_type", event_types=["deliver"], mode="exclude"),
+]
+
+
+def naive_masks(ocel, filters) -> FilterResult:
+    """Evaluates each filter on all rows and combines the masks in pipeline order"""
+    combined = FilterResult(
+        events=pd.Series(True, index=ocel.events.index),
+        objects=pd.Series(True, index=ocel.objects.index),
+    )
+    for config in filters:
+        combined = combined.and_merge(compute_filter_mask(ocel, config))
+    return combined
+
+
+def assert_masks_equal(actual: FilterResult, expected: FilterResult):
+    pd.testing.assert_series_equal(actual.events, expected.events, check_names=False)
+    pd.testing.assert_series_equal(actual.objects, expected.objects, check_names=False)
+
+
+def test_plan_merges_attribute_filters(ocel):
+    plan = plan_filters(ocel, PIPELINE)
+    assert sum(len(step.configs) for step in plan) == len(PIPELINE)
+    price_steps = [
+        step for step in plan if getattr(step.configs[0], "attribute", None) == "price"
+    ]
+    assert len(price_steps) == 1 and len(price_steps[0].configs) == 2
+    # Whole-column filters keep the pipeline order, restricted steps follow sorted by cost
+    eager = [step.configs[0] for step in plan if step.restricted is None]
+    restricted = [step for step in plan if step.restricted is not None]
+    assert all(step.restricted is None for step in plan[: len(eager)])
+    assert eager == [
+        config
+        for config in PIPELINE
+        if not isinstance(
+            config, (EventAttributeFilterConfig, ObjectAttributeFilterConfig)
+        )
+    ]
+    assert [step.cost for step in restricted] == sorted(
+        step.cost for step in restricted
+    )
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+@pytest.mark.parametrize("length", [1, 3, 6, len(PIPELINE)])
+def test_planned_masks_equal_naive_masks(ocel, max_workers, length):
+    filters = PIPELINE[:length]
+    assert_masks_equal(
+        compute_combined_masks(ocel, filters, max_workers=max_workers),
+        naive_masks(ocel, filters),
+    )
+
+
+def test_restricted_steps_stop_without_rows(ocel):
+    filters = [EventTypeFilterConfig(type="event_type", event_types=[])] + PIPELINE
+    masks = compute_combined_masks(ocel, filters)
+    assert not masks.events.any()
+    assert_masks_equal(masks, naive_masks(ocel, filters))
+
+
+def test_wrapper_caches_filter_masks(ocel):
+    wrapper = OCELWrapper(ocel)
+    masks = compute_combined_masks(
+        ocel,
+        PIPELINE,
+        compute_mask=wrapper.filter_mask,
+        compute_restricted=wrapper.restricted_filter_mask,
+    )
+    assert_masks_equal(masks, naive_masks(ocel, PIPELINE))
+    assert wrapper.cache_size["filter_mask"] > 0
+    assert wrapper.cache_size["restricted_filter_mask"] > 0
+    cached_keys = set(wrapper.cache)
+
+    # Re-running the pipeline reuses all masks. Appending an event filter only computes the masks of that filter,
+    # and of the restricted event attribute steps evaluated on the remaining rows.
+    wrapper.filter_preview(PIPELINE)
+    assert set(wrapper.cache) == cached_keys
+    wrapper.filter_preview(
+        PIPELINE
+        + [
+            EventTypeFilterConfig(
+                type="event_type", event_types=["pay"], mode="exclude"
+            )
+        ]
+    )
+    added = [key[0] for key in set(wrapper.cache) - cached_keys]
+    assert sorted(added) == ["filter_mask"] + ["restricted_filter_mask"] * 2
+
+
+def test_restricted_filter_mask_is_cached_by_rows(ocel):
+    wrapper = OCELWrapper(ocel)
+    calls = []
+
+    def evaluate(ocel, configs, rows):
+        calls.append(rows)
+        return FilterResult(events=pd.Series(rows, index=ocel.events.index))
+
+    rows = ocel.events.index.to_numpy() % 2 == 0
+    configs = PIPELINE[:1]
+    first = wrapper.restricted_filter_mask(evaluate, configs, rows)
+    assert wrapper.restricted_filter_mask(evaluate, configs, rows.copy()) is first
+    assert len(calls) == 1
+    wrapper.restricted_filter_mask(evaluate, configs, ~rows)
+    wrapper.restricted_filter_mask(evaluate, PIPELINE[2:3], rows)
+    assert len(calls) == 3
+
+
+def test_filter_mask_is_cached_by_config(ocel, monkeypatch):
+    calls = []
+
+    def compute(ocel, config):
+        calls.append(config)
+        return compute_filter_mask(ocel, config)
+
+    monkeypatch.setattr(ocel_wrapper, "compute_filter_mask", compute)
+    wrapper = OCELWrapper(ocel)
+    eager = [PIPELINE[1], PIPELINE[3], PIPELINE[9]]
+    wrapper.apply_filter(eager)
+    assert len(calls) == len(eager)
+
+    # Changing one filter only recomputes its masks, equal configs share cache entries
+    changed = eager[:2] + [
+        EventTypeFilterConfig(type="event_type", event_types=["pay"], mode="exclude")
+    ]
+    filtered = wrapper.apply_filter(changed)
+    assert calls[len(eager) :] == [changed[2]]
+    wrapper.apply_filter([config.model_copy() for config in changed])
+    assert len(calls) == len(eager) + 1
+    assert "pay" not in set(filtered.ocel.events["ocel:activity"])
+
+
+def test_filter_mask_larger_than_cache(ocel):
+    wrapper = OCELWrapper(ocel)
+    wrapper.cache = ByteBudgetCache(maxsize=1000, lock=wrapper.cache_lock)
+    masks = wrapper.filter_mask(PIPELINE[1])
+    expected = compute_filter_mask(ocel, PIPELINE[1])
+    pd.testing.assert_series_equal(masks.objects, expected.objects)
+    assert not wrapper.cache.sizes
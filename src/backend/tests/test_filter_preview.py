@@ -0,0 +1,52 @@
+import pytest
+
+from api.model.ocel import Filter
+from filters.core import apply_filters, compute_combined_masks, count_remaining
+from ocel.ocel_wrapper import OCELWrapper
+from tests.test_filter_application import FILTERS
+from tests.test_filter_pipeline import PIPELINE
+
+PIPELINES = {**FILTERS, "pipeline": PIPELINE, "none": []}
+
+
+@pytest.mark.parametrize("filters", PIPELINES.values(), ids=PIPELINES.keys())
+def test_preview_counts_equal_filtered_counts(ocel, filters):
+    event_counts, object_counts = count_remaining(
+        ocel, compute_combined_masks(ocel, filters)
+    )
+    filtered = apply_filters(ocel, filters)
+    assert event_counts[event_counts > 0].to_dict() == (
+        filtered.events["ocel:activity"].value_counts().loc[lambda c: c > 0].to_dict()
+    )
+    assert object_counts[object_counts > 0].to_dict() == (
+        filtered.objects["ocel:type"].value_counts().loc[lambda c: c > 0].to_dict()
+    )
+    # All activities and object types are listed, including those without any rows left
+    assert set(event_counts.index) == set(ocel.events["ocel:activity"])
+    assert set(object_counts.index) == set(ocel.objects["ocel:type"])
+
+
+def test_preview_endpoint(ocel, session, client):
+    wrapper = OCELWrapper(ocel)
+    session.add_ocel(wrapper)
+    pipeline = [
+        {"type": "event_type", "event_types": ["pay", "ship"]},
+        {"type": "object_type", "object_types": ["Item"], "mode": "exclude"},
+    ]
+    response = client.post(
+        "/ocels/filter/preview",
+        params={"ocel_id": wrapper.id},
+        json={"pipeline": pipeline},
+    )
+    assert response.status_code == 200
+    preview = response.json()
+
+    filtered = wrapper.apply_filter(Filter(pipeline=pipeline).pipeline).ocel
+    assert preview["events"] == len(filtered.events)
+    assert preview["objects"] == len(filtered.objects)
+    assert (
+        preview["event_counts"]["pay"]
+        == (filtered.events["ocel:activity"] == "pay").sum()
+    )
+    # The preview does not change the current filter
+    assert not session.get_ocel_filters(wrapper.id)
@@ -0,0 +1,39 @@
+import gzip
+
+import pm4py
+
+from ocel.importer import read_ocel2_json
+from ocel.utils import clone_pm4py_ocel
+from tests.conftest import assert_tables_equal, read_pm4py
+
+
+def truncate_seconds(ocel):
+    ocel = clone_pm4py_ocel(ocel)
+    for table in ["events", "relations"]:
+        df = getattr(ocel, table)
+        setattr(
+            ocel,
+            table,
+            df.assign(**{"ocel:timestamp": df["ocel:timestamp"].dt.floor("s")}),
+        )
+    return ocel
+
+
+def test_read_pm4py_file(pm4py_json, pm4py_ocel):
+    actual = read_ocel2_json(pm4py_json)
+    assert_tables_equal(actual, truncate_seconds(pm4py_ocel))
+    # pm4py moves the first value of each object attribute to the objects table, dropping its timestamp.
+    # Like the XML and SQLite importers, all timestamped values are kept as object changes instead.
+    assert_tables_equal(
+        actual,
+        read_pm4py(pm4py.read_ocel2_json, pm4py_json),
+        tables=["events", "relations", "o2o", "e2e"],
+    )
+
+
+def test_read_gzip_stream(pm4py_json, tmp_path):
+    path = tmp_path / "generated.jsonocel.gz"
+    path.write_bytes(gzip.compress(pm4py_json.read_bytes()))
+    with open(path, "rb") as f:
+        actual = read_ocel2_json(f, chunk_size=7)
+    assert_tables_equal(actual, read_ocel2_json(pm4py_json))
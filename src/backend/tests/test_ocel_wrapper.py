@@ -0,0 +1,25 @@
+import pytest
+
+from ocel.ocel_wrapper import OCELWrapper, cache_budget
+from tests.conftest import PALLET_LOGISTICS
+
+
+def test_wrapper_registers_cache(ocel):
+    ocel_a, ocel_b = OCELWrapper(ocel), OCELWrapper(ocel)
+    assert ocel_a.cache in cache_budget.caches
+    assert ocel_b.cache in cache_budget.caches
+    assert ocel_a.cache != ocel_b.cache
+
+    counts = ocel_a.activity_counts
+    assert counts.sum() == len(ocel.events)
+    assert ocel_a.activity_counts is counts
+    assert ocel_a.cache_size["activity_counts"] > 0
+    assert "activity_counts" not in ocel_b.cache_size
+
+
+@pytest.mark.skipif(not PALLET_LOGISTICS.exists(), reason="Example log not found")
+def test_read_ocel():
+    ocel = OCELWrapper.read_ocel(PALLET_LOGISTICS, output=False)
+    assert len(ocel.events) > 0 and len(ocel.objects) > 0
+    assert ocel.meta["fileName"] == PALLET_LOGISTICS.name
+    assert set(ocel.activity_counts.index) == set(ocel.activities)
@@ -0,0 +1,80 @@
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ocel.snapshot import SNAPSHOT_TABLES, SnapshotCache
+from tests.conftest import assert_tables_equal, generate_ocel
+
+
+@pytest.fixture
+def cache(tmp_path) -> SnapshotCache:
+    return SnapshotCache(tmp_path / "snapshots", max_size=10**9)
+
+
+def test_snapshot_round_trip(cache, ocel):
+    cache.store("hash", ocel)
+    assert cache.has("hash")
+    loaded = cache.load("hash")
+    assert loaded is not None
+    assert_tables_equal(loaded, ocel)
+    for table in SNAPSHOT_TABLES:
+        pd.testing.assert_frame_equal(getattr(loaded, table), getattr(ocel, table))
+
+
+def test_snapshot_directory_is_private(cache, ocel):
+    cache.directory.mkdir()
+    os.chmod(cache.directory, 0o777)
+    cache.store("hash", ocel)
+    assert cache.directory.stat().st_mode & 0o777 == 0o700
+
+
+def test_snapshot_does_not_unpickle(cache, tmp_path):
+    marker = tmp_path / "executed"
+
+    class Payload:
+        def __reduce__(self):
+            return (open, (str(marker), "w"))
+
+    cache.directory.mkdir()
+    with open(cache.path("hash"), "wb") as f:
+        np.savez(
+            f,
+            manifest=np.array([Payload()], dtype=object),
+            allow_pickle=True,
+        )
+    assert cache.load("hash") is None
+    assert not marker.exists()
+    assert not cache.has("hash")
+
+    with open(cache.path("hash"), "wb") as f:
+        pickle.dump({}, f)
+    assert cache.load("hash") is None
+
+
+def test_snapshot_of_other_version_is_discarded(cache, ocel):
+    cache.store("hash", ocel)
+    with np.load(cache.path("hash")) as npz:
+        arrays = dict(npz)
+    manifest = json.loads(arrays["manifest"].tobytes())
+    manifest["versions"]["pandas"] = "0.0.0"
+    arrays["manifest"] = np.frombuffer(json.dumps(manifest).encode(), dtype=np.uint8)
+    with open(cache.path("hash"), "wb") as f:
+        np.savez(f, **arrays)
+
+    assert cache.load("hash") is None
+    assert not cache.has("hash")
+
+
+def test_snapshot_eviction(tmp_path):
+    ocel = generate_ocel(num_orders=20)
+    cache = SnapshotCache(tmp_path / "snapshots", max_size=10**9)
+    cache.store("a", ocel)
+    size = cache.path("a").stat().st_size
+    cache.max_size = int(size * 1.5)
+    os.utime(cache.path("a"), (0, 0))
+    cache.store("b", ocel)
+    assert not cache.has("a") and cache.has("b")
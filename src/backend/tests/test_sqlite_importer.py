@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+import pm4py
+import pytest
+
+from ocel.importer import ImportSelection, apply_selection, read_ocel2_sqlite
+from tests.conftest import PALLET_LOGISTICS, assert_tables_equal, read_pm4py
+
+
+def selections(path) -> list[ImportSelection]:
+    ocel = read_ocel2_sqlite(path)
+    times = ocel.events["ocel:timestamp"].sort_values()
+    start = times.iloc[len(times) // 4].to_pydatetime()
+    end = times.iloc[3 * len(times) // 4].to_pydatetime()
+    activities = sorted(ocel.events["ocel:activity"].unique())
+    otypes = sorted(ocel.objects["ocel:type"].unique())
+    return [
+        ImportSelection(start=start),
+        ImportSelection(end=end),
+        ImportSelection(start=start, end=end),
+        # Naive datetimes are interpreted as UTC
+        ImportSelection(end=end.astimezone(timezone.utc).replace(tzinfo=None)),
+        ImportSelection(activities=frozenset(activities[:2])),
+        ImportSelection(object_types=frozenset(otypes[:1])),
+        ImportSelection(
+            start=start,
+            end=end,
+            activities=frozenset(activities[1:]),
+            object_types=frozenset(otypes[1:]),
+        ),
+        ImportSelection(activities=frozenset()),
+        ImportSelection(start=datetime(2100, 1, 1, tzinfo=timezone.utc)),
+    ]
+
+
+def check_selections(path):
+    full = read_ocel2_sqlite(path)
+    for selection in selections(path):
+        selected = read_ocel2_sqlite(path, selection=selection)
+        assert_tables_equal(selected, apply_selection(full, selection))
+
+
+@pytest.mark.skipif(not PALLET_LOGISTICS.exists(), reason="Example log not found")
+def test_selection_pushdown_pallet_logistics():
+    # Object tables without ocel_time and ocel_changed_field
+    check_selections(PALLET_LOGISTICS)
+
+
+def test_selection_pushdown_pm4py_file(pm4py_sqlite):
+    check_selections(pm4py_sqlite)
+
+
+def test_read_pm4py_file(pm4py_sqlite, pm4py_ocel):
+    actual = read_ocel2_sqlite(pm4py_sqlite)
+    assert_tables_equal(actual, read_pm4py(pm4py.read_ocel2_sqlite, pm4py_sqlite))
+    assert_tables_equal(actual, pm4py_ocel)
+
+
+@pytest.mark.skipif(not PALLET_LOGISTICS.exists(), reason="Example log not found")
+def test_read_pallet_logistics():
+    assert_tables_equal(
+        read_ocel2_sqlite(PALLET_LOGISTICS),
+        read_pm4py(pm4py.read_ocel2_sqlite, PALLET_LOGISTICS),
+    )
+
+
+def test_read_reports_progress(pm4py_sqlite):
+    progress = []
+    read_ocel2_sqlite(pm4py_sqlite, progress=lambda fraction: progress.append(fraction))
+    assert progress == sorted(progress)
+    assert progress[-1] == 1
@@ -0,0 +1,113 @@
+import hashlib
+import threading
+
+import pytest
+
+import ocel.importer.xml
+from api.upload import UploadBuffer
+from ocel.importer import read_ocel2_xml
+from ocel.ocel_wrapper import OCELWrapper
+from tests.conftest import assert_tables_equal
+from util.tasks import TaskState
+
+
+def write_in_thread(upload: UploadBuffer, content: bytes, chunk_size: int = 4096):
+    """Writes the content in chunks from another thread, then completes the upload"""
+
+    def run():
+        for start in range(0, len(content), chunk_size):
+            upload.write(content[start : start + chunk_size])
+        upload.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_reader_follows_writes(tmp_path):
+    content = bytes(range(256)) * 1000
+    upload = UploadBuffer(tmp_path / "upload", total_size=len(content))
+    reader = upload.reader()
+    writer = write_in_thread(upload, content, chunk_size=1000)
+    received = reader.read()
+    writer.join()
+    assert received == content
+    assert upload.content_hash == hashlib.sha256(content).hexdigest()
+    assert upload.progress == 1.0
+
+
+def test_parse_while_uploading(tmp_path, pm4py_xml):
+    upload = UploadBuffer(tmp_path / "upload.xmlocel")
+    with upload.reader() as reader:
+        writer = write_in_thread(upload, pm4py_xml.read_bytes())
+        actual = read_ocel2_xml(reader)
+        writer.join()
+    assert_tables_equal(actual, read_ocel2_xml(pm4py_xml))
+
+
+@pytest.mark.parametrize("total_size", [True, False])
+def test_parse_while_uploading_reports_progress(
+    tmp_path, monkeypatch, pm4py_xml, total_size
+):
+    monkeypatch.setattr(ocel.importer.xml, "PROGRESS_INTERVAL", 1)
+    content = pm4py_xml.read_bytes()
+    upload = UploadBuffer(
+        tmp_path / "upload.xmlocel", total_size=len(content) if total_size else None
+    )
+    progress = []
+    with upload.reader() as reader:
+        writer = write_in_thread(upload, content)
+        read_ocel2_xml(reader, progress=lambda fraction: progress.append(fraction))
+        writer.join()
+    # Without a known size, only the end of the upload is reported
+    assert (len(progress) > 1) == total_size
+    assert progress == sorted(progress)
+    assert progress[-1] == 1
+
+
+def test_abort_fails_reads_and_writes(tmp_path):
+    upload = UploadBuffer(tmp_path / "upload")
+    upload.write(b"partial")
+    reader = upload.reader()
+    assert reader.read(7) == b"partial"
+    upload.abort(ValueError("connection lost"))
+    with pytest.raises(ValueError):
+        reader.read(1)
+    with pytest.raises(ValueError):
+        upload.write(b"more")
+    with pytest.raises(ValueError):
+        upload.wait()
+
+
+def wait_for_tasks(session):
+    for task in list(session.tasks.values()):
+        task.join(timeout=60)
+    return {task.name: task.state for task in session.tasks.values()}
+
+
+@pytest.mark.parametrize("fixture", ["pm4py_xml", "pm4py_json", "pm4py_sqlite"])
+def test_import_route(request, session, client, fixture):
+    path = request.getfixturevalue(fixture)
+    response = client.post(
+        "/ocels/import",
+        params={"name": path.name},
+        files={"file": (path.name, path.read_bytes())},
+    )
+    assert response.status_code == 200
+    assert wait_for_tasks(session) == {
+        "upload_ocel_task": TaskState.SUCCESS,
+        "import_ocel_task": TaskState.SUCCESS,
+    }
+    imported = session.get_ocel(use_original=True)
+    assert imported.meta["importReport"]["fromSnapshot"] is False
+    assert_tables_equal(imported.ocel, OCELWrapper.read_ocel(path, output=False).ocel)
+
+
+def test_import_route_rejects_unsupported_files(session, client):
+    response = client.post(
+        "/ocels/import",
+        params={"name": "log.csv"},
+        files={"file": ("log.csv", b"a,b")},
+    )
+    assert response.status_code == 400
+    assert not session.tasks
@@ -0,0 +1,26 @@
+import io
+
+import pm4py
+
+from ocel.importer import read_ocel2_xml
+from tests.conftest import assert_tables_equal, read_pm4py
+
+
+def test_read_pm4py_file(pm4py_xml, pm4py_ocel):
+    actual = read_ocel2_xml(pm4py_xml)
+    assert_tables_equal(actual, read_pm4py(pm4py.read_ocel2_xml, pm4py_xml))
+    assert_tables_equal(actual, pm4py_ocel)
+
+
+def test_read_stream_in_small_chunks(pm4py_xml):
+    progress = []
+    with open(pm4py_xml, "rb") as f:
+        actual = read_ocel2_xml(
+            f, chunk_size=7, progress=lambda p, *args: progress.append(p)
+        )
+    assert_tables_equal(actual, read_ocel2_xml(pm4py_xml))
+    assert progress and progress == sorted(progress) and progress[-1] <= 1
+
+    # Streams without a file descriptor are read without progress
+    stream = io.BytesIO(pm4py_xml.read_bytes())
+    assert_tables_equal(read_ocel2_xml(stream), read_ocel2_xml(pm4py_xml))
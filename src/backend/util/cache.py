@@ -1,19 +1,30 @@
+from __future__ import annotations
+
 import functools
 import json
 import operator
+import threading
 import uuid
 import warnings
+import weakref
 from contextlib import nullcontext
-from typing import Callable, Hashable
+from typing import Any, Callable, Hashable, Optional
 
-from cachetools import cachedmethod
+from cachetools import LRUCache, cachedmethod
 from cachetools.keys import methodkey
 
+from util.memory import deep_sizeof
+
 
 class CacheError(Exception):
     pass
 
 
+class ValueTooLarge(ValueError):
+    """Raised when inserting a value larger than the budget of a `ByteBudgetCache`.
+    Subclasses `ValueError`, which `cachetools` decorators catch to skip caching the value."""
+
+
 EXCEPTION_ON_NON_HASHABLE = True
 EXCEPTION_ON_TASK_ARG = True
 
@@ -210,3 +221,197 @@ def instance_lru_cache(
         return func_cached
 
     return decorator
+
+
+class ByteBudgetCache(LRUCache):
+    """LRU cache with a budget in bytes instead of a number of entries.
+
+    The deep memory size of each entry (see `deep_sizeof`) is measured once on insertion and recorded in `sizes`.
+    Least recently used entries are evicted when the cache exceeds its own budget (`maxsize`)
+    or, when registered with a `GlobalCacheBudget`, when all registered caches together exceed the global budget.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        lock=None,
+        budget: Optional[GlobalCacheBudget] = None,
+    ):
+        super().__init__(maxsize)
+        self.sizes: dict[Hashable, int] = {}
+        self.lock = lock
+        """Lock guarding this cache, acquired when another cache evicts entries from it."""
+        self.budget = budget
+        self._next_size: Optional[int] = None
+        if budget is not None:
+            budget.register(self)
+
+    # Mappings are unhashable by default. Caches are compared by identity,
+    # so they can be tracked in the `WeakSet` of a `GlobalCacheBudget`.
+    __hash__ = object.__hash__
+
+    def __eq__(self, other) -> bool:
+        return self is other
+
+    def getsizeof(self, value) -> int:
+        if self._next_size is not None:
+            return self._next_size
+        return deep_sizeof(value)
+
+    def __setitem__(self, key, value):
+        size = deep_sizeof(value)
+        if size > self.maxsize:
+            raise ValueTooLarge(f"Value of {size} bytes exceeds the cache size")
+        self._next_size = size
+        try:
+            super().__setitem__(key, value)
+        finally:
+            self._next_size = None
+        self.sizes[key] = size
+        if self.budget is not None:
+            self.budget.enforce(self)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.sizes.pop(key, None)
+
+    def size_by_method(self) -> dict[str, int]:
+        """Returns the cached bytes per method, for keys starting with the method name (see `instance_lru_cache`)."""
+        sizes: dict[str, int] = {}
+        for key, size in list(self.sizes.items()):
+            name = str(key[0]) if isinstance(key, tuple) and key else str(key)
+            sizes[name] = sizes.get(name, 0) + size
+        return sizes
+
+
+class GlobalCacheBudget:
+    """Process-wide byte budget shared by several `ByteBudgetCache`s (e.g. the caches of all OCELs of all sessions).
+
+    When the total exceeds the budget, the least recently used entries of the largest caches are evicted.
+    Caches whose lock is held by another thread are skipped, to avoid deadlocks between concurrent insertions.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._caches: weakref.WeakSet[ByteBudgetCache] = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def register(self, cache: ByteBudgetCache):
+        with self._lock:
+            self._caches.add(cache)
+
+    @property
+    def caches(self) -> list[ByteBudgetCache]:
+        with self._lock:
+            return list(self._caches)
+
+    @property
+    def currsize(self) -> int:
+        return sum(cache.currsize for cache in self.caches)
+
+    def enforce(self, current: ByteBudgetCache):
+        """Evicts entries until the total size is within the budget. Called by `current` while holding its lock."""
+        caches = self.caches
+        total = sum(cache.currsize for cache in caches)
+
+        def evict(cache: ByteBudgetCache, keep: int):
+            nonlocal total
+            while total > self.maxsize and len(cache) > keep:
+                size = cache.currsize
+                cache.popitem()
+                total -= size - cache.currsize
+
+        for cache in sorted(caches, key=lambda c: c.currsize, reverse=True):
+            if total <= self.maxsize:
+                return
+            if cache is current:
+                # Keep the entry just inserted (the most recently used one)
+                evict(cache, keep=1)
+            elif cache.lock is None:
+                evict(cache, keep=0)
+            elif cache.lock.acquire(blocking=False):
+                try:
+                    evict(cache, keep=0)
+                finally:
+                    cache.lock.release()
+
+
+class _OcelCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        """Guards `entries` and `entry_locks`, never held while computing"""
+        self.entries: dict[str, tuple[tuple, Any]] = {}
+        self.entry_locks: dict[str, threading.RLock] = {}
+
+    def entry_lock(self, name: str) -> threading.RLock:
+        with self.lock:
+            lock = self.entry_locks.get(name)
+            if lock is None:
+                lock = self.entry_locks[name] = threading.RLock()
+            return lock
+
+    def get(self, name: str, dependencies: tuple) -> tuple[bool, Any]:
+        with self.lock:
+            entry = self.entries.get(name)
+        if entry is not None and all(a is b for a, b in zip(entry[0], dependencies)):
+            return True, entry[1]
+        return False, None
+
+    def set(self, name: str, dependencies: tuple, value: Any):
+        with self.lock:
+            self.entries[name] = (dependencies, value)
+
+
+_ocel_caches: dict[int, _OcelCache] = {}
+"""Caches by `id` of the OCEL. pm4py's `OCEL.__hash__` formats all tables as strings, so OCELs cannot be used as keys."""
+_ocel_caches_lock = threading.Lock()
+
+
+def _drop_ocel_cache(key: int):
+    with _ocel_caches_lock:
+        _ocel_caches.pop(key, None)
+
+
+def _ocel_cache(ocel) -> _OcelCache:
+    key = id(ocel)
+    with _ocel_caches_lock:
+        cache = _ocel_caches.get(key)
+        if cache is None:
+            cache = _ocel_caches[key] = _OcelCache()
+            # Removed when the OCEL is garbage collected, before its id can be reused
+            weakref.finalize(ocel, _drop_ocel_cache, key)
+    return cache
+
+
+def ocel_cached(*tables: str):
+    """Caches a function computing derived data (e.g. an index) from a pm4py OCEL, per OCEL object.
+
+    The result is reused as long as the given tables of the OCEL (e.g. `"events"`, `"relations"`) are still the same DataFrame objects.
+    Tables are treated as immutable, as with Copy-on-Write, any modification results in a new DataFrame being assigned.
+    Unlike `instance_lru_cache`, this allows sharing results between `OCELWrapper` and filters, which only receive the pm4py OCEL.
+    Each function has its own lock per OCEL, so different functions are computed concurrently (e.g. by filters evaluated in parallel),
+    while concurrent calls of the same function wait for a single computation.
+    """
+
+    def decorator(func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(ocel):
+            dependencies = tuple(getattr(ocel, table) for table in tables)
+            cache = _ocel_cache(ocel)
+            found, value = cache.get(name, dependencies)
+            if found:
+                return value
+            with cache.entry_lock(name):
+                # Another thread might have computed the entry while waiting for the lock
+                found, value = cache.get(name, dependencies)
+                if found:
+                    return value
+                value = func(ocel)
+                cache.set(name, dependencies, value)
+                return value
+
+        return wrapper
+
+    return decorator
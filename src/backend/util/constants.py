@@ -1 +1,3 @@
 SUPPORTED_FILE_TYPES = [".jsonocel", ".xmlocel", ".sqlite"]
+STREAMING_FILE_TYPES = [".jsonocel", ".xmlocel"]
+"""File types that can be parsed while being uploaded"""
@@ -1,10 +1,30 @@
 import hashlib
 import json
+
+import numpy as np
 from pydantic import BaseModel
 
+from util.types import PathLike
+
 
 def filters_hash(filters: list[BaseModel]) -> str:
     """Returns a unique and stable hash for a list of filters"""
     filters_dict = [f.model_dump() for f in filters]
     filters_json = json.dumps(filters_dict, sort_keys=True)
     return hashlib.sha256(filters_json.encode("utf-8")).hexdigest()
+
+
+def file_hash(path: PathLike, chunk_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 hash of a file's content"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def mask_hash(mask: np.ndarray) -> str:
+    """Returns the SHA-256 hash of a boolean mask"""
+    h = hashlib.sha256(len(mask).to_bytes(8, "little"))
+    h.update(np.packbits(np.asarray(mask, dtype=bool)).tobytes())
+    return h.hexdigest()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import sys
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+def deep_sizeof(obj: Any) -> int:
+    """Estimates the memory used by an object in bytes, including everything it references.
+
+    DataFrames, Series, Indexes and arrays are measured via pandas/NumPy (including the contents of object columns),
+    containers and objects with a `__dict__` or `__slots__` are traversed recursively.
+    Objects referenced multiple times are counted once. Memory shared with objects outside `obj`
+    (e.g. DataFrame views under Copy-on-Write) is counted as well, so the result is an upper bound.
+    """
+    return _sizeof(obj, set())
+
+
+def _sizeof(obj: Any, seen: set[int]) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return int(pd.Series(obj.ravel(), copy=False).memory_usage(deep=True))
+        return obj.nbytes
+    if isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return sys.getsizeof(obj)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += _sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += _sizeof(getattr(obj, slot), seen)
+    return size
@@ -7,6 +7,14 @@ import pandas as pd
 from pandas.core.groupby.generic import DataFrameGroupBy, SeriesGroupBy
 
 
+def observed_value_counts(series: pd.Series) -> pd.Series:
+    """Like `Series.value_counts`, but omitting unused categories of categorical columns."""
+    counts = series.value_counts()
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        counts = counts[counts > 0]
+    return counts
+
+
 def prepend_level(
     x: pd.DataFrame | pd.Series,
     /,
@@ -0,0 +1,98 @@
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
+
+from util.types import PathLike
+
+FETCH_BATCH_SIZE = 100_000
+
+
+def connect_readonly(path: PathLike) -> sqlite3.Connection:
+    """Opens a read-only connection to an SQLite file. The connection may be used from other threads."""
+    uri = Path(path).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+
+def quote_identifier(name: str) -> str:
+    """Quotes a table or column name for use in an SQL statement."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def get_table_names(conn: sqlite3.Connection) -> list[str]:
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def get_table_columns(conn: sqlite3.Connection, table_name: str) -> dict[str, str]:
+    """Returns the columns of a table, mapped to their declared (upper-case) SQL type."""
+    cursor = conn.execute(f"PRAGMA table_info({quote_identifier(table_name)})")
+    return {row[1]: (row[2] or "").upper() for row in cursor.fetchall()}
+
+
+def fetch_columns(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Sequence[Any] = (),
+    batch_size: int = FETCH_BATCH_SIZE,
+) -> dict[str, list[Any]]:
+    """Runs a query and returns its result column-wise.
+    Rows are fetched in batches and appended to one list per column, avoiding a list of row tuples for the whole result.
+    """
+    cursor = conn.execute(sql, params)
+    names = [d[0] for d in cursor.description]
+    columns: list[list[Any]] = [[] for _ in names]
+    while rows := cursor.fetchmany(batch_size):
+        for column, values in zip(columns, zip(*rows)):
+            column.extend(values)
+    cursor.close()
+    return dict(zip(names, columns))
+
+
+class SqliteSource:
+    """Shared read-only access to an SQLite file.
+    The connection is opened on first use, and the list of tables is fetched only once.
+    """
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._table_names: Optional[set[str]] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = connect_readonly(self.path)
+        return self._conn
+
+    @property
+    def table_names(self) -> set[str]:
+        if self._table_names is None:
+            self._table_names = set(get_table_names(self.conn))
+        return self._table_names
+
+    def has_table(self, table_name: str) -> bool:
+        return table_name in self.table_names
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "SqliteSource":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+@contextmanager
+def open_source(
+    path: PathLike, source: Optional[SqliteSource] = None
+) -> Iterator[SqliteSource]:
+    """Yields the given source, or a new one for the given path that is closed afterwards."""
+    if source is not None:
+        yield source
+        return
+    with SqliteSource(path) as source:
+        yield source
@@ -1,9 +1,10 @@
+import gc
 import threading
 import functools
 from enum import Enum
 import uuid
 
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Optional
 
 if TYPE_CHECKING:
     from api.session import Session
@@ -18,6 +19,16 @@ class TaskState(str, Enum):
     CANCELLED = "CANCELLED"
 
 
+class TaskCancelled(Exception):
+    """Raised inside a task function when the task has been cancelled."""
+
+
+def raise_if_cancelled(stop_event: Optional[threading.Event]):
+    """Checkpoint for long-running task functions, to be called between stages and chunks of work."""
+    if stop_event is not None and stop_event.is_set():
+        raise TaskCancelled()
+
+
 class Task:
     def __init__(self, id, name, fn, args, kwargs, session, metadata=None):
         self.id = id
@@ -30,6 +41,8 @@ class Task:
         self.state = TaskState.PENDING
         self.thread = None
         self.result = None
+        self.progress: float | None = None
+        self.stage: str | None = None
         self.stop_event = threading.Event()
 
     def start(self):
@@ -43,15 +56,35 @@ class Task:
                 *self.args,
                 session=self.session,
                 stop_event=self.stop_event,
+                progress=self.set_progress,
                 **self.kwargs,
             )
-            self.state = TaskState.SUCCESS
+            self.state = (
+                TaskState.CANCELLED if self.stop_event.is_set() else TaskState.SUCCESS
+            )
+        except TaskCancelled:
+            self.state = TaskState.CANCELLED
         except Exception:
-            self.state = TaskState.FAILURE
-            raise
+            if self.stop_event.is_set():
+                # Failures following a cancellation (e.g. of an aborted upload)
+                self.state = TaskState.CANCELLED
+            else:
+                self.state = TaskState.FAILURE
+                raise
         finally:
             self.session.running_tasks.pop(self.id, None)
 
+        if self.state == TaskState.CANCELLED:
+            # Free partial results of the cancelled task right away
+            self.result = None
+            gc.collect()
+
+    def set_progress(self, progress: Optional[float], stage: Optional[str] = None):
+        """Reports the fraction (0 to 1) of the task that has been completed, and optionally the current stage."""
+        self.progress = progress
+        if stage is not None:
+            self.stage = stage
+
     def cancel(self):
         self.stop_event.set()
         self.state = TaskState.CANCELLED